@@ -1,9 +1,9 @@
-from typing import List, Dict, AnyStr
+from typing import Any, List, Dict, AnyStr
 
 import pandas as pd
 import pytz
 
-from .event import Event
+from .event import Event, Closing_Price
 from .event_stream.event_stream_snapshot import EventStreamSnapshot
 from .matching_engine.matching_engine_default import MatchingEngineDefault
 from .portfolio import Portfolio
@@ -32,8 +32,10 @@ class Backtester:
             store_trade_snapshot=True,
             store_md_snapshot=False,
             store_eod_snapshot=False,
+            batch_eod=False,
             portfolio: Portfolio = Portfolio,
             statistics: Stats = Stats,
+            statistics_params: Dict[AnyStr, Any] = None,
     ):
         self.risk_manager = risk_manager
         self.strategy = strategy
@@ -50,7 +52,7 @@ class Backtester:
         self.event_stream = event_stream
         self.unfilled_orders = []
         self.df_pnl = pd.DataFrame()
-        self.statistics = statistics(self.portfolio)
+        self.statistics = statistics(self.portfolio, **(statistics_params or {}))
         self.evt = None
         self.current_event = None
         self.process_portfolio = process_portfolio
@@ -58,6 +60,7 @@ class Backtester:
         self.store_trade_snapshot = store_trade_snapshot
         self.store_md_snapshot = store_md_snapshot
         self.store_eod_snapshot = store_eod_snapshot
+        self.batch_eod = batch_eod
 
     def get_timestamp(self):
         return self.current_event.get_timestamp()
@@ -142,6 +145,18 @@ class Backtester:
                 portfolio=self.portfolio
             )
 
+    def on_closing_prices(self, closing_prices: pd.DataFrame):
+        # with batch_eod, the session's closing prices skip the strategy and order matching and are applied as one
+        # batch. EOD snapshots are then always marked at the close, not only when store_md_snapshot is set.
+        if self.process_portfolio:
+            self.portfolio.mark_to_market(closing_prices)
+
+        if self.store_eod_snapshot and len(self.portfolio.positions) != 0:
+            self.statistics.update_eod_snapshot(
+                portfolio=self.portfolio,
+                events=closing_prices
+            )
+
     @staticmethod
     def record_market_update(
             positions, store_md_snapshot, store_eod_snapshot, event_type
@@ -161,6 +176,12 @@ class Backtester:
             date=date,
             subscriptions=subscriptions
         )
+        closing_prices = None
+        if self.batch_eod and "event_type" in _events.columns:
+            is_closing_price = (_events["event_type"] == Closing_Price).to_numpy()
+            closing_prices = _events[is_closing_price]
+            _events = _events[~is_closing_price]
+
         x = 1
         for row in _events.reset_index().itertuples(index=False):
             event_dict = row._asdict()
@@ -170,3 +191,8 @@ class Backtester:
                 self.on_event(self.evt)
 
             x += 1
+
+        if closing_prices is not None and not closing_prices.empty:
+            self.on_closing_prices(closing_prices)
+
+        self.statistics.end_session()
@@ -1,9 +1,25 @@
-from typing import List
+import os
+import shutil
+import tempfile
+from typing import Iterator, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 from backtesting.simulator.simulation_batch_result import SimulationBatchResult
 from backtesting.simulator.simulation_result import SimulationResult
+from backtesting.statistics.aggregation import merge_partials
+from backtesting.statistics.statistics import partial_aggregations
+
+
+def reduce_results(dfs: List[pd.DataFrame], keys: List[str]) -> pd.DataFrame:
+    # merge the partial aggregates of simulations, see BackTestingOutputConfig.reduce_results
+    dfs = [df for df in dfs if not df.empty]
+    if not dfs:
+        return pd.DataFrame()
+    df = merge_partials(dfs, keys, partial_aggregations)
+    df["realised_pnl_cum_hash"] = df.groupby("hash")["realised_pnl"].cumsum()
+    return df
 
 
 class BackTestingResults:
@@ -18,16 +34,165 @@ class BackTestingResults:
         pass
 
 
+def _encode(values) -> Tuple[str, List[np.ndarray]]:
+    # a column as arrays np.savez writes: numbers and naive datetimes as they are, timezone aware datetimes in utc,
+    # anything else as codes into its distinct values, as EventRecorder dictionary encodes
+    values = pd.Series(values, copy=False)
+    if isinstance(values.dtype, pd.DatetimeTZDtype):
+        return "utc", [values.dt.tz_convert(None).to_numpy()]
+    if isinstance(values.dtype, np.dtype) and values.dtype.kind in "biufcmM":
+        return "values", [values.to_numpy()]
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    uniques = np.asarray(uniques, dtype=object)
+    if all(type(value) is str for value in uniques):
+        # written without pickling
+        uniques = uniques.astype(str)
+    return "codes", [codes, uniques]
+
+
+def _decode(kind: str, arrays: List[np.ndarray], dtype) -> pd.Series:
+    if kind == "utc":
+        return pd.Series(pd.DatetimeIndex(arrays[0]).tz_localize("UTC").tz_convert(dtype.tz))
+    if kind == "values":
+        return pd.Series(arrays[0])
+    codes, uniques = arrays
+    return pd.Series(pd.Categorical.from_codes(codes, uniques.astype(object))).astype(dtype)
+
+
+class ResultsDataset:
+    """
+    Batches of results kept in the order they were accumulated, in memory or, with a spill_dir, written column by
+    column to an .npz per batch in a temporary directory under it and read back a batch at a time as they are
+    iterated.
+    """
+    __slots__ = (
+        "spill_dir",
+        "spill_path",
+        "batches",
+    )
+
+    def __init__(self, spill_dir: Optional[str] = None):
+        self.spill_dir: Optional[str] = spill_dir
+        # directory of this dataset's files, created with the first batch
+        self.spill_path: Optional[str] = None
+        # the frames, or with a spill_dir the files they were written to, with their columns, index names and how
+        # each of their index levels and columns was encoded
+        self.batches: List = []
+
+    def __len__(self):
+        return len(self.batches)
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        for batch in self.batches:
+            yield self._read(*batch) if self.spill_dir is not None else batch
+
+    def _write(self, df: pd.DataFrame, file: str) -> Tuple:
+        arrays, specs = {}, []
+        series = [df.index.get_level_values(i) for i in range(df.index.nlevels)] + [
+            df.iloc[:, j] for j in range(df.shape[1])
+        ]
+        for (i, values) in enumerate(series):
+            kind, encoded = _encode(values)
+            arrays.update({f"arr_{i}_{j}": array for (j, array) in enumerate(encoded)})
+            specs.append((kind, len(encoded), values.dtype))
+        np.savez(file, **arrays)
+        return file, df.columns, list(df.index.names), specs
+
+    @staticmethod
+    def _read(file: str, columns: pd.Index, index_names: List, specs: List[Tuple]) -> pd.DataFrame:
+        # the dictionaries of values that are not strings are pickled
+        with np.load(file, allow_pickle=True) as arrays:
+            series = [
+                _decode(kind, [arrays[f"arr_{i}_{j}"] for j in range(n)], dtype)
+                for (i, (kind, n, dtype)) in enumerate(specs)
+            ]
+        levels = series[:len(index_names)]
+        index = pd.MultiIndex.from_arrays(levels, names=index_names) if len(levels) > 1 else pd.Index(
+            levels[0], name=index_names[0]
+        )
+        df = pd.DataFrame(dict(enumerate(series[len(index_names):])))
+        df.index, df.columns = index, columns
+        return df
+
+    def append(self, df: pd.DataFrame):
+        if df.empty:
+            return
+        if self.spill_dir is None:
+            self.batches.append(df)
+            return
+        if self.spill_path is None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            self.spill_path = tempfile.mkdtemp(prefix="results-", dir=self.spill_dir)
+        self.batches.append(self._write(df, os.path.join(self.spill_path, f"batch-{len(self.batches):06d}.npz")))
+
+    def to_frame(self, sort: bool = False) -> pd.DataFrame:
+        batches = list(self)
+        if not batches:
+            return pd.DataFrame()
+        return batches[0] if len(batches) == 1 else pd.concat(batches, sort=sort)
+
+    def close(self):
+        # remove the spilled files
+        if self.spill_path is not None:
+            shutil.rmtree(self.spill_path, ignore_errors=True)
+        self.spill_path = None
+        self.batches = []
+
+
 class DataFrameAccumulatingBackTestingResults(BackTestingResults):
+    """
+    Batches are collected in a ResultsDataset and concatenated once, when df is first read after they were added.
+    """
+    def __init__(self, spill_dir: Optional[str] = None):
+        self.dataset: ResultsDataset = ResultsDataset(spill_dir)
+        self.sort: bool = False
+        self._df: Optional[pd.DataFrame] = None
+        super().__init__()
+
+    @property
+    def df(self) -> pd.DataFrame:
+        if self._df is None:
+            self._df = self.dataset.to_frame(sort=self.sort)
+        return self._df
+
+    @df.setter
+    def df(self, df: pd.DataFrame):
+        self.dataset.close()
+        self.dataset.append(df)
+        self._df = None
+
+    def accumulate(self, result: SimulationBatchResult):
+        super().accumulate(result)
+        self.dataset.append(result.df)
+        self._df = None
+
+    def accumulate_df(self, df: pd.DataFrame, sort: bool = False):
+        self.sort = self.sort or sort
+        self.dataset.append(df)
+        self._df = None
+
+
+class ReducingBackTestingResults(BackTestingResults):
+    """
+    Merges batches of partial aggregates as they arrive, so the results hold a row per group rather than per batch.
+    """
+    def __init__(self, keys: List[str]):
+        super().__init__()
+        self.keys: List[str] = keys
+
     def accumulate(self, result: SimulationBatchResult):
         super().accumulate(result)
-        self.df = pd.concat([self.df, result.df])
+        self.df = reduce_results([self.df, result.df], self.keys)
 
     def accumulate_df(self, df: pd.DataFrame, sort: bool = False):
-        self.df = pd.concat([self.df, df], sort=sort)
+        self.df = reduce_results([self.df, df], self.keys)
 
 
-def build_backtesting_results(return_result: bool) -> BackTestingResults:
+def build_backtesting_results(
+        return_result: bool, reduce_keys: List[str] = None, spill_dir: str = None
+) -> BackTestingResults:
+    if return_result and reduce_keys is not None:
+        return ReducingBackTestingResults(reduce_keys)
     if return_result:
-        return DataFrameAccumulatingBackTestingResults()
+        return DataFrameAccumulatingBackTestingResults(spill_dir)
     return BackTestingResults()
@@ -62,7 +62,12 @@ class BackTestingConfig:
         self.store_eod_snapshot: bool = parse_bool(
             pipeline.get("store_eod_snapshot", False)
         )
+        # mark to market once per session instead of per closing_price event, see Backtester.on_closing_prices
+        self.batch_eod: bool = parse_bool(
+            pipeline.get("batch_eod", False)
+        )
         self.simulator_type: str = pipeline.get("simulator", "simulation_pool")
+        self.portfolio_type: str = pipeline.get("portfolio", "portfolio")
         self.event_stream_params: Dict[str, Any] = safe_get(
             pipeline,
             "event_stream_parameters",
@@ -1,6 +1,10 @@
 from typing import Dict, Any, List, AnyStr
 
 from backtesting.config.type_parser import parse_bool
+from backtesting.save_simulations import DEFAULT_WRITE_WORKERS
+from backtesting.statistics.event_recorder import DEFAULT_SPILL_ROWS
+from backtesting.statistics.online_aggregator import bucket_size
+from backtesting.statistics.statistics import buckets_within_day
 
 
 class BackTestingOutputConfig:
@@ -24,7 +28,13 @@ class BackTestingOutputConfig:
             store_index: bool = True,
             event_features: List[AnyStr] = ["symbol", "order_book_id", "account_id"],
             metrics: List[AnyStr] = ["performance_overview", "trading_actions_breakdown", "inventory_overview"],
-
+            spill_dir: AnyStr = None,
+            spill_rows: int = DEFAULT_SPILL_ROWS,
+            online_aggregation: bool = False,
+            reduce_results: bool = False,
+            results_spill_dir: AnyStr = None,
+            write_queue_size: int = 0,
+            write_workers: int = DEFAULT_WRITE_WORKERS,
     ):
         self.datastore: str = datastore
         self.datastore_parameters: Dict[AnyStr, Any] = datastore_parameters
@@ -38,6 +48,48 @@ class BackTestingOutputConfig:
         self.mode: str = mode
         self.file: str = file
         self.store_index: bool = store_index
+        # snapshots are spilled to local files under spill_dir during a run, keeping spill_rows in memory
+        self.spill_dir: str = spill_dir
+        self.spill_rows: int = int(spill_rows)
+        # performance_overview is aggregated as snapshots are recorded, and the events themselves are not kept
+        self.online_aggregation: bool = parse_bool(online_aggregation)
+        if self.online_aggregation:
+            self._validate_online_aggregation()
+        # returned results are written to local files under results_spill_dir a batch at a time, rather than held
+        self.results_spill_dir: str = results_spill_dir
+        # results are written on a background thread, up to write_queue_size writes queued, when it is set
+        self.write_queue_size: int = int(write_queue_size or 0)
+        # partitions of results split by the by columns are written write_workers at a time
+        self.write_workers: int = int(write_workers)
+        # workers return partial aggregates of their events, which are merged by simulation and event_features
+        self.reduce_results: bool = parse_bool(reduce_results)
+        if self.reduce_results:
+            self._validate_reduce_results()
+
+    def _validate_online_aggregation(self):
+        if any(metric != "performance_overview" for metric in self.metrics):
+            raise ValueError(
+                f"online_aggregation only computes performance_overview, metrics were {self.metrics}"
+            )
+        if not buckets_within_day(self.resample_rule):
+            raise ValueError(
+                f"online_aggregation needs a resample_rule whose buckets tile a day, got {self.resample_rule}"
+            )
+
+    def _validate_reduce_results(self):
+        if self.online_aggregation:
+            raise ValueError("reduce_results and online_aggregation can not be combined")
+        if self.resample_rule is not None:
+            try:
+                bucket_size(self.resample_rule)
+            except (AttributeError, TypeError, ValueError):
+                raise ValueError(f"reduce_results needs a fixed resample_rule or none, got {self.resample_rule}")
+
+    @property
+    def reduce_keys(self) -> List[str]:
+        # the columns partial results are merged on
+        keys = ["hash", "simulation"] + self.event_features
+        return keys + ["timestamp"] if self.resample_rule is not None else keys
 
     @classmethod
     def create(cls, config: Dict[str, Any], calculate_cumulative_daily_pnl: bool):
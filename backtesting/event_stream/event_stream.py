@@ -5,6 +5,8 @@ from typing import List
 import pandas as pd
 import pytz
 
+from ..subscriptions.subscription import concat_frames, fillna_frame
+
 utc_tz = pytz.timezone("UTC")
 london_tz = pytz.timezone("Europe/London")
 eastern_tz = pytz.timezone("US/Eastern")
@@ -28,17 +30,14 @@ class EventStream(ABC):
             date: dt.date,
             subscriptions: List[pd.DataFrame]
     ) -> pd.DataFrame:
-        events = pd.DataFrame(columns=list(set([c for s in subscriptions for c in s.columns])))
-
-        for subscription in subscriptions:
-            # subscription_events = self.standardise_events(subscription)
-            events = pd.concat([events, subscription])
+        # subscription_events = self.standardise_events(subscription)
+        events = concat_frames(subscriptions)
 
         events.index.name = "timestamp"
         events.sort_index(inplace=True)
         events['trading_session'] = events.index.date
 
-        return events.fillna(0)
+        return fillna_frame(events, 0)
 
     @abstractmethod
     def sample(self, tob: pd.DataFrame, trading_session: dt.datetime) -> pd.DataFrame:
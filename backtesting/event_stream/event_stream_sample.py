@@ -34,7 +34,7 @@ class EventStreamSample(EventStream):
             dont_apply_sample_df = data[data[Apply_Sampling] == False]
 
             sampled_df = (
-                apply_sample_df.groupby(['symbol'])
+                apply_sample_df.groupby(['symbol'], observed=True)
                 .apply(lambda grp: grp.sample(frac=self.sample_rate))
                 .reset_index(level=0, drop=True)
             )
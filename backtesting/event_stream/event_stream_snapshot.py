@@ -51,6 +51,9 @@ class EventStreamSnapshot(EventStream):
                 _tick_df = pd.concat([_tick_df, _tick_symbol_df], axis=0)
                 _tick_df.sort_index(inplace=True)
 
+            # merge_asof requires the by keys to share a dtype, e.g. when symbol_id is categorical
+            _tick_df["symbol_id"] = _tick_df["symbol_id"].astype(market_data["symbol_id"].dtype)
+
             market_data_sample: pd.DataFrame = pd.merge_asof(
                 _tick_df,
                 market_data,
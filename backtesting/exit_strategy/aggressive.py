@@ -52,7 +52,10 @@ class Aggressive(AbstractExitStrategy):
     ):
 
         price_sl, price_tp = self.profitloss_price(
-            avg_price, position.net_position, position.price_increment
+            avg_price,
+            position.net_position,
+            # fixed point prices are already in ticks
+            position.tick_size if position.price_scale else position.price_increment,
         )
 
         ops = [op.ge, op.le] if position.net_position > 0 else [op.le, op.ge]
@@ -2,7 +2,7 @@ import operator
 
 from ..exit_strategy.base import AbstractExitStrategy
 from ..order import Order
-from ..position import Position
+from ..position import Position, LotBook
 
 
 class Chaser(AbstractExitStrategy):
@@ -38,7 +38,7 @@ class Chaser(AbstractExitStrategy):
         if not position.exit_attr.get("starttick"):
             position.exit_attr["starttick"] = round(
                 position.open_positions[0].price
-                if type(position.open_positions) == list
+                if isinstance(position.open_positions, LotBook)
                 else position.open_positions.price
                      + (self.starttick * position.price_increment)
             )
@@ -51,7 +51,7 @@ class Chaser(AbstractExitStrategy):
         ):  # tick moved into profit
             position.exit_attr["chaser_price"] = op[2](
                 position.exit_attr["chaser_price"],
-                (round((self.uptick * position.price_increment) * 1000000)),
+                round(self.uptick * position.tick_size),
             )
 
             chaser_dist = (
@@ -62,12 +62,12 @@ class Chaser(AbstractExitStrategy):
 
             # if new chaser price is further away then the maxuptick set the chaser price to tick_price +- maxuptick
             if operator.gt(
-                    round(chaser_dist / (1000000 * position.price_increment)),
+                    round(chaser_dist / position.tick_size),
                     self.maxuptick,
             ):
                 position.exit_attr["chaser_price"] = op[2](
                     tick_price,
-                    (round((self.maxuptick * position.price_increment) * 1000000)),
+                    round(self.maxuptick * position.tick_size),
                 )
 
         elif op[0](
@@ -75,7 +75,7 @@ class Chaser(AbstractExitStrategy):
         ):  # tick moved into loss
             position.exit_attr["chaser_price"] = op[1](
                 position.exit_attr["chaser_price"],
-                (round((self.downtick * position.price_increment) * 1000000)),
+                round(self.downtick * position.tick_size),
             )
 
             chaser_dist = (
@@ -86,12 +86,12 @@ class Chaser(AbstractExitStrategy):
 
             # if new chaser price is further away then the maxdowntick set the chaser price to tick_price +- downuptick
             if operator.gt(
-                    round(chaser_dist / (1000000 * position.price_increment)),
+                    round(chaser_dist / position.tick_size),
                     self.maxdowntick,
             ):
                 position.exit_attr["chaser_price"] = op[1](
                     tick_price,
-                    (round((self.maxdowntick * position.price_increment) * 1000000)),
+                    round(self.maxdowntick * position.tick_size),
                 )
 
         # check to see if the chaser can now match the order book
@@ -3,6 +3,7 @@ import operator as op
 from ..exit_strategy.base import AbstractExitStrategy
 from ..order import Order
 from ..position import Position
+from ..fixed_point import tick_size
 
 
 class Passive(AbstractExitStrategy):
@@ -26,7 +27,8 @@ class Passive(AbstractExitStrategy):
     ):
         match_price = event.ask_price if position.net_position > 0 else event.bid_price
         ops = op.add if position.net_position > 0 else op.sub
-        price = ops(tick_price, (self.skew_by * event.price_increment * 1000000))
+        skew = self.skew_by * tick_size(event.price_increment, getattr(event, "price_scale", None))
+        price = ops(tick_price, skew)
 
         orders = []
         if not position.exit_attr.get("lastprice"):
@@ -26,28 +26,19 @@ class ProfitRunning(AbstractExitStrategy):
 
     @staticmethod
     def calc_average_price(position):
-        total_opening_cost = sum(
-            [
-                x.running_price * x.quantity
-                if hasattr(x, "running_price")
-                else x.price * x.quantity
-                for x in position.open_positions
-            ]
-        )
-        total_opening_quantity = sum([x.quantity for x in position.open_positions])
-        return int(round((total_opening_cost / total_opening_quantity)))
+        return int(round(position.open_positions.running_average_price()))
 
     @staticmethod
     def set_running_price(position, tp_price):
-        [setattr(x, "running_price", tp_price) for x in position.open_positions]
+        position.open_positions.set_running_price(tp_price)
 
-    def profitloss_price(self, price: float, position: float, price_increment: float):
+    def profitloss_price(self, price: float, position: float, tick_size: float):
         if position > 0:
-            sl_price = int(price - (price_increment * 1000000) * self.stoploss_limit)
-            tp_price = int(price + (price_increment * 1000000) * self.takeprofit_limit)
+            sl_price = int(price - tick_size * self.stoploss_limit)
+            tp_price = int(price + tick_size * self.takeprofit_limit)
         else:
-            sl_price = int(price + (price_increment * 1000000) * self.stoploss_limit)
-            tp_price = int(price - (price_increment * 1000000) * self.takeprofit_limit)
+            sl_price = int(price + tick_size * self.stoploss_limit)
+            tp_price = int(price - tick_size * self.takeprofit_limit)
         return sl_price, tp_price
 
     def calc_order_qty(self, net_position):
@@ -72,7 +63,7 @@ class ProfitRunning(AbstractExitStrategy):
         price_sl, price_tp = self.profitloss_price(
             position.exit_attr["running_price"],
             position.net_position,
-            position.price_increment,
+            position.tick_size,
         )
 
         ops = [op.ge, op.le] if position.net_position > 0 else [op.le, op.ge]
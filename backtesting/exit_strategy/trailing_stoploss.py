@@ -21,16 +21,16 @@ class TrailingStopLoss(AbstractExitStrategy):
         else:
             position.tick_peak = position.last_tick_peak
 
-    def profitloss_price(self, price: float, position: float, price_increment: float):
+    def profitloss_price(self, price: float, position: float, tick_size: float):
 
         if position > 0:
-            return int(price - ((price_increment * 1000000) * self.stoploss_limit))
+            return int(price - (tick_size * self.stoploss_limit))
         else:
-            return int(price + ((price_increment * 1000000) * self.stoploss_limit))
+            return int(price + (tick_size * self.stoploss_limit))
 
     def set_trailing_stoploss(self, position, avg_price):
         price_sl = self.profitloss_price(
-            avg_price, position.net_position, position.price_increment
+            avg_price, position.net_position, position.tick_size
         )
 
         position.exit_attr["trailing_stoploss"] = price_sl
@@ -0,0 +1,72 @@
+"""
+Fixed point prices and quantities.
+
+In fixed point mode a subscription converts prices once, at load, into int64 ticks of their instrument:
+price_scale = 10 ** price_increment ticks per unit of price, price_increment being the number of decimal places the
+instrument is quoted to. Quantities are traded in lots of 1 / quantity_scale contracts, quantity_scale =
+10 ** quantity_increment per instrument, and positions convert each fill into whole lots once with to_lots. Positions
+then hold whole lots at tick prices, so netting, cost and pnl are exact integer arithmetic. Values are converted back
+with to_price, by price_scale * quantity_scale, where they leave the position, i.e. when pnl is added to the portfolio,
+and prices by price_scale when snapshots are turned into a DataFrame.
+
+A price_scale of None, or 0 once a frame has been filled, means prices are floats. A quantity_scale of None means
+whole lots of one contract.
+"""
+from typing import Any, Optional
+
+import numpy as np
+
+# exit strategies have historically measured ticks as price_increment * 1e6, prices quoted in millionths
+LEGACY_PRICE_SCALE: int = 1000000
+
+# avg_price positions of float priced instruments divide realised pnl by this, legacy prices being quoted in
+# millionths and quantities in hundredths
+LEGACY_VALUE_SCALE: int = 100000000
+
+# decimal places of a contract traded in fixed point mode unless the subscription sets quantity_increment
+DEFAULT_QUANTITY_INCREMENT: int = 8
+
+# relative error tolerated when a float quantity is turned into lots, e.g. 0.07 * 100 = 7.000000000000001
+LOTS_TOLERANCE: float = 1e-9
+
+
+def price_scale(price_increment: Any) -> int:
+    return 10 ** int(price_increment)
+
+
+def to_ticks(prices: Any, price_increment: Any) -> np.ndarray:
+    scale = 10 ** np.asarray(price_increment, dtype="int64")
+    return np.rint(np.asarray(prices, dtype="float64") * scale).astype("int64")
+
+
+def to_price(value: Any, scale: Optional[int]) -> Any:
+    return value / scale if scale else value
+
+
+def quantity_scale(quantity_increment: Any) -> int:
+    return 10 ** int(quantity_increment)
+
+
+def to_lots(quantity: Any, scale: Optional[int] = None) -> int:
+    scaled = quantity * scale if scale else quantity
+    lots = int(round(scaled))
+    if abs(lots - scaled) > LOTS_TOLERANCE * max(abs(scaled), 1):
+        raise ValueError(
+            f"fixed point positions trade whole lots of 1/{scale or 1} contracts, got a quantity of {quantity}"
+        )
+    return lots
+
+
+def from_lots(lots: int, scale: Optional[int]) -> Any:
+    return lots / scale if scale and scale != 1 else lots
+
+
+def value_scale(price_scale: Optional[int], quantity_scale: Optional[int]) -> Optional[int]:
+    """
+    Scale of values that are a tick price times a quantity in lots, e.g. cost and pnl, None when prices are floats.
+    """
+    return price_scale * (quantity_scale or 1) if price_scale else None
+
+
+def tick_size(price_increment: Any, scale: Optional[int]) -> Any:
+    return 1 if scale else price_increment * LEGACY_PRICE_SCALE
@@ -16,33 +16,34 @@ from backtesting.backtesting_result import (
 from backtesting.simulation_runner import SimulationRunner
 
 
-def parse_args() -> Namespace:
+def build_parser() -> ArgumentParser:
+    """
+    The arguments every entry point loading a scenario's configuration takes, see load_config.
+    """
     parser: ArgumentParser = ArgumentParser(
         formatter_class=ArgumentDefaultsHelpFormatter
     )
 
+    # -z--datastore and the like, single options, are how these were spelt before they had a short and a long
+    # form, and still parse
     parser.add_argument(
-        "-r",
-        "--cores",
-        help="Number of CPU cores to use. Default: 1. Overrides whatever is in --config",
-        type=int,
-    )
-
-    parser.add_argument(
-        "-z"
+        "-z",
         "--datastore",
+        "-z--datastore",
         dest='datastore',
         help="name of the datastore all configuration is stored")
 
     parser.add_argument(
-        "-y"
+        "-y",
         "--datastore_parameters",
+        "-y--datastore_parameters",
         dest='datastore_parameters',
         help="authentication details for the datastore, entry points, etc.")
 
     parser.add_argument(
-        "-a"
+        "-a",
         "--scenario_path",
+        "-a--scenario_path",
         dest='scenario_path',
         help="Path to scenario directory")
 
@@ -54,8 +55,8 @@ def parse_args() -> Namespace:
     )
 
     parser.add_argument(
-        "-o"
         "--scenario",
+        "-o--scenario",
         dest='scenario',
         help="Which scenario to load the configuration from"
     )
@@ -81,12 +82,6 @@ def parse_args() -> Namespace:
         help="Path to output configuration yaml",
     )
 
-    parser.add_argument(
-        "-b",
-        "--batch",
-        help="Number of batches to split the simulations into (overrides any value in --pipeline). Default: 1",
-        type=int,
-    )
     parser.add_argument(
         "-i",
         "--sims",
@@ -105,9 +100,96 @@ def parse_args() -> Namespace:
 
     parser.add_argument("--log_level", help="What log level to use")
 
+    return parser
+
+
+def parse_args() -> Namespace:
+    parser: ArgumentParser = build_parser()
+
+    parser.add_argument(
+        "-r",
+        "--cores",
+        help="Number of CPU cores to use. Default: 1. Overrides whatever is in --config",
+        type=int,
+    )
+
+    parser.add_argument(
+        "-b",
+        "--batch",
+        help="Number of batches to split the simulations into (overrides any value in --pipeline). Default: 1",
+        type=int,
+    )
+
     return parser.parse_args()
 
 
+def config_arguments(args: Namespace) -> Dict[AnyStr, Any]:
+    """
+    The load_config keyword arguments parsed by a build_parser parser.
+    """
+    return dict(
+        datastore=args.datastore,
+        datastore_parameters=eval(args.datastore_parameters),
+        scenario_path=args.scenario_path,
+        subscriptions_path=args.subscriptions_path,
+        scenario=args.scenario,
+        pipeline_path=args.pipeline_path,
+        simulations_path=args.simulations_config_path,
+        output_path=args.output_config_path,
+        start_date=args.start_date,
+        end_date=args.end_date,
+        simulations_filter=[] if args.sims is None else args.sims.split(","),
+    )
+
+
+def setup_logging(args: Namespace, name: AnyStr) -> logging.Logger:
+    log_level: str = args.log_level if args.log_level else (
+        os.getenv("BACKTESTING_LOG_LEVEL", "INFO")
+    )
+
+    logging.basicConfig(
+        level=log_level, format="[%(asctime)s][%(name)s][%(levelname)s] %(message)s",
+    )
+    logger = logging.getLogger(name)
+    logger.setLevel(log_level)
+    return logger
+
+
+def load_config(
+        datastore: AnyStr,
+        datastore_parameters: Dict[Any, Any],
+        scenario_path: Any,
+        scenario: AnyStr,
+        subscriptions_path: AnyStr,
+        pipeline_path: AnyStr,
+        simulations_path: AnyStr,
+        output_path: AnyStr,
+        num_cores: int,
+        num_batches: int,
+        start_date: AnyStr,
+        end_date: AnyStr,
+        simulations_filter: List[AnyStr],
+) -> BackTestingConfig:
+    """
+    Build the scenario's configuration from the datastore, see main for the parameters.
+    """
+    return BackTestingConfigFactory.create(
+        datastore=datastore, datastore_parameters=datastore_parameters
+    ).build(
+        scenario=scenario,
+        scenario_path=scenario_path,
+        subscriptions_path=subscriptions_path,
+        pipeline_path=pipeline_path,
+        simulations_path=simulations_path,
+        output_path=output_path,
+        num_cores=num_cores,
+        num_batches=num_batches,
+        start_date=start_date,
+        end_date=end_date,
+        simulations_filter=simulations_filter,
+    )
+
+
 def main(
         datastore: AnyStr,
         datastore_parameters: Dict[Any, Any],
@@ -144,9 +226,9 @@ def main(
     :return:
     """
 
-    config: BackTestingConfig = BackTestingConfigFactory.create(
-        datastore=datastore, datastore_parameters=datastore_parameters
-    ).build(
+    config: BackTestingConfig = load_config(
+        datastore=datastore,
+        datastore_parameters=datastore_parameters,
         scenario=scenario,
         scenario_path=scenario_path,
         subscriptions_path=subscriptions_path,
@@ -160,7 +242,11 @@ def main(
         simulations_filter=simulations_filter,
     )
 
-    results: BackTestingResults = build_backtesting_results(return_results)
+    results: BackTestingResults = build_backtesting_results(
+        return_results,
+        reduce_keys=config.output.reduce_keys if config.output.reduce_results else None,
+        spill_dir=config.output.results_spill_dir,
+    )
 
     SimulationRunner().run(config, results)
 
@@ -169,32 +255,14 @@ def main(
 
 if __name__ == "__main__":
     args: Namespace = parse_args()
-    log_level: str = args.log_level if args.log_level else (
-        os.getenv("BACKTESTING_LOG_LEVEL", "INFO")
-    )
-
-    logging.basicConfig(
-        level=log_level, format="[%(asctime)s][%(name)s][%(levelname)s] %(message)s",
-    )
-    logger = logging.getLogger("main")
-    logger.setLevel(log_level)
+    logger: logging.Logger = setup_logging(args, "main")
 
     try:
 
         results: BackTestingResults = main(
-            datastore=args.datastore,
-            datastore_parameters=eval(args.datastore_parameters),
-            scenario_path=args.scenario_path,
-            subscriptions_path=args.subscriptions_path,
-            scenario=args.scenario,
-            pipeline_path=args.pipeline_path,
-            simulations_path=args.simulations_config_path,
-            output_path=args.output_config_path,
+            **config_arguments(args),
             num_cores=args.cores,
             num_batches=int(args.batch) if args.batch is not None else None,
-            start_date=args.start_date,
-            end_date=args.end_date,
-            simulations_filter=[] if args.sims is None else args.sims.split(","),
             return_results=False,
         )
 
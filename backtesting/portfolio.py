@@ -1,5 +1,33 @@
+from typing import Any, Dict, Tuple, Type
+
+import numpy as np
+import pandas as pd
 from numpy import sign
-from .position import Position
+from .position import Position, OpenPosition
+from .fixed_point import LEGACY_VALUE_SCALE, to_price, tick_size
+
+
+def get_price_scale(event):
+    # events of float priced subscriptions have no price_scale, or 0 when framed together with fixed point ones
+    return getattr(event, "price_scale", None) or None
+
+
+def get_quantity_scale(event):
+    return getattr(event, "quantity_scale", None) or None
+
+
+def get_closing_prices(closing_prices, matching_method) -> Tuple[np.ndarray, np.ndarray]:
+    # as Event.get_price, the prices long and short positions are marked at, row by row
+    if "bid_price" not in closing_prices.columns and "ask_price" not in closing_prices.columns:
+        price = closing_prices["price"].to_numpy(dtype="float64")
+        return price, price
+
+    ask = closing_prices["ask_price"].to_numpy(dtype="float64")
+    bid = closing_prices["bid_price"].to_numpy(dtype="float64")
+    if matching_method == "side_of_book":
+        return ask, bid
+    mid = (ask + bid) / 2
+    return mid, mid
 
 
 class Portfolio:
@@ -15,6 +43,8 @@ class Portfolio:
         self.cur_cash = cash
         self.currency = currency
         self.positions = {}
+        # positions indexed by symbol_id, so market events only visit the positions they price
+        self.symbol_positions = {}
         self.closed_positions = {}
         self.equity = cash
         self.realised_pnl = 0
@@ -47,25 +77,54 @@ class Portfolio:
         return net_positions
 
     def update_portfolio(self, event):
-        self.unrealised_pnl = 0
-        if len(self.positions) != 0:
-            for p, open_positions in {
-                k: v
-                for (k, v) in self.positions.items()
-                if k[-2] == event.symbol_id
-            }.items():
-                source, symbol_id, account = p[0], p[1], p[2]
-                pos = self.positions[source, symbol_id, account]
-
-                if event.has_price:
-                    evt_price = event.get_price(
-                        is_long=pos.is_long(),
-                        matching_method=self.matching_method,
-                    )
-                    pos.update_unrealised_pnl(evt_price, event.rate_to_usd)
-                    self.unrealised_pnl += pos.unrealised_pnl
+        # the portfolio total is adjusted by the change in each repriced position, other symbols keep their last mark
+        if event.has_price:
+            for pos in self.symbol_positions.get(event.symbol_id, {}).values():
+                evt_price = event.get_price(
+                    is_long=pos.is_long(),
+                    matching_method=self.matching_method,
+                )
+                unrealised_pnl = pos.unrealised_pnl
+                pos.update_unrealised_pnl(evt_price, event.rate_to_usd)
+                self.unrealised_pnl += pos.unrealised_pnl - unrealised_pnl
+
+    def mark_to_market(self, closing_prices):
+        """
+        Revalue every open position at the session's closing prices in one vectorized pass, each at the price
+        update_portfolio would mark its side at, symbols without a closing price keep their last mark.
+        """
+        if len(self.positions) == 0 or self.netting_engine not in ("fifo", "lifo", "avg_price"):
+            return
+
+        closing_prices = closing_prices.drop_duplicates(subset="symbol_id", keep="last")
+        keys = list(self.positions.keys())
+        price_idx = pd.Index(closing_prices["symbol_id"]).get_indexer([symbol_id for (_, symbol_id, _) in keys])
+        marked = np.flatnonzero(price_idx >= 0)
+        if marked.size == 0:
+            return
+
+        positions = [self.positions[keys[i]] for i in marked]
+        long_prices, short_prices = get_closing_prices(closing_prices, self.matching_method)
+        is_long = np.array([pos.is_long() for pos in positions], dtype=bool)
+        prices = np.where(is_long, long_prices[price_idx[marked]], short_prices[price_idx[marked]])
+        rates = closing_prices["rate_to_usd"].to_numpy(dtype="float64")[price_idx[marked]]
+        contract_sizes = np.array([pos.contract_size for pos in positions], dtype="float64")
+        value_scales = np.array([pos.value_scale or 1 for pos in positions], dtype="float64")
+        quantity = np.array([pos.open_positions.quantity for pos in positions], dtype="float64")
+
+        # as Position.update_unrealised_pnl
+        if self.netting_engine == "avg_price":
+            avg_price = np.array([pos.open_positions.price for pos in positions], dtype="float64")
+            unrealised = quantity * (prices - avg_price) * contract_sizes
         else:
-            pass
+            cost = np.array([pos.open_positions.cost for pos in positions], dtype="float64")
+            unrealised = (prices * quantity - cost) * contract_sizes
+        unrealised = unrealised / value_scales * rates
+
+        previous = np.array([pos.unrealised_pnl for pos in positions], dtype="float64")
+        for pos, pnl in zip(positions, unrealised.tolist()):
+            pos.unrealised_pnl = pnl
+        self.unrealised_pnl += (unrealised.sum() - previous.sum()).item()
 
     def modify_position(
             self,
@@ -90,7 +149,7 @@ class Portfolio:
             self.inventory_dollars[
                 event.contract_unit_of_measure
             ] = self.inventory_dollars.get(event.contract_unit_of_measure, 0) + (
-                    (trade.contract_qty * trade.price * event.contract_size)
+                    to_price(trade.contract_qty * trade.price * event.contract_size, pos.price_scale)
                     * trade.rate_to_usd
             )
 
@@ -102,10 +161,20 @@ class Portfolio:
                     trade.source, trade.symbol_id, trade.account_id
                 ] = pos
                 self.positions.pop((event.source, event.symbol_id, trade.account_id))
+                self.unrealised_pnl -= pos.unrealised_pnl
+                pos.unrealised_pnl = 0
+                self.remove_symbol_position((event.source, event.symbol_id, trade.account_id))
 
         else:
             pass
 
+    def remove_symbol_position(self, key):
+        source, symbol_id, account = key
+        symbol_positions = self.symbol_positions.get(symbol_id, {})
+        symbol_positions.pop(key, None)
+        if len(symbol_positions) == 0:
+            self.symbol_positions.pop(symbol_id, None)
+
     def get_positions_for_account(self, account_id):
         return {k: v for (k, v) in self.positions.items() if k[2] == account_id}
 
@@ -137,6 +206,8 @@ class Portfolio:
                     currency=event.currency,
                     contract_unit_of_measure=event.contract_unit_of_measure,
                     netting_engine=self.netting_engine,
+                    price_scale=get_price_scale(event),
+                    quantity_scale=get_quantity_scale(event),
                 )
             self.total_net_position += trade.contract_qty
             self.inventory_contracts[event.contract_unit_of_measure] = (
@@ -147,11 +218,12 @@ class Portfolio:
             self.inventory_dollars[
                 event.contract_unit_of_measure
             ] = self.inventory_dollars.get(event.contract_unit_of_measure, 0) + (
-                    (trade.contract_qty * trade.price * event.contract_size)
+                    to_price(trade.contract_qty * trade.price * event.contract_size, pos.price_scale)
                     * event.rate_to_usd
             )
 
             self.positions[event.source, trade.symbol_id, trade.account_id] = pos
+            self.symbol_positions.setdefault(trade.symbol_id, {})[event.source, trade.symbol_id, trade.account_id] = pos
             pos.on_trade(trade.contract_qty, trade.price, event.rate_to_usd)
 
             if self.calc_upnl:
@@ -166,15 +238,409 @@ class Portfolio:
             event,
             commission=0
     ):
+        notional = to_price(trade.contract_qty * event.contract_size * trade.price, get_price_scale(event))
         if sign(trade.contract_qty) == 1:  # long
             self.cur_cash -= (
-                                     (trade.contract_qty * event.contract_size * trade.price) * event.rate_to_usd
+                                     notional * event.rate_to_usd
                              ) + commission
         else:  # short
             self.cur_cash += (
-                                     (trade.contract_qty * event.contract_size * trade.price) * event.rate_to_usd
+                                     notional * event.rate_to_usd
                              ) - commission
         if (event.source, event.symbol_id, trade.account_id) not in self.positions:
             self.add_position(trade, event)
         else:
             self.modify_position(trade, event)
+
+
+class ArrayPosition:
+    """
+    Read only view of one (account, instrument) slot of an ArrayPortfolio, with the attributes strategies and exit
+    strategies use on a Position. exit_attr lives on the view and is reset when the position is reopened.
+    """
+    __slots__ = ("portfolio", "account_idx", "instrument_idx", "exit_attr")
+
+    def __init__(self, portfolio, account_idx, instrument_idx):
+        self.portfolio = portfolio
+        self.account_idx: int = account_idx
+        self.instrument_idx: int = instrument_idx
+        self.exit_attr: dict = dict()
+
+    def _instrument(self, attr):
+        return self.portfolio.instrument_attrs[self.instrument_idx][attr]
+
+    @property
+    def name(self):
+        return self._instrument("symbol")
+
+    @property
+    def contract_size(self):
+        return self._instrument("contract_size")
+
+    @property
+    def price_increment(self):
+        return self._instrument("price_increment")
+
+    @property
+    def price_scale(self):
+        return self._instrument("price_scale")
+
+    @property
+    def tick_size(self):
+        return tick_size(self.price_increment, self.price_scale)
+
+    @property
+    def currency(self):
+        return self._instrument("currency")
+
+    @property
+    def contract_unit_of_measure(self):
+        return self._instrument("contract_unit_of_measure")
+
+    @property
+    def netting_engine(self):
+        return self.portfolio.netting_engine
+
+    @property
+    def net_position(self):
+        return self.portfolio.net_qty[self.account_idx, self.instrument_idx].item()
+
+    @property
+    def realised_pnl(self):
+        return self.portfolio.realised[self.account_idx, self.instrument_idx].item()
+
+    @property
+    def unrealised_pnl(self):
+        return self.portfolio.unrealised[self.account_idx, self.instrument_idx].item()
+
+    @property
+    def open_positions(self):
+        if self.net_position == 0:
+            return None
+        return OpenPosition(
+            self.net_position, self.get_price(), cum_cost=self.portfolio.cost[self.account_idx, self.instrument_idx].item()
+        )
+
+    def get_price(self):
+        net_position = self.net_position
+        if net_position == 0:
+            return 0
+        return self.portfolio.cost[self.account_idx, self.instrument_idx].item() / net_position
+
+    def calculate_net_contracts(self):
+        return self.net_position
+
+    def is_long(self):
+        return self.net_position > 0
+
+
+class ArrayPositions:
+    """
+    Mapping of (source, symbol_id, account) to ArrayPosition for every open slot of an ArrayPortfolio,
+    so that code written against Portfolio.positions works unchanged.
+    """
+    __slots__ = ("portfolio",)
+
+    def __init__(self, portfolio):
+        self.portfolio = portfolio
+
+    def __len__(self):
+        return self.portfolio.open_count
+
+    def _index(self, key):
+        source, symbol_id, account = key
+        instrument_idx = self.portfolio.instrument_ids.get((source, symbol_id))
+        account_idx = self.portfolio.account_ids.get(account)
+        if instrument_idx is None or account_idx is None:
+            return None
+        if self.portfolio.net_qty[account_idx, instrument_idx] == 0:
+            return None
+        return account_idx, instrument_idx
+
+    def __contains__(self, key):
+        return self._index(key) is not None
+
+    def __getitem__(self, key):
+        index = self._index(key)
+        if index is None:
+            raise KeyError(key)
+        return self.portfolio.get_position_view(*index)
+
+    def get(self, key, default=None):
+        index = self._index(key)
+        return default if index is None else self.portfolio.get_position_view(*index)
+
+    def keys(self):
+        accounts = list(self.portfolio.account_ids.keys())
+        instruments = list(self.portfolio.instrument_ids.keys())
+        return [
+            (*instruments[j], accounts[i])
+            for (i, j) in zip(*np.nonzero(self.portfolio.net_qty))
+        ]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def values(self):
+        return [self[k] for k in self.keys()]
+
+    def items(self):
+        return [(k, self[k]) for k in self.keys()]
+
+
+class ArrayPortfolio:
+    """
+    Portfolio for many-account, many-instrument simulations that holds net quantity, cost, realised and
+    unrealised pnl in (account x instrument) numpy arrays. Accounts and instruments are given integer ids as they
+    first trade, and the arrays grow by doubling.
+
+    Positions are netted at average cost, which is what allows a price event to revalue every account holding
+    the instrument in one vectorized update, so avg_price is the only netting_engine it accepts, and pnl is that of
+    Portfolio(netting_engine="avg_price"). closed_positions holds a view of each closed slot until it reopens, its
+    realised pnl still readable. Plug it in with
+    Backtester(portfolio=ArrayPortfolio) or `portfolio: array_portfolio` and `netting_engine: avg_price` in the
+    pipeline config.
+    """
+
+    def __init__(
+            self,
+            cash=0,
+            netting_engine="avg_price",
+            matching_method="mid",
+            currency="USD",
+            calc_upnl=False,
+            accounts_capacity=16,
+            instruments_capacity=16,
+    ):
+        if netting_engine != "avg_price":
+            raise ValueError(
+                f"ArrayPortfolio nets positions at average cost, netting_engine must be avg_price not {netting_engine}"
+            )
+        self.init_cash = cash
+        self.cur_cash = cash
+        self.currency = currency
+        self.equity = cash
+        self.realised_pnl = 0
+        self.unrealised_pnl = 0
+        self.total_net_position = 0
+        self.inventory_contracts = {}
+        self.inventory_dollars = {}
+        self.price_handler = None
+        self.netting_engine = netting_engine
+        self.matching_method = matching_method
+        self.calc_upnl = calc_upnl
+
+        self.account_ids: Dict[Any, int] = {}
+        self.instrument_ids: Dict[Tuple[Any, Any], int] = {}
+        # symbol_id to instrument ids, events are priced by symbol_id like Portfolio.update_portfolio
+        self.symbol_instruments: Dict[Any, list] = {}
+        self.instrument_attrs: list = []
+
+        shape = (accounts_capacity, instruments_capacity)
+        self.net_qty: np.ndarray = np.zeros(shape)
+        self.cost: np.ndarray = np.zeros(shape)
+        self.realised: np.ndarray = np.zeros(shape)
+        self.unrealised: np.ndarray = np.zeros(shape)
+        self.contract_sizes: np.ndarray = np.zeros(instruments_capacity)
+        # ticks per unit of price, 1 for instruments priced as floats
+        self.price_scales: np.ndarray = np.ones(instruments_capacity)
+
+        self.open_count: int = 0
+        self.positions = ArrayPositions(self)
+        self.closed_positions = {}
+        self._position_views: Dict[Tuple[int, int], ArrayPosition] = {}
+
+    def _grow(self, accounts, instruments):
+        rows, cols = self.net_qty.shape
+        if accounts <= rows and instruments <= cols:
+            return
+        shape = (max(rows, 1) * 2 if accounts > rows else rows, max(cols, 1) * 2 if instruments > cols else cols)
+        for attr in ("net_qty", "cost", "realised", "unrealised"):
+            grown = np.zeros(shape)
+            grown[:rows, :cols] = getattr(self, attr)
+            setattr(self, attr, grown)
+        contract_sizes = np.zeros(shape[1])
+        contract_sizes[:cols] = self.contract_sizes
+        self.contract_sizes = contract_sizes
+        price_scales = np.ones(shape[1])
+        price_scales[:cols] = self.price_scales
+        self.price_scales = price_scales
+
+    def get_account_idx(self, account):
+        account_idx = self.account_ids.get(account)
+        if account_idx is None:
+            account_idx = self.account_ids[account] = len(self.account_ids)
+            self._grow(len(self.account_ids), len(self.instrument_ids))
+        return account_idx
+
+    def get_instrument_idx(self, trade, event):
+        key = (event.source, trade.symbol_id)
+        instrument_idx = self.instrument_ids.get(key)
+        if instrument_idx is None:
+            instrument_idx = self.instrument_ids[key] = len(self.instrument_ids)
+            self._grow(len(self.account_ids), len(self.instrument_ids))
+            self.symbol_instruments.setdefault(trade.symbol_id, []).append(instrument_idx)
+            self.instrument_attrs.append({
+                "symbol": trade.symbol,
+                "contract_size": event.contract_size,
+                "price_increment": event.price_increment,
+                "currency": event.currency,
+                "contract_unit_of_measure": event.contract_unit_of_measure,
+                "price_scale": get_price_scale(event),
+            })
+            self.contract_sizes[instrument_idx] = event.contract_size
+            self.price_scales[instrument_idx] = get_price_scale(event) or 1
+        return instrument_idx
+
+    def get_position_view(self, account_idx, instrument_idx):
+        view = self._position_views.get((account_idx, instrument_idx))
+        if view is None:
+            view = self._position_views[account_idx, instrument_idx] = ArrayPosition(self, account_idx, instrument_idx)
+        return view
+
+    def calc_net_of_account_positions_for_symbol(self, symbol_id, venue):
+        instrument_idx = self.instrument_ids.get((venue, symbol_id))
+        if instrument_idx is None:
+            return []
+        net_qty = self.net_qty[:len(self.account_ids), instrument_idx]
+        return net_qty[net_qty != 0].tolist()
+
+    def get_positions_for_account(self, account_id):
+        return {k: v for (k, v) in self.positions.items() if k[2] == account_id}
+
+    def update_portfolio(self, event):
+        if not event.has_price:
+            return
+
+        accounts = len(self.account_ids)
+        for instrument_idx in self.symbol_instruments.get(event.symbol_id, []):
+            net_qty = self.net_qty[:accounts, instrument_idx]
+            long_price = event.get_price(is_long=True, matching_method=self.matching_method)
+            short_price = event.get_price(is_long=False, matching_method=self.matching_method)
+            price = np.where(net_qty > 0, long_price, short_price) if long_price != short_price else long_price
+
+            unrealised = (
+                    (price * net_qty - self.cost[:accounts, instrument_idx])
+                    * self.contract_sizes[instrument_idx] * event.rate_to_usd / self.price_scales[instrument_idx]
+            )
+            self.unrealised_pnl += (unrealised.sum() - self.unrealised[:accounts, instrument_idx].sum()).item()
+            self.unrealised[:accounts, instrument_idx] = unrealised
+
+    def mark_to_market(self, closing_prices):
+        """
+        Revalue every open position at the session's closing prices in one vectorized pass, each at the price
+        update_portfolio would mark its side at, instruments without a closing price keep their last mark.
+        """
+        accounts, instruments = len(self.account_ids), len(self.instrument_ids)
+        if accounts == 0 or instruments == 0:
+            return
+
+        closing_prices = closing_prices.drop_duplicates(subset="symbol_id", keep="last")
+        long_prices, short_prices = np.full(instruments, np.nan), np.full(instruments, np.nan)
+        rates = np.ones(instruments)
+        for symbol_id, long_price, short_price, rate_to_usd in zip(
+                closing_prices["symbol_id"].tolist(),
+                *[prices.tolist() for prices in get_closing_prices(closing_prices, self.matching_method)],
+                closing_prices["rate_to_usd"].tolist(),
+        ):
+            for instrument_idx in self.symbol_instruments.get(symbol_id, []):
+                long_prices[instrument_idx] = long_price
+                short_prices[instrument_idx] = short_price
+                rates[instrument_idx] = rate_to_usd
+
+        marked = np.flatnonzero(~np.isnan(long_prices))
+        if marked.size == 0:
+            return
+
+        net_qty = self.net_qty[:accounts, marked]
+        prices = np.where(net_qty > 0, long_prices[marked], short_prices[marked])
+        unrealised = (
+                (prices * net_qty - self.cost[:accounts, marked])
+                * (self.contract_sizes[marked] * rates[marked] / self.price_scales[marked])
+        )
+        self.unrealised_pnl += (unrealised.sum() - self.unrealised[:accounts, marked].sum()).item()
+        self.unrealised[:accounts, marked] = unrealised
+
+    def on_trade(
+            self,
+            trade,
+            event,
+            commission=0
+    ):
+        notional = to_price(trade.contract_qty * event.contract_size * trade.price, get_price_scale(event))
+        if sign(trade.contract_qty) == 1:  # long
+            self.cur_cash -= (
+                                     notional * event.rate_to_usd
+                             ) + commission
+        else:  # short
+            self.cur_cash += (
+                                     notional * event.rate_to_usd
+                             ) - commission
+
+        account_idx = self.get_account_idx(trade.account_id)
+        instrument_idx = self.get_instrument_idx(trade, event)
+        idx = (account_idx, instrument_idx)
+
+        quantity, price = trade.contract_qty, trade.price
+        net_qty, cost = self.net_qty[idx].item(), self.cost[idx].item()
+
+        key = (event.source, trade.symbol_id, trade.account_id)
+        if net_qty == 0:  # open
+            self.net_qty[idx] = quantity
+            self.cost[idx] = price * quantity
+            self.open_count += 1
+            self._position_views.pop(idx, None)
+            self.closed_positions.pop(key, None)
+        elif sign(net_qty) == sign(quantity):  # extend
+            # the average price is truncated to an integer, as Position.update_realised_pnl_avg_price does
+            self.net_qty[idx] = net_qty + quantity
+            self.cost[idx] = int((cost + price * quantity) / (net_qty + quantity)) * (net_qty + quantity)
+        else:  # reduce, close or invert
+            avg_price = cost / net_qty
+            closed_qty = -quantity if abs(quantity) <= abs(net_qty) else net_qty
+            # float priced instruments have their realised pnl scaled as Position's legacy prices and quantities
+            pnl_scale = self.price_scales[instrument_idx].item() if get_price_scale(event) else LEGACY_VALUE_SCALE
+            realised_pnl = closed_qty * (price - avg_price) * event.contract_size * trade.rate_to_usd / pnl_scale
+            self.realised[idx] += realised_pnl
+            self.realised_pnl += realised_pnl
+
+            remaining = net_qty + quantity
+            self.net_qty[idx] = remaining
+            if remaining == 0:
+                self.cost[idx] = 0
+                self.open_count -= 1
+                self.closed_positions[key] = self.get_position_view(account_idx, instrument_idx)
+            elif sign(remaining) == sign(net_qty):
+                self.cost[idx] = avg_price * remaining
+            else:
+                self.cost[idx] = price * remaining
+
+        self.equity = self.realised_pnl + self.init_cash
+        self.total_net_position += quantity
+
+        self.inventory_contracts[event.contract_unit_of_measure] = (
+                self.inventory_contracts.get(event.contract_unit_of_measure, 0)
+                + quantity
+        )
+        self.inventory_dollars[
+            event.contract_unit_of_measure
+        ] = self.inventory_dollars.get(event.contract_unit_of_measure, 0) + (
+                (quantity * price * event.contract_size) / self.price_scales[instrument_idx].item()
+                * trade.rate_to_usd
+        )
+
+        if self.calc_upnl:
+            self.update_portfolio(trade)
+
+        if self.net_qty[idx] == 0 and self.unrealised[idx] != 0:
+            self.unrealised_pnl -= self.unrealised[idx].item()
+            self.unrealised[idx] = 0
+
+
+def determine_portfolio_constructor(portfolio_type: str) -> Type:
+    if "portfolio" == portfolio_type:
+        return Portfolio
+    elif "array_portfolio" == portfolio_type:
+        return ArrayPortfolio
+    else:
+        raise ValueError(f"Invalid portfolio type {portfolio_type}")
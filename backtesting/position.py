@@ -1,7 +1,9 @@
-import operator
+from collections import deque
 
 import numpy as np
 
+from backtesting.fixed_point import LEGACY_VALUE_SCALE, to_lots, from_lots, to_price, tick_size, value_scale
+
 
 # todo: abstract position away, make sure you keep the portfolio-position relationship
 class Position:
@@ -23,6 +25,10 @@ class Position:
         "exit_attr",
         "tighten_cost",
         "notional_rejected",
+        "price_scale",
+        "quantity_scale",
+        "value_scale",
+        "net_lots",
     )
 
     def __init__(
@@ -33,6 +39,8 @@ class Position:
             netting_engine="fifo",
             currency=None,
             contract_unit_of_measure=None,
+            price_scale=None,
+            quantity_scale=None,
     ):
         self.name = name
         self.price_increment = price_increment
@@ -48,23 +56,26 @@ class Position:
         self.notional_traded = 0
         self.notional_rejected = 0
         self.netting_engine = netting_engine
-        self.open_positions: list = [] if self.netting_engine in [
+        self.open_positions: LotBook = LotBook(lifo=self.netting_engine == "lifo") if self.netting_engine in [
             "fifo",
             "lifo",
         ] else None  # noqa
         self.exit_attr: dict = dict()
         self.tighten_cost: int = 0
+        # ticks per unit of price when prices are fixed point, None when they are floats
+        self.price_scale = price_scale
+        # lots per contract when prices are fixed point, open lots, cost and pnl are held in lots
+        self.quantity_scale = quantity_scale
+        self.value_scale = value_scale(price_scale, quantity_scale)
+        self.net_lots: int = 0
+
+    @property
+    def tick_size(self):
+        return tick_size(self.price_increment, self.price_scale)
 
     def get_price(self):
         if self.netting_engine in ["fifo", "lifo"]:
-            if self.open_positions.__len__() != 0:
-                return np.average(
-                    [p.price for p in self.open_positions],
-                    weights=[p.quantity for p in self.open_positions],
-                )
-                # return np.mean([p.price for p in self.open_positions])
-            else:
-                return 0
+            return self.open_positions.average_price()
         elif self.netting_engine == "avg_price":
             if self.open_positions is not None:
                 # todo: when using fifo/lifo, open_positions is a list of objects of type Position
@@ -74,10 +85,17 @@ class Position:
                 return 0
 
     def on_trade(self, quantity, price, rate_to_usd):
+        if self.price_scale:
+            quantity = to_lots(quantity, self.quantity_scale)
+            self.net_lots += quantity
+            # net_position stays in contracts for strategies, and reaches exactly 0 when the lots do
+            self.net_position = from_lots(self.net_lots, self.quantity_scale)
+        else:
+            self.net_position += quantity
         self.no_of_trades += 1
-        self.net_position += quantity
-        self.notional_traded += abs(price * quantity * self.contract_size) * rate_to_usd
-        self.notional_traded_net += price * quantity * self.contract_size * rate_to_usd
+        notional = to_price(price * quantity * self.contract_size, self.value_scale)
+        self.notional_traded += abs(notional) * rate_to_usd
+        self.notional_traded_net += notional * rate_to_usd
         return self.update_realised_pnl(OpenPosition(quantity, price), rate_to_usd)
 
     def calculate_net_contracts(self):
@@ -86,12 +104,6 @@ class Position:
     def is_long(self):
         return self.calculate_net_contracts() > 0
 
-    def apply_netting(self, open_positions):
-        if self.netting_engine == "lifo":
-            return reversed(open_positions)
-        else:
-            return open_positions
-
     def update_realised_pnl(self, new_position, rate_to_usd):
         if self.netting_engine == 'avg_price':
             pnl = self.update_realised_pnl_avg_price(new_position, rate_to_usd)
@@ -103,31 +115,25 @@ class Position:
         return pnl
 
     def update_realised_pnl_ordered(self, new_position, rate_to_usd):
-        qty = new_position.quantity
         old_pnl = self.realised_pnl
-        while qty != 0:
-            open_positions = [
-                p for p in self.open_positions if p.is_long != new_position.is_long
-            ]
-            if len(open_positions) > 0:
-                op = operator.ge if new_position.is_long else operator.le
-                for i, pos in enumerate(self.apply_netting(open_positions)):
-                    qty += pos.quantity
-                    if op(qty, 0):  # open position[i] fully filled
-                        pnl = (pos.quantity * (new_position.price - pos.price)) * self.contract_size
-                        self.realised_pnl += pnl * rate_to_usd
-                        new_position.quantity += pos.quantity
-                        self.open_positions.pop(0)
-                    else:  # new_position fully filled
-                        pnl = ((new_position.quantity * -1) * (new_position.price - pos.price)) * self.contract_size
-                        self.realised_pnl += pnl * rate_to_usd
-                        pos.quantity += new_position.quantity
-                        pos.cost = pos.price * pos.quantity
-                        qty = 0
-                        break
-            else:
-                self.open_positions.append(new_position)
-                break
+        lots: LotBook = self.open_positions
+        # open lots are always on the same side, so a trade either nets against them or extends the position
+        while new_position.quantity != 0 and len(lots) != 0 and lots.peek().is_long != new_position.is_long:
+            pos = lots.peek()
+            if abs(pos.quantity) <= abs(new_position.quantity):  # open position fully filled
+                pnl = (pos.quantity * (new_position.price - pos.price)) * self.contract_size
+                self.realised_pnl += to_price(pnl, self.value_scale) * rate_to_usd
+                new_position.quantity += pos.quantity
+                lots.consume()
+            else:  # new_position fully filled
+                pnl = ((new_position.quantity * -1) * (new_position.price - pos.price)) * self.contract_size
+                self.realised_pnl += to_price(pnl, self.value_scale) * rate_to_usd
+                lots.fill(new_position.quantity)
+                new_position.quantity = 0
+
+        if new_position.quantity != 0:
+            new_position.cost = new_position.price * new_position.quantity
+            lots.append(new_position)
         return self.realised_pnl - old_pnl
 
     def update_realised_pnl_avg_price(self, new_position, rate_to_usd):
@@ -165,7 +171,8 @@ class Position:
                 realised_qty = self.open_positions.quantity * -1
                 self.open_positions = OpenPosition(quantity, new_position.price)
 
-            pnl = ((realised_qty * price_dif) * self.contract_size) / 100000000
+            pnl = (realised_qty * price_dif) * self.contract_size
+            pnl = to_price(pnl, self.value_scale or LEGACY_VALUE_SCALE)
 
             self.realised_pnl += pnl * rate_to_usd
 
@@ -174,25 +181,107 @@ class Position:
     def update_unrealised_pnl(self, evt_price, rate_to_usd):
         self.unrealised_pnl = 0
         if self.netting_engine in ["fifo", "lifo"]:
-            for p in self.open_positions:
-                open_p_unrealised_pnl = (p.quantity * (evt_price - p.price)) * self.contract_size
-                self.unrealised_pnl += open_p_unrealised_pnl * rate_to_usd
+            lots: LotBook = self.open_positions
+            open_p_unrealised_pnl = (evt_price * lots.quantity - lots.cost) * self.contract_size
+            self.unrealised_pnl += to_price(open_p_unrealised_pnl, self.value_scale) * rate_to_usd
         elif self.netting_engine == "avg_price":
             if self.open_positions:
                 # todo: when using fifo/lifo, open_positions is a list of objects of type Position
                 #       if avg_price, then open positions is a list of 1 element. but need to make that clearer
                 open_p_unrealised_pnl = (self.open_positions.quantity * (evt_price - self.open_positions.price)) * self.contract_size
-                self.unrealised_pnl += open_p_unrealised_pnl * rate_to_usd
+                self.unrealised_pnl += to_price(open_p_unrealised_pnl, self.value_scale) * rate_to_usd
             else:
                 self.unrealised_pnl = 0
 
 
+class LotBook:
+    """
+    Open lots of a position, oldest first.
+    Netting takes lots from the front under fifo and from the back under lifo, both in O(1).
+
+    The signed quantity, cost (price * quantity) and running cost of the lots are kept up to date as lots are
+    added, filled and consumed, so average prices never walk the book. set_running_price marks every lot in the
+    book at a price by recording the lot sequence number it applies below, rather than updating each lot.
+    """
+    __slots__ = ("lots", "lifo", "quantity", "cost", "running_cost", "running_price", "running_seq", "seq")
+
+    def __init__(self, lots=(), lifo=False):
+        self.lots: deque = deque()
+        self.lifo: bool = lifo
+        self.quantity = 0
+        self.cost = 0
+        self.running_cost = 0
+        self.running_price = None
+        self.running_seq: int = 0
+        self.seq: int = 0
+        for lot in lots:
+            self.append(lot)
+
+    def __len__(self):
+        return len(self.lots)
+
+    def __iter__(self):
+        return iter(self.lots)
+
+    def __getitem__(self, index):
+        return self.lots[index]
+
+    def lot_running_price(self, lot):
+        return self.running_price if lot.seq < self.running_seq else lot.price
+
+    def append(self, lot):
+        lot.seq = self.seq
+        self.seq += 1
+        self.lots.append(lot)
+        self.quantity += lot.quantity
+        self.cost += lot.price * lot.quantity
+        self.running_cost += lot.price * lot.quantity
+
+    def peek(self):
+        return self.lots[-1] if self.lifo else self.lots[0]
+
+    def fill(self, quantity):
+        # partially fill the next lot to be netted
+        lot = self.peek()
+        lot.quantity += quantity
+        lot.cost = lot.price * lot.quantity
+        self.quantity += quantity
+        self.cost += lot.price * quantity
+        self.running_cost += self.lot_running_price(lot) * quantity
+
+    def consume(self):
+        lot = self.lots.pop() if self.lifo else self.lots.popleft()
+        if len(self.lots) == 0:
+            # reset rather than subtract, so float error doesn't build up across positions
+            self.quantity = 0
+            self.cost = 0
+            self.running_cost = 0
+        else:
+            self.quantity -= lot.quantity
+            self.cost -= lot.price * lot.quantity
+            self.running_cost -= self.lot_running_price(lot) * lot.quantity
+        return lot
+
+    def set_running_price(self, price):
+        self.running_price = price
+        self.running_seq = self.seq
+        self.running_cost = price * self.quantity
+
+    def average_price(self):
+        return self.cost / self.quantity if self.quantity != 0 else 0
+
+    def running_average_price(self):
+        return self.running_cost / self.quantity if self.quantity != 0 else 0
+
+
 class OpenPosition:
     def __init__(self, quantity, price, cum_cost=None):
         self.quantity = quantity
         self.is_long = True if self.quantity > 0 else False
         self.price = price
         self.cost = (price * quantity) if cum_cost is None else cum_cost
+        # order the lot was added to its LotBook
+        self.seq = None
 
     @classmethod
     def create_position_from_open_position_snapshot(cls, row, contract_size, risk=1):
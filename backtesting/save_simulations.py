@@ -1,9 +1,14 @@
 import datetime as dt
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 
 from backtesting.writers import Writer
+from backtesting.writers.writer import format_trading_session
+
+# partitions written at once by save_simulation
+DEFAULT_WRITE_WORKERS = 4
 
 
 def construct_path(datasource_label: str, date: dt.date = None) -> str:
@@ -63,6 +68,7 @@ def save_simulation(
         split_results_by: str = None,
         split_results_freq: str = None,
         file: str = None,
+        write_workers: int = DEFAULT_WRITE_WORKERS,
 ):
     logger = logging.getLogger("save")
 
@@ -71,33 +77,42 @@ def save_simulation(
             split_results_by = parse_groupby_cols(
                 df, split_results_by, split_results_freq
             )
-            grps = df.reset_index().groupby(by=split_results_by)
-            for by, grp in grps:
-                cols = [by] if type(by) != list else by
-                date = (
-                    [x for x in cols if isinstance(x, dt.datetime)][0]
-                    if any([x for x in cols if isinstance(x, dt.datetime)])
-                    else None
-                )
-                file = construct_filename(
-                    *[x for x in cols if x != date],
-                    date=date.date(),
+            df = df.reset_index()
+            partitions = []
+            for by, rows in df.groupby(by=split_results_by).indices.items():
+                cols = list(by) if isinstance(by, tuple) else [by]
+                date = next((x for x in cols if isinstance(x, dt.datetime)), None)
+                date = date.date() if date is not None else None
+                partition_file = construct_filename(
+                    *[x for x in cols if not isinstance(x, dt.datetime)],
+                    date=date,
                     task="simulation-output-{}-{}".format(uid, version),
                     file=file,
                 )
-                logger.info(file)
+                partitions.append((rows, partition_file, date))
 
-                logger.info(date)
-                logger.info(mode)
+            # formatted once for the whole frame, rather than row by row in every partition's write
+            if "trading_session" in df.columns:
+                df["trading_session"] = format_trading_session(df["trading_session"])
 
+            def write(rows, partition_file, date):
+                logger.info(f"{partition_file}, (date) {date}, (mode) {mode}")
                 writer.write_results(
-                    results=grp.copy(),
+                    results=df.take(rows),
                     store_index=store_index,
                     mode=mode,
-                    file=file,
-                    date=date.date(),
+                    file=partition_file,
+                    date=date,
+                    uid=uid,
+                    version=version,
                 )
 
+            # partitions sharing a file are written one after another
+            workers = max(write_workers, 1) if file is None else 1
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for future in [executor.submit(write, *partition) for partition in partitions]:
+                    future.result()
+
         else:
             datestr = dt.datetime.now().strftime("%Y-%m-%d")
             file = construct_filename(
@@ -109,4 +124,6 @@ def save_simulation(
                 store_index=store_index,
                 mode=mode,
                 file=file,
+                uid=uid,
+                version=version,
             )
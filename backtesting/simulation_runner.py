@@ -14,7 +14,11 @@ from backtesting.backtesting_result import BackTestingResults
 from backtesting.simulator.simulator import Simulator
 from backtesting.simulator.simulator_pool import SimulatorPool
 from backtesting.writers import create_writer, Writer
-from backtesting.subscriptions_cache import create_subscriptions_cache, SubscriptionsCache
+from backtesting.subscriptions_cache import (
+    create_subscriptions_cache,
+    SubscriptionsCache,
+    DEFAULT_MEMORY_CACHE_BYTES,
+)
 from backtesting.subscriptions.subscription import Subscription
 from backtesting.subscriptions import create_subscription
 
@@ -48,13 +52,15 @@ class SimulationRunner:
         self.logger.debug("initialise writer and matching engine")
         writer: Writer = create_writer(
             config.output.datastore,
-            config.output.datastore_parameters
+            config.output.datastore_parameters,
+            config.output.write_queue_size,
         )
         subscriptions_cache: SubscriptionsCache = create_subscriptions_cache(
             config.subscriptions_cache['datastore'],
             config.subscriptions_cache['datastore_parameters'],
             config.subscriptions_cache['enable_cache'],
             config.subscriptions_cache['mode'],
+            config.subscriptions_cache.get('memory_cache_bytes', DEFAULT_MEMORY_CACHE_BYTES),
         )
         matching_engine: AbstractMatchingEngine = create_matching_engine(
             config.matching_engine_params, config.matching_method
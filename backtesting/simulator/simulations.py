@@ -9,6 +9,7 @@ from backtesting.config.backtesting_config import BackTestingConfig
 from backtesting.config.simulation_config import SimulationConfig
 from backtesting.event_stream import EventStream
 from backtesting.matching_engine import AbstractMatchingEngine
+from backtesting.portfolio import determine_portfolio_constructor
 from backtesting.risk_manager import AbstractRiskManager, create_risk_manager
 from backtesting.simulator.simulation_plan import SimulationPlan
 from backtesting.strategy import AbstractStrategy, create_strategy
@@ -358,5 +359,14 @@ class Simulations:
                 store_md_snapshot=config.store_md_snapshot,
                 store_trade_snapshot=config.store_trade_snapshot,
                 store_eod_snapshot=config.store_eod_snapshot,
+                batch_eod=config.batch_eod,
+                portfolio=determine_portfolio_constructor(config.portfolio_type),
+                statistics_params={
+                    "spill_dir": simulation_config.output.spill_dir,
+                    "spill_rows": simulation_config.output.spill_rows,
+                    "online_aggregation": simulation_config.output.online_aggregation,
+                    "resample_rule": simulation_config.output.resample_rule,
+                    "event_features": simulation_config.output.event_features,
+                },
             ),
         )
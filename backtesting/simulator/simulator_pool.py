@@ -19,14 +19,14 @@ from .simulation_plan import SimulationPlan
 from .simulations import Simulations
 from ..config.backtesting_config import BackTestingConfig
 from ..event_stream import EventStream
-from ..subscriptions.subscription import Subscription
+from ..subscriptions.subscription import Subscription, concat_frames, set_dtypes
 
 from ..matching_engine import AbstractMatchingEngine
-from ..backtesting_result import BackTestingResults
+from ..backtesting_result import BackTestingResults, reduce_results
 from ..save_simulations import save_simulation
 from ..simulator.simulator import Simulator
 from ..writers import Writer
-from ..subscriptions_cache import SubscriptionsCache
+from ..subscriptions_cache import SubscriptionsCache, SubscriptionFrameCache, get_frame_cache
 
 
 class SimulatorPool(Simulator):
@@ -65,7 +65,30 @@ class SimulatorPool(Simulator):
     def load_subscription_events(self, plan, sub_name, sub_obj):
 
         interval = '1d'
-        save = False
+
+        # mode 'w' reloads every plan's events from the subscription, so it must not be served from memory either
+        if plan.subscriptions_cache.mode == 'w':
+            return self._load_subscription_events(plan, sub_name, sub_obj, interval)
+
+        # plans executed by the same worker frequently share a date range, so check memory before disk or api
+        frame_cache: SubscriptionFrameCache = get_frame_cache(plan.subscriptions_cache.memory_cache_bytes)
+        key = frame_cache.build_key(
+            subscription=sub_name,
+            instruments=plan.instruments,
+            start_date=plan.start_date,
+            end_date=plan.end_date,
+            interval=interval,
+            parameters=frame_cache.subscription_parameters(sub_obj)
+        )
+
+        subscription_events = frame_cache.get(key)
+        if subscription_events is None:
+            subscription_events = self._load_subscription_events(plan, sub_name, sub_obj, interval)
+            frame_cache.put(key, subscription_events)
+
+        return subscription_events
+
+    def _load_subscription_events(self, plan, sub_name, sub_obj, interval):
 
         if plan.subscriptions_cache.enable_cache and plan.subscriptions_cache.mode != 'w':
             subscription_events, missing_dates = plan.subscriptions_cache.get(
@@ -76,6 +99,8 @@ class SimulatorPool(Simulator):
                 interval=interval
             )
 
+            subscription_events = set_dtypes(subscription_events, sub_obj.schema)
+
             if missing_dates:
                 missing_date_ranges = self.get_missing_date_ranges(missing_dates)
 
@@ -96,7 +121,7 @@ class SimulatorPool(Simulator):
                         interval=interval,
                     )
 
-                    subscription_events = pd.concat([subscription_events, _subscription_events])
+                    subscription_events = concat_frames([subscription_events, _subscription_events])
 
         else:
             subscription_events = sub_obj.get(
@@ -194,18 +219,30 @@ class SimulatorPool(Simulator):
                 #     f"[{plan.name}/{plan.hash}], run_day_simulation complete for date: {day_date}, instruments {plan.instruments}."
                 # )
 
-            if len(plan.backtester.statistics.events) != 0:
-                df: pd.DataFrame = plan.backtester.statistics.events_to_df(
-                    event_features=plan.output.event_features,
-                    upnl_reversals=upnl_reversals,
-                )
-                if plan.output.resample_rule is not None:
-                    df = plan.backtester.statistics.aggregate_returns(
-                        df,
+            logger.debug(f"[{plan.name}/{plan.hash}], subscription frame cache {get_frame_cache().stats()}")
+
+            if len(plan.backtester.statistics) != 0:
+                if plan.output.reduce_results:
+                    df: pd.DataFrame = plan.backtester.statistics.aggregate_partial(
+                        plan.output.resample_rule,
+                        event_features=plan.output.event_features,
+                        upnl_reversals=upnl_reversals,
+                    )
+                elif plan.backtester.statistics.aggregator is not None:
+                    df: pd.DataFrame = plan.backtester.statistics.aggregate_online()
+                elif plan.output.resample_rule is not None:
+                    df: pd.DataFrame = plan.backtester.statistics.aggregate_events(
                         plan.output.resample_rule,
                         event_features=plan.output.event_features,
                         metrics=plan.output.metrics,
+                        upnl_reversals=upnl_reversals,
                     )
+                else:
+                    df: pd.DataFrame = plan.backtester.statistics.events_to_df(
+                        event_features=plan.output.event_features,
+                        upnl_reversals=upnl_reversals,
+                    )
+                plan.backtester.statistics.events.close()
 
                 df = plan.append_strategy_params(df)
 
@@ -260,28 +297,32 @@ class SimulatorPool(Simulator):
             subscriptions: Dict[AnyStr, Subscription],
             results: BackTestingResults,
     ):
-        if config.calculate_cumulative_daily_pnl:
-            self.start_simulator_rolling(
-                config=config,
-                results_cache=results_cache,
-                subscriptions_cache=subscriptions_cache,
-                writer=writer,
-                matching_engine=matching_engine,
-                simulation_configs=simulation_configs,
-                subscriptions=subscriptions,
-                results=results,
-            )
-        else:
-            self.start_simulator_not_rolling(
-                config=config,
-                results_cache=results_cache,
-                subscriptions_cache=subscriptions_cache,
-                writer=writer,
-                matching_engine=matching_engine,
-                simulation_configs=simulation_configs,
-                subscriptions=subscriptions,
-                results=results,
-            )
+        try:
+            if config.calculate_cumulative_daily_pnl:
+                self.start_simulator_rolling(
+                    config=config,
+                    results_cache=results_cache,
+                    subscriptions_cache=subscriptions_cache,
+                    writer=writer,
+                    matching_engine=matching_engine,
+                    simulation_configs=simulation_configs,
+                    subscriptions=subscriptions,
+                    results=results,
+                )
+            else:
+                self.start_simulator_not_rolling(
+                    config=config,
+                    results_cache=results_cache,
+                    subscriptions_cache=subscriptions_cache,
+                    writer=writer,
+                    matching_engine=matching_engine,
+                    simulation_configs=simulation_configs,
+                    subscriptions=subscriptions,
+                    results=results,
+                )
+        finally:
+            # results still queued for a background writer are written before returning
+            writer.flush()
 
     def start_simulator_rolling(
             self,
@@ -460,7 +501,11 @@ class SimulatorPool(Simulator):
                 errors.append(result)
                 logger.error(f"{result}", exc_info=result.payload)
 
-        results_df: pd.DataFrame = pd.concat(results_dfs)
+        if config.output.reduce_results:
+            # partials of the same simulation and group, from plans over different days, merge into one row
+            results_df: pd.DataFrame = reduce_results(results_dfs, config.output.reduce_keys)
+        else:
+            results_df: pd.DataFrame = pd.concat(results_dfs)
 
         # save output
         if config.output.save and not results_df.empty:
@@ -474,5 +519,6 @@ class SimulatorPool(Simulator):
                 split_results_by=config.output.by,
                 split_results_freq=config.output.freq,
                 file=config.output.file,
+                write_workers=config.output.write_workers,
             )
         return SimulationBatchResult(results_df, errors)
@@ -0,0 +1,168 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..statistics.online_aggregator import Sum, Last, Count, Abs_Sum
+
+Max = "max"
+
+# the column of a partial aggregate holding the time of its groups' last events, which orders the last values of
+# partials when they are merged
+LAST_TIMESTAMP = "last_timestamp"
+
+# how the partials of a kind merge
+_merges = {Sum: "sum", Count: "sum", Abs_Sum: "sum", Max: "max", Last: "last"}
+
+
+class EventGroups:
+    """
+    The event_features groups of an events DataFrame, time buckets included, encoded once as an integer code per
+    row, so metrics reduce columns with np.bincount and ufunc.at rather than each grouping the frame again.
+
+    Codes number the groups in the order groupby sorts them, index being the groups' keys. Rows groupby drops,
+    those with missing features, have code -1. A group can be split further by a column with split, which returns
+    codes of the (group, value) pairs that the reductions take in place of the group codes.
+    """
+    __slots__ = (
+        "frame",
+        "codes",
+        "index",
+        "size",
+    )
+
+    def __init__(self, df: pd.DataFrame, event_features: List[Any]):
+        self.frame: pd.DataFrame = df.reset_index()
+        grouped = self.frame.groupby(event_features)
+        sizes = grouped.size()
+        self.index: pd.Index = sizes[sizes > 0].index
+        self.size: int = len(self.index)
+        codes = grouped.ngroup().to_numpy(dtype="float64")
+        self.codes: np.ndarray = np.where(np.isnan(codes), -1, codes).astype("int64")
+
+    def _codes(self, codes: Optional[np.ndarray], size: Optional[int]) -> Tuple[np.ndarray, int]:
+        return (self.codes, self.size) if codes is None else (codes, size)
+
+    def split(self, column: str) -> Tuple[np.ndarray, int, pd.Index]:
+        """
+        Codes of every (group, value of column) pair, pair g, v being g * len(values) + v, values sorted.
+        """
+        values, uniques = pd.factorize(self.frame[column], sort=True)
+        codes = np.where((self.codes >= 0) & (values >= 0), self.codes * len(uniques) + values, -1)
+        return codes, self.size * len(uniques), pd.Index(uniques, name=column)
+
+    def segments(self, kept: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        The kept rows ordered by group, each group's rows staying in order, for ufunc.reduceat: the rows, the
+        start of every group's segment in them and the segment of each row.
+        """
+        kept = np.flatnonzero(kept & (self.codes >= 0))
+        rows = kept[np.argsort(self.codes[kept], kind="stable")]
+        codes = self.codes[rows]
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(rows) else np.empty(0, dtype="int64")
+        segment = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(rows)]))
+        return rows, starts, segment
+
+    def values(self, column: str) -> np.ndarray:
+        return pd.to_numeric(self.frame[column], errors="coerce").to_numpy(dtype="float64")
+
+    def rows(self, codes: np.ndarray = None, size: int = None) -> np.ndarray:
+        codes, size = self._codes(codes, size)
+        return np.bincount(codes[codes >= 0], minlength=size)
+
+    def count(self, values: np.ndarray, codes: np.ndarray = None, size: int = None) -> np.ndarray:
+        codes, size = self._codes(codes, size)
+        kept = (codes >= 0) & ~np.isnan(values)
+        return np.bincount(codes[kept], minlength=size)
+
+    def sum(self, values: np.ndarray, codes: np.ndarray = None, size: int = None) -> np.ndarray:
+        codes, size = self._codes(codes, size)
+        kept = (codes >= 0) & ~np.isnan(values)
+        return np.bincount(codes[kept], weights=values[kept], minlength=size)
+
+    def max(self, values: np.ndarray, codes: np.ndarray = None, size: int = None) -> np.ndarray:
+        codes, size = self._codes(codes, size)
+        kept = (codes >= 0) & ~np.isnan(values)
+        maxima = np.full(size, -np.inf)
+        np.maximum.at(maxima, codes[kept], values[kept])
+        return np.where(np.bincount(codes[kept], minlength=size) > 0, maxima, np.nan)
+
+    def last_rows(self, kept: np.ndarray = None, codes: np.ndarray = None, size: int = None) -> np.ndarray:
+        """
+        The last of the kept rows of every group, -1 for a group without any.
+        """
+        codes, size = self._codes(codes, size)
+        kept = codes >= 0 if kept is None else kept & (codes >= 0)
+        rows = np.full(size, -1, dtype="int64")
+        np.maximum.at(rows, codes[kept], np.flatnonzero(kept))
+        return rows
+
+    def last(self, values: np.ndarray, codes: np.ndarray = None, size: int = None) -> np.ndarray:
+        rows = self.last_rows(~np.isnan(values), codes, size)
+        return np.where(rows >= 0, values[rows], np.nan)
+
+
+def aggregate_name(column: str, kinds: Sequence[str], kind: str) -> str:
+    # named after the column, suffixed with the kind when the column has more than one, as OnlineAggregator.to_frame
+    return column if len(kinds) == 1 else f"{column}_{kind}"
+
+
+def key_names(keys: Sequence[Any]) -> List[str]:
+    return [getattr(key, "key", key) for key in keys]
+
+
+def reduce_groups(groups: EventGroups, aggregations: Dict[str, Sequence[str]]) -> Dict[str, np.ndarray]:
+    """
+    The aggregations of every group, named by aggregate_name.
+    """
+    reductions = {
+        Sum: groups.sum,
+        Count: groups.count,
+        Abs_Sum: lambda values: groups.sum(np.abs(values)),
+        Max: groups.max,
+        Last: groups.last,
+    }
+
+    data = {}
+    for (column, kinds) in aggregations.items():
+        values = groups.values(column)
+        for kind in kinds:
+            data[aggregate_name(column, kinds, kind)] = reductions[kind](values)
+    return data
+
+
+def partial_aggregate(
+        df: pd.DataFrame, keys: List[Any], aggregations: Dict[str, Sequence[str]], timestamp: str = "timestamp"
+) -> pd.DataFrame:
+    """
+    The aggregations of every keys group of an events DataFrame indexed by timestamp, one row per group with the
+    keys as columns. Partials of events split in any way merge_partials into the aggregations of all of them.
+    """
+    groups = EventGroups(df, keys)
+    data = reduce_groups(groups, aggregations)
+    data[LAST_TIMESTAMP] = groups.frame[timestamp].to_numpy()[groups.last_rows()]
+
+    partial = pd.DataFrame(data, index=groups.index).reset_index()
+    for (column, kinds) in aggregations.items():
+        if Count in kinds:
+            name = aggregate_name(column, kinds, Count)
+            partial[name] = partial[name].astype("int64")
+    return partial
+
+
+def merge_partials(
+        partials: List[pd.DataFrame], keys: List[str], aggregations: Dict[str, Sequence[str]]
+) -> pd.DataFrame:
+    """
+    Reduce the partial aggregates of the same keys groups to one row per group. Columns that are neither keys nor
+    aggregates, such as a simulation's parameters, keep their last value.
+    """
+    df = pd.concat(partials, ignore_index=True).sort_values(LAST_TIMESTAMP, kind="stable")
+    how = {
+        aggregate_name(column, kinds, kind): _merges[kind]
+        for (column, kinds) in aggregations.items()
+        for kind in kinds
+    }
+    how[LAST_TIMESTAMP] = "max"
+    how.update({c: "last" for c in df.columns if c not in how and c not in keys})
+    return df.groupby(keys, sort=True).agg(how).reset_index()
@@ -0,0 +1,244 @@
+import operator
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# column kinds
+Float = "float64"
+Int = "int64"
+Datetime = "datetime"
+Dictionary = "dictionary"
+Object = "object"
+
+DEFAULT_CAPACITY = 1024
+# rows staged before they are written to the column buffers
+DEFAULT_CHUNK_SIZE = 4096
+# rows held in memory before they are spilled to disk, when a spill_dir is set
+DEFAULT_SPILL_ROWS = 1000000
+
+_nanos = operator.attrgetter("value")
+
+
+class EventRecorder:
+    """
+    Columnar store for snapshot rows. Every column is a numpy buffer that doubles when full.
+
+    Rows are staged as they are appended and written to the buffers a chunk at a time, column by column,
+    so the per row cost stays that of a list append while the rows themselves are only kept for one chunk.
+    Strings and other repeating values (Dictionary columns) are stored as int32 codes into a per-column
+    dictionary, None being -1. Datetime columns are stored as int64 nanoseconds in the timezone of the first
+    timestamps recorded.
+
+    With a spill_dir, spill() writes the buffers to a file of one .npy per column once they hold spill_rows and
+    starts them again, so long runs hold at most spill_rows rows in memory. The rows are read back a file at a
+    time by chunks().
+    """
+    __slots__ = (
+        "columns",
+        "kinds",
+        "buffers",
+        "dictionaries",
+        "size",
+        "capacity",
+        "tz",
+        "pending",
+        "chunk_size",
+        "spill_dir",
+        "spill_rows",
+        "spill_path",
+        "spilled",
+    )
+
+    def __init__(
+            self,
+            columns: Dict[str, str],
+            capacity: int = DEFAULT_CAPACITY,
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+            spill_dir: Optional[str] = None,
+            spill_rows: int = DEFAULT_SPILL_ROWS,
+    ):
+        self.columns: List[str] = list(columns.keys())
+        self.kinds: List[str] = list(columns.values())
+        self.capacity: int = max(capacity, 1)
+        self.chunk_size: int = max(chunk_size, 1)
+        self.size: int = 0
+        self.tz = None
+        self.pending: List[Iterable[Any]] = []
+        self.buffers: List[np.ndarray] = [self._buffer(kind, self.capacity) for kind in self.kinds]
+        self.dictionaries: List[Optional[Dict[Any, int]]] = [
+            {None: -1} if kind == Dictionary else None for kind in self.kinds
+        ]
+        self.spill_dir: Optional[str] = spill_dir
+        self.spill_rows: int = spill_rows
+        # directory of this recorder's spilled files, created on the first spill
+        self.spill_path: Optional[str] = None
+        # (file, rows) of every spill, in order
+        self.spilled: List[Tuple[str, int]] = []
+
+    @staticmethod
+    def _buffer(kind: str, capacity: int) -> np.ndarray:
+        if kind == Dictionary:
+            return np.empty(capacity, dtype="int32")
+        elif kind == Datetime:
+            return np.empty(capacity, dtype="int64")
+        return np.empty(capacity, dtype=kind)
+
+    def __len__(self):
+        return sum(rows for (_, rows) in self.spilled) + self.size + len(self.pending)
+
+    def _grow(self, size: int):
+        if size <= self.capacity:
+            return
+        capacity = self.capacity
+        while capacity < size:
+            capacity *= 2
+        for i, kind in enumerate(self.kinds):
+            buffer = self._buffer(kind, capacity)
+            buffer[:self.size] = self.buffers[i][:self.size]
+            self.buffers[i] = buffer
+        self.capacity = capacity
+
+    def _encode(self, dictionary: Dict[Any, int], values: Sequence[Any]) -> np.ndarray:
+        # a column repeats a few values, which are nearly always in the dictionary already
+        try:
+            codes = list(map(dictionary.get, values))
+        except TypeError:
+            codes = [None]
+        if None not in codes:
+            return np.fromiter(codes, dtype="int32", count=len(codes))
+
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object), use_na_sentinel=True)
+        lookup = np.empty(len(uniques) + 1, dtype="int32")
+        for j, value in enumerate(uniques):
+            code = dictionary.get(value)
+            if code is None:
+                code = dictionary[value] = len(dictionary) - 1
+            lookup[j] = code
+        # factorize's sentinel, -1, picks the trailing -1
+        lookup[-1] = -1
+        return lookup[codes]
+
+    def _to_nanos(self, values: Sequence[Any]) -> np.ndarray:
+        if type(values[0]) is pd.Timestamp:
+            # the common case, snapshots are timestamped by the event stream. value is utc nanoseconds whatever the
+            # timezone, so only the first timezone is kept
+            try:
+                nanos = np.fromiter(map(_nanos, values), dtype="int64", count=len(values))
+            except (AttributeError, TypeError):
+                nanos = None
+            if nanos is not None:
+                if self.size == 0 and self.tz is None:
+                    self.tz = values[0].tz
+                return nanos
+
+        timestamps = pd.DatetimeIndex(pd.to_datetime(list(values)))
+        if self.size == 0 and self.tz is None:
+            self.tz = timestamps.tz
+        if self.tz is not None and timestamps.tz is None:
+            timestamps = timestamps.tz_localize(self.tz)
+        return timestamps.as_unit("ns").asi8
+
+    def _write(self, columns: Dict[str, Any], n: int):
+        start, end = self.size, self.size + n
+        self._grow(end)
+        for buffer, column, kind, dictionary in zip(self.buffers, self.columns, self.kinds, self.dictionaries):
+            values = columns.get(column)
+            if isinstance(values, str) or not hasattr(values, "__len__"):
+                values = [values] * n
+            if dictionary is not None:
+                buffer[start:end] = self._encode(dictionary, values)
+            elif kind == Datetime:
+                buffer[start:end] = self._to_nanos(values)
+            elif kind == Float and type(values) is tuple and values.count(None) == n:
+                # e.g. price_scale of float priced events, which converts slowly from None
+                buffer[start:end] = np.nan
+            else:
+                buffer[start:end] = np.asarray(values, dtype=kind)
+        self.size = end
+
+    def flush(self):
+        if self.pending:
+            rows, self.pending = self.pending, []
+            self._write(dict(zip(self.columns, zip(*rows))), len(rows))
+
+    def append(self, values: Iterable[Any]):
+        """
+        Record one row, values in column order.
+        """
+        self.pending.append(values)
+        if len(self.pending) == self.chunk_size:
+            self.flush()
+
+    def extend(self, columns: Dict[str, Any], n: int):
+        """
+        Record n rows at once from a mapping of column to n values, or to a scalar repeated on every row.
+        Columns that are not given are recorded as missing.
+        """
+        self.flush()
+        if n != 0:
+            self._write(columns, n)
+
+    def spill(self, force: bool = False):
+        """
+        Write the rows in memory to the spill_dir if there are spill_rows of them, or any with force.
+        """
+        self.flush()
+        if self.spill_dir is None or self.size == 0 or (self.size < self.spill_rows and not force):
+            return
+        if self.spill_path is None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            self.spill_path = tempfile.mkdtemp(prefix="events-", dir=self.spill_dir)
+
+        file = os.path.join(self.spill_path, f"chunk-{len(self.spilled):06d}.npz")
+        np.savez(file, *[buffer[:self.size] for buffer in self.buffers])
+        self.spilled.append((file, self.size))
+        self.size = 0
+
+    def close(self):
+        # remove the spilled files
+        if self.spill_path is not None:
+            shutil.rmtree(self.spill_path, ignore_errors=True)
+        self.spill_path = None
+        self.spilled = []
+
+    def clear(self):
+        self.close()
+        self.pending = []
+        self.size = 0
+
+    def decode(self, i: int, buffer: np.ndarray) -> np.ndarray:
+        kind = self.kinds[i]
+        if self.dictionaries[i] is not None:
+            # None is last, which is what code -1 decodes to
+            categories = np.empty(len(self.dictionaries[i]), dtype=object)
+            for value, code in self.dictionaries[i].items():
+                categories[code] = value
+            return categories[buffer]
+        elif kind == Datetime:
+            timestamps = pd.DatetimeIndex(buffer.view("datetime64[ns]"))
+            return timestamps.tz_localize("UTC").tz_convert(self.tz) if self.tz is not None else timestamps
+        return buffer.copy()
+
+    def _frame(self, buffers: List[np.ndarray]) -> pd.DataFrame:
+        return pd.DataFrame({
+            column: self.decode(i, buffer) for (i, (column, buffer)) in enumerate(zip(self.columns, buffers))
+        })
+
+    def chunks(self) -> Iterator[pd.DataFrame]:
+        """
+        The recorded rows as a DataFrame per spilled file, followed by the rows still in memory.
+        """
+        self.flush()
+        for (file, _) in self.spilled:
+            with np.load(file) as arrays:
+                yield self._frame([arrays[f"arr_{i}"] for i in range(len(self.columns))])
+        if self.size != 0 or len(self.spilled) == 0:
+            yield self._frame([buffer[:self.size] for buffer in self.buffers])
+
+    def to_frame(self) -> pd.DataFrame:
+        chunks = list(self.chunks())
+        return chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
@@ -0,0 +1,259 @@
+import operator
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..statistics.event_recorder import DEFAULT_CHUNK_SIZE
+
+# accumulator kinds, nan values are skipped as they are by the pandas aggregations they stand in for
+Sum = "sum"
+Last = "last"
+Count = "count"
+Abs_Sum = "abs_sum"
+
+_nanos = operator.attrgetter("value")
+
+
+def bucket_size(resample_rule: str) -> pd.Timedelta:
+    # the fixed length of a resample rule's buckets, a ValueError for calendar rules such as month ends
+    return pd.Timedelta(pd.tseries.frequencies.to_offset(resample_rule).nanos)
+
+
+class OnlineAggregator:
+    """
+    Aggregates snapshot rows into (event_features, time bucket) groups as they are recorded, so a run that only
+    wants the resampled view never stores its events. Rows are buffered and aggregated chunk_size at a time with
+    numpy, the buffer being all that is held of them.
+
+    aggregations maps a column to the accumulators kept for it. A column can be the difference of a cumulative
+    snapshot column between consecutive rows of an event_features group, given in diffs as the column it is
+    differenced from, which is how events_to_df derives realised and unrealised pnl. scales maps a column to the
+    column it is divided by when that is set, which is how fixed point prices are converted back.
+    """
+    __slots__ = (
+        "columns",
+        "resample_rule",
+        "bucket_nanos",
+        "event_features",
+        "aggregations",
+        "diffs",
+        "scales",
+        "timestamp",
+        "chunk_size",
+        "tz",
+        "rows",
+        "pending",
+        "groups",
+        "accumulators",
+        "last_cumulative",
+    )
+
+    def __init__(
+            self,
+            columns: Sequence[str],
+            resample_rule: str,
+            event_features: Sequence[str],
+            aggregations: Dict[str, Sequence[str]],
+            diffs: Dict[str, str] = None,
+            scales: Dict[str, str] = None,
+            timestamp: str = "timestamp",
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        self.columns: List[str] = list(columns)
+        self.resample_rule: str = resample_rule
+        self.bucket_nanos: int = bucket_size(resample_rule).value
+        self.event_features: List[str] = list(event_features)
+        self.aggregations: Dict[str, List[str]] = {k: list(v) for (k, v) in aggregations.items()}
+        self.diffs: Dict[str, str] = diffs or {}
+        self.scales: Dict[str, str] = scales or {}
+        self.timestamp: str = timestamp
+        self.chunk_size: int = max(chunk_size, 1)
+        self.tz = None
+        self.rows: int = 0
+        self.pending: List[Sequence[Any]] = []
+        # (event_features..., bucket) to its row of accumulators
+        self.groups: Dict[Tuple, int] = {}
+        # [sum, last, count, abs_sum] of every aggregated column, a row per group
+        self.accumulators: np.ndarray = np.empty((0, len(self.aggregations), 4), dtype="float64")
+        # event_features to the last value of every differenced column
+        self.last_cumulative: Dict[Tuple, np.ndarray] = {}
+
+        missing = [c for c in self.event_features + [timestamp] if c not in self.columns]
+        if missing:
+            raise KeyError(f"key error {missing}, event_features must be snapshot columns to aggregate online")
+
+    def __len__(self):
+        return self.rows + len(self.pending)
+
+    @staticmethod
+    def _floats(values: Sequence[Any]) -> np.ndarray:
+        try:
+            return np.asarray(values, dtype="float64")
+        except (TypeError, ValueError):
+            return pd.to_numeric(pd.Series(list(values), dtype=object), errors="coerce").to_numpy(dtype="float64")
+
+    def _buckets(self, values: Sequence[Any]) -> np.ndarray:
+        if isinstance(values, pd.DatetimeIndex):
+            timestamps = values
+        elif len(values) and type(values[0]) is pd.Timestamp:
+            # the common case, as EventRecorder._to_nanos
+            nanos = np.fromiter(map(_nanos, values), dtype="int64", count=len(values))
+            timestamps = pd.DatetimeIndex(nanos.view("datetime64[ns]"))
+            if values[0].tz is not None:
+                timestamps = timestamps.tz_localize("UTC").tz_convert(values[0].tz)
+        else:
+            timestamps = pd.DatetimeIndex(pd.to_datetime(list(values)))
+        if not self.groups:
+            self.tz = timestamps.tz
+        # buckets are floored on the wall clock, as pd.Grouper bins a timezone aware index
+        if timestamps.tz is not None:
+            timestamps = timestamps.tz_localize(None)
+        nanos = timestamps.as_unit("ns").asi8
+        return nanos - nanos % self.bucket_nanos
+
+    @staticmethod
+    def _factorize(features: List[np.ndarray], n: int) -> Tuple[np.ndarray, List[Tuple]]:
+        # codes of the distinct rows of features, and those rows as tuples
+        codes, levels = np.zeros(n, dtype="int64"), []
+        for values in features:
+            level_codes, uniques = pd.factorize(values)
+            codes = codes * len(uniques) + level_codes
+            levels.append(uniques)
+        codes, uniques = pd.factorize(codes)
+        keys = []
+        for code in uniques:
+            key = []
+            for level in reversed(levels):
+                code, i = divmod(int(code), len(level))
+                key.append(level[i])
+            keys.append(tuple(reversed(key)))
+        return codes, keys
+
+    def _group_rows(self, keys: List[Tuple]) -> np.ndarray:
+        rows = np.empty(len(keys), dtype="int64")
+        for (j, key) in enumerate(keys):
+            row = self.groups.get(key)
+            if row is None:
+                row = self.groups[key] = len(self.groups)
+            rows[j] = row
+        if len(self.groups) > self.accumulators.shape[0]:
+            capacity = max(len(self.groups), 2 * self.accumulators.shape[0])
+            accumulators = np.zeros((capacity, len(self.aggregations), 4), dtype="float64")
+            accumulators[:, :, 1] = np.nan
+            accumulators[:self.accumulators.shape[0]] = self.accumulators
+            self.accumulators = accumulators
+        return rows
+
+    def _diff(self, i: int, values: np.ndarray, order: np.ndarray, starts: np.ndarray, keys: List[Tuple]):
+        # x - x.shift(1).fillna(0) within the event_features group, carried over from the previous chunks
+        values = values[order]
+        previous = np.r_[np.nan, values[:-1]]
+        ends = np.r_[starts[1:] - 1, len(values) - 1]
+        for (start, end, key) in zip(starts, ends, keys):
+            last_cumulative = self.last_cumulative.get(key)
+            if last_cumulative is None:
+                last_cumulative = self.last_cumulative[key] = np.full(len(self.aggregations), np.nan)
+            previous[start] = last_cumulative[i]
+            last_cumulative[i] = values[end]
+        diffs = np.empty_like(values)
+        diffs[order] = values - np.where(np.isnan(previous), 0.0, previous)
+        return diffs
+
+    def _aggregate(self, columns: Dict[str, Any], n: int):
+        self.rows += n
+
+        def column(name):
+            values = columns.get(name)
+            return [values] * n if isinstance(values, str) or not hasattr(values, "__len__") else values
+
+        # rows missing a feature are dropped, as by groupby
+        features = [np.asarray(column(c), dtype=object) for c in self.event_features]
+        kept = ~np.any([pd.isna(f) for f in features], axis=0) if features else np.ones(n, dtype=bool)
+        if not kept.any():
+            return
+        buckets = self._buckets(column(self.timestamp))[kept]
+        feature_codes, feature_keys = self._factorize([f[kept] for f in features], len(buckets))
+
+        bucket_codes, bucket_keys = pd.factorize(buckets)
+        codes, uniques = pd.factorize(feature_codes * len(bucket_keys) + bucket_codes)
+        rows = self._group_rows([
+            feature_keys[u // len(bucket_keys)] + (int(bucket_keys[u % len(bucket_keys)]),) for u in uniques
+        ])
+
+        if self.diffs:
+            # the rows of each event_features group together, in order
+            order = np.argsort(feature_codes, kind="stable")
+            ordered_codes = feature_codes[order]
+            starts = np.flatnonzero(np.r_[True, ordered_codes[1:] != ordered_codes[:-1]])
+            ordered_keys = [feature_keys[c] for c in ordered_codes[starts]]
+
+        for (i, name) in enumerate(self.aggregations):
+            values = self._floats(column(self.diffs.get(name, name)))[kept]
+            if name in self.diffs:
+                values = self._diff(i, values, order, starts, ordered_keys)
+            if name in self.scales:
+                scale = self._floats(column(self.scales[name]))[kept]
+                scaled = scale > 0
+                values = np.where(scaled, values / np.where(scaled, scale, 1.0), values)
+
+            valid = ~np.isnan(values)
+            group_codes, values = codes[valid], values[valid]
+            accumulators = self.accumulators[rows, i]
+            accumulators[:, 0] += np.bincount(group_codes, weights=values, minlength=len(rows))
+            accumulators[:, 2] += np.bincount(group_codes, minlength=len(rows))
+            accumulators[:, 3] += np.bincount(group_codes, weights=np.abs(values), minlength=len(rows))
+            last = np.full(len(rows), -1, dtype="int64")
+            np.maximum.at(last, group_codes, np.arange(len(values)))
+            accumulators[last >= 0, 1] = values[last[last >= 0]]
+            self.accumulators[rows, i] = accumulators
+
+    def flush(self):
+        if self.pending:
+            rows, self.pending = self.pending, []
+            self._aggregate(dict(zip(self.columns, zip(*rows))), len(rows))
+
+    def update(self, row: Sequence[Any]):
+        """
+        Add one snapshot row, values in column order.
+        """
+        self.pending.append(row)
+        if len(self.pending) == self.chunk_size:
+            self.flush()
+
+    def extend(self, columns: Dict[str, Any], n: int):
+        """
+        Add n rows at once from a mapping of column to n values, or to a scalar repeated on every row, as
+        EventRecorder.extend.
+        """
+        self.flush()
+        if n != 0:
+            self._aggregate(columns, n)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        One row per (event_features, timestamp) group, the timestamp being the start of the bucket. Columns are
+        named after the aggregated column, suffixed with the accumulator when a column has more than one.
+        """
+        self.flush()
+        kinds = [Sum, Last, Count, Abs_Sum]
+        keys = list(self.groups.keys())
+        values = self.accumulators[:len(keys)]
+
+        data = {}
+        for i, (column, accumulators) in enumerate(self.aggregations.items()):
+            for accumulator in accumulators:
+                name = column if len(accumulators) == 1 else f"{column}_{accumulator}"
+                data[name] = values[:, i, kinds.index(accumulator)]
+                if accumulator == Count:
+                    data[name] = data[name].astype("int64")
+
+        buckets = np.fromiter((key[-1] for key in keys), dtype="int64", count=len(keys))
+        timestamps = pd.DatetimeIndex(buckets.view("datetime64[ns]"))
+        if self.tz is not None:
+            timestamps = timestamps.tz_localize(self.tz)
+        index = pd.MultiIndex.from_arrays(
+            [[key[j] for key in keys] for j in range(len(self.event_features))] + [timestamps],
+            names=self.event_features + ["timestamp"],
+        )
+        return pd.DataFrame(data, index=index).sort_index()
@@ -1,13 +1,75 @@
 import datetime as dt
+import operator
 
 import numpy as np
 import pandas as pd
 import pytz
 
+from ..statistics.aggregation import EventGroups, Max, key_names, partial_aggregate, merge_partials, reduce_groups
 from ..statistics.base import AbstractStatistics
+from ..statistics.event_recorder import EventRecorder, Float, Int, Datetime, Dictionary, Object, DEFAULT_SPILL_ROWS
+from ..statistics.online_aggregator import OnlineAggregator, Sum, Last, Count, Abs_Sum, bucket_size
 
 nytime = pytz.timezone("US/Eastern")
 
+# per event pnl, differenced from the cumulative pnl snapshots within each event_features group
+pnl_diffs = {
+    "realised_pnl": "realised_pnl_cum",
+    "unrealised_pnl": "unrealised_pnl_cum",
+}
+
+
+# the performance_overview of each events_to_df column, which online_aggregation keeps as snapshots are recorded
+performance_overview_aggregations = {
+    "price": [Last],
+    "net_position": [Last],
+    "realised_pnl": [Sum],
+    "realised_pnl_cum": [Last],
+    "unrealised_pnl": [Sum],
+    "unrealised_pnl_cum": [Last],
+    "equity": [Last],
+    "contract_qty": [Abs_Sum, Sum, Count],
+}
+
+# the aggregates of each events column a worker returns in place of its events when results are reduced
+partial_aggregations = {
+    "price": [Last],
+    "net_position": [Last],
+    "realised_pnl": [Sum],
+    "realised_pnl_cum": [Last],
+    "unrealised_pnl": [Sum],
+    "unrealised_pnl_cum": [Last],
+    "equity": [Last, Max],
+    "contract_qty": [Abs_Sum, Sum, Count],
+}
+
+
+def partial_keys(resample_rule, event_features):
+    # the groups of partial aggregates, the whole run of every event_features group without a resample_rule
+    if resample_rule is None:
+        return list(event_features)
+    return list(event_features) + [pd.Grouper(key="timestamp", freq=resample_rule)]
+
+
+def attr_getter(attrs):
+    # operator.attrgetter that always returns a tuple
+    if len(attrs) == 0:
+        return lambda obj: ()
+    elif len(attrs) == 1:
+        getter = operator.attrgetter(attrs[0])
+        return lambda obj: (getter(obj),)
+    return operator.attrgetter(*attrs)
+
+
+def buckets_within_day(resample_rule) -> bool:
+    # whether the buckets of a resample rule tile every day, so that days can be aggregated independently
+    try:
+        bucket = bucket_size(resample_rule)
+    except (AttributeError, TypeError, ValueError):
+        return False
+    day = pd.Timedelta(days=1)
+    return bucket <= day and day % bucket == pd.Timedelta(0)
+
 
 class Stats(AbstractStatistics):
     """
@@ -15,38 +77,134 @@ class Stats(AbstractStatistics):
 
     """
 
-    def __init__(self, portfolio):
+    def __init__(
+            self,
+            portfolio,
+            spill_dir=None,
+            spill_rows=DEFAULT_SPILL_ROWS,
+            online_aggregation=False,
+            resample_rule=None,
+            event_features=None,
+    ):
         self.portfolio = portfolio
         self.rolling_sharpe = False
         self.periods = 30
         self.equity = {}
         self.equity_benchmark = {}
-        self.events = []
         self.position_snapshots = {}
-        self.event_snapshot_keys = ['timestamp', 'trading_session', 'event_type', 'source', 'symbol_id', 'price']
+        # price_scale is only recorded to turn fixed point prices back into floats in events_to_df
+        self.event_snapshot_keys = [
+            'timestamp', 'trading_session', 'event_type', 'source', 'symbol_id', 'price', 'price_scale'
+        ]
         self.portfolio_snapshot_keys = ['net_position', 'realised_pnl_cum', 'unrealised_pnl_cum', 'equity']
         self.order_snapshot_keys = ['cancellation_reason', 'contract_qty']
+        # how each column is stored by the recorder, columns not listed are stored as objects
+        self.column_kinds = {
+            'execution_id': Int,
+            'timestamp': Datetime,
+            'trading_session': Dictionary,
+            'event_type': Dictionary,
+            'source': Dictionary,
+            'symbol_id': Dictionary,
+            'price': Float,
+            'price_scale': Float,
+            'net_position': Float,
+            'realised_pnl_cum': Float,
+            'unrealised_pnl_cum': Float,
+            'equity': Float,
+            'cancellation_reason': Dictionary,
+            'contract_qty': Float,
+        }
         self.execution_id = 0
+        # with a spill_dir, snapshots are written to disk at the end of the session they fill spill_rows in
+        self.events = EventRecorder(
+            {c: self.column_kinds.get(c, Object) for c in self.event_columns},
+            spill_dir=spill_dir,
+            spill_rows=spill_rows,
+        )
+        # snapshot extractors, resolved once per (snapshot, object type, event type) and attributes they have
+        self._extractors = {}
+        self.aggregator = OnlineAggregator(
+            self.event_columns,
+            resample_rule,
+            event_features,
+            performance_overview_aggregations,
+            diffs=pnl_diffs,
+            scales={'price': 'price_scale'},
+        ) if online_aggregation else None
+
+    def __len__(self):
+        return len(self.aggregator) if self.aggregator is not None else len(self.events)
 
     @property
     def event_columns(self):
         return ['execution_id'] + self.event_snapshot_keys + self.portfolio_snapshot_keys + self.order_snapshot_keys
 
-    def _snapshot(self, snapshot, event, event2=None):
-        values = []
-        keys = getattr(self, snapshot)
-
-        for attr in keys:
-            if hasattr(event, attr):
-                value = getattr(event, attr)
-            else:
-                if hasattr(event2, attr):
-                    value = getattr(event2, attr)
-                else:
-                    value = None
-            values.append(value)
+    @staticmethod
+    def _resolve_extractor(keys, event, event2):
+        """
+        Build the function that reads keys from (event, event2) for events shaped like these ones: each key is read
+        from event if it has it, else from event2, else recorded as None. Keys neither has are read from the
+        __dict__ of each row's objects, so that an event of the same type that does have them, e.g. price_scale,
+        does not record None; objects with __slots__ cannot gain them.
+        """
+        sources = [0 if hasattr(event, attr) else 1 if hasattr(event2, attr) else -1 for attr in keys]
+        event_keys = [attr for (attr, source) in zip(keys, sources) if source == 0]
+        event2_keys = [attr for (attr, source) in zip(keys, sources) if source == 1]
+        missing_keys = [attr for (attr, source) in zip(keys, sources) if source == -1]
+        # position of each key in event values + event2 values + missing values
+        order = [
+            event_keys.index(attr) if source == 0
+            else len(event_keys) + event2_keys.index(attr) if source == 1
+            else len(event_keys) + len(event2_keys) + missing_keys.index(attr)
+            for (attr, source) in zip(keys, sources)
+        ]
+        get_event, get_event2 = attr_getter(event_keys), attr_getter(event2_keys)
+        reorder = operator.itemgetter(*order) if len(order) > 1 else (lambda values: (values[order[0]],))
+        nones = (None,) * len(missing_keys)
+        event_dict, event2_dict = hasattr(event, '__dict__'), hasattr(event2, '__dict__')
+
+        if not missing_keys or not (event_dict or event2_dict):
+            def extractor(_event, _event2):
+                return reorder(get_event(_event) + get_event2(_event2) + nones)
+        elif not event2_dict:
+            def extractor(_event, _event2):
+                missing = tuple(map(_event.__dict__.get, missing_keys))
+                return reorder(get_event(_event) + get_event2(_event2) + missing)
+        elif not event_dict:
+            def extractor(_event, _event2):
+                missing = tuple(map(_event2.__dict__.get, missing_keys))
+                return reorder(get_event(_event) + get_event2(_event2) + missing)
+        else:
+            def extractor(_event, _event2):
+                values, values2 = _event.__dict__, _event2.__dict__
+                missing = tuple([values[attr] if attr in values else values2.get(attr) for attr in missing_keys])
+                return reorder(get_event(_event) + get_event2(_event2) + missing)
 
-        return values
+        return extractor
+
+    def _snapshot(self, snapshot, event, event2=None):
+        extractor_key = (snapshot, type(event), getattr(event2 if event2 is not None else event, 'event_type', None))
+        extractors = self._extractors.get(extractor_key)
+        if extractors is None:
+            extractors = self._extractors[extractor_key] = []
+        else:
+            try:
+                return extractors[0](event, event2)
+            except AttributeError:
+                # an event of the same type with different attributes, tried against the other shapes seen
+                for i in range(1, len(extractors)):
+                    try:
+                        values = extractors[i](event, event2)
+                    except AttributeError:
+                        continue
+                    # the shape seen last is tried first
+                    extractors.insert(0, extractors.pop(i))
+                    return values
+
+        extractor = self._resolve_extractor(getattr(self, snapshot), event, event2)
+        extractors.insert(0, extractor)
+        return extractor(event, event2)
 
     def _portfolio_snapshot(self, portfolio):
 
@@ -56,10 +214,10 @@ class Stats(AbstractStatistics):
             unrealised_pnl = portfolio.unrealised_pnl
             equity = portfolio.equity
 
-            values = [net_position, realised_pnl, unrealised_pnl, equity]
+            values = (net_position, realised_pnl, unrealised_pnl, equity)
 
         else:
-            values = [None] * len(self.portfolio_snapshot_keys)
+            values = (None,) * len(self.portfolio_snapshot_keys)
 
         return values
 
@@ -69,15 +227,15 @@ class Stats(AbstractStatistics):
             order_qty = order.contract_qty
             cancellation_reason = order.cancellation_reason
 
-            values = [cancellation_reason, order_qty]
+            values = (cancellation_reason, order_qty)
         elif trade:
             # account_id = trade.account_id
             trade_qty = trade.contract_qty
 
-            values = [None, trade_qty]
+            values = (None, trade_qty)
 
         else:
-            values = [None] * len(self.order_snapshot_keys)
+            values = (None,) * len(self.order_snapshot_keys)
 
         return values
 
@@ -116,29 +274,120 @@ class Stats(AbstractStatistics):
         portfolio_snapshot = self._portfolio_snapshot(portfolio)
         order_snapshot = self._order_snapshot(trade, order)
 
-        snapshot = [self.execution_id] + event_snapshot + portfolio_snapshot + order_snapshot
-        self.events.append(snapshot)
+        snapshot = (self.execution_id,) + event_snapshot + portfolio_snapshot + order_snapshot
+        if self.aggregator is not None:
+            self.aggregator.update(snapshot)
+        else:
+            self.events.append(snapshot)
+
+    def update_eod_snapshot(
+            self,
+            portfolio=None,
+            events=None
+    ):
+        # one block of snapshots for the session's closing prices, every row carries the portfolio as revalued at the close
+        columns = {"execution_id": self.execution_id}
+        for key in self.event_snapshot_keys:
+            if key == "timestamp":
+                columns[key] = events.index
+            elif key == "trading_session":
+                # as set by Event.create
+                columns[key] = (
+                    pd.to_datetime(events["timestamp_millis"], unit="ms", utc=True)
+                    .dt.tz_convert("America/New_York").dt.date.tolist()
+                )
+            elif key in events.columns:
+                columns[key] = events[key].tolist()
+
+        columns.update(zip(self.portfolio_snapshot_keys, self._portfolio_snapshot(portfolio)))
+        columns.update(zip(self.order_snapshot_keys, self._order_snapshot(None, None)))
+
+        if self.aggregator is not None:
+            self.aggregator.extend(columns, events.shape[0])
+        else:
+            self.events.extend(columns, events.shape[0])
+
+    def end_session(self):
+        self.events.spill()
 
     def events_to_df(self, event_features, upnl_reversals=pd.DataFrame()):
-        try:
-            df = pd.DataFrame(
-                data=self.events,
-                columns=self.event_columns,
+        chunks = list(self.iter_events_df(event_features, upnl_reversals))
+        return chunks[0] if len(chunks) == 1 else pd.concat(chunks)
+
+    def iter_events_df(self, event_features, upnl_reversals=pd.DataFrame()):
+        """
+        events_to_df a spilled chunk of events at a time. Each chunk is preceded by the last event of every
+        event_features group before it, so that pnl is differenced across chunks.
+        """
+        carry = None
+        for chunk in self.events.chunks():
+            df, carry = self._chunk_to_df(chunk, event_features, upnl_reversals, carry)
+            yield df
+
+    def aggregate_events(self, resample_rule, event_features, metrics, upnl_reversals=pd.DataFrame()):
+        """
+        aggregate_returns of events_to_df. Spilled events are aggregated a chunk at a time when they can be: chunks
+        hold whole simulated days, so this is the case when the resample_rule's buckets tile a day.
+        """
+        if len(self.events.spilled) == 0 or not buckets_within_day(resample_rule):
+            return self.aggregate_returns(
+                self.events_to_df(event_features, upnl_reversals), resample_rule, event_features, metrics
             )
+
+        return pd.concat([
+            self.aggregate_returns(df, resample_rule, event_features, metrics)
+            for df in self.iter_events_df(event_features, upnl_reversals)
+        ])
+
+    def aggregate_partial(self, resample_rule, event_features, upnl_reversals=pd.DataFrame()):
+        """
+        The partial_aggregations of events_to_df, a spilled chunk of events at a time, to be merged with those of
+        other plans rather than returning the events.
+        """
+        keys = partial_keys(resample_rule, event_features)
+        return merge_partials(
+            [
+                partial_aggregate(df, keys, partial_aggregations)
+                for df in self.iter_events_df(event_features, upnl_reversals)
+            ],
+            key_names(keys),
+            partial_aggregations,
+        )
+
+    def aggregate_online(self):
+        """
+        The performance_overview of the snapshots aggregated as they were recorded, as aggregate_returns of
+        events_to_df returns it.
+        """
+        return self.index_results(self.aggregator.to_frame().reset_index())
+
+    def _chunk_to_df(self, df, event_features, upnl_reversals, carry=None):
+        try:
             df["timestamp"] = pd.to_datetime(df["timestamp"])
             df.set_index("timestamp", inplace=True)
-            for (new_col, old_col) in [
-                ("realised_pnl", "realised_pnl_cum"),
-                ("unrealised_pnl", "unrealised_pnl_cum"),
-            ]:
-                if old_col == "unrealised_pnl":
-                    df[new_col] = df.groupby(event_features)[old_col].transform(
-                        lambda x: x.shift(1).fillna(0) * -1
-                    )
-                else:
-                    df[new_col] = df.groupby(event_features)[old_col].transform(
-                        lambda x: x - x.shift(1).fillna(0)
-                    )
+
+            # fixed point prices are ticks, everything else is already a price
+            price_scale = pd.to_numeric(df.pop("price_scale"), errors="coerce").to_numpy()
+            fixed_point = (price_scale > 0) & ~np.isnan(price_scale)
+            if fixed_point.any():
+                df["price"] = pd.to_numeric(df["price"], errors="coerce")
+                df.loc[fixed_point, "price"] = df.loc[fixed_point, "price"] / price_scale[fixed_point]
+
+            carried = 0
+            if carry is not None:
+                carried = carry.shape[0]
+                df = pd.concat([carry, df])
+            grouped = df.groupby(event_features)
+            carry = grouped.tail(1)
+
+            # x - x.shift(1).fillna(0) within each group, rows groupby drops (missing features) are left missing
+            previous = grouped[list(pnl_diffs.values())].shift(1)
+            dropped = df[event_features].isna().any(axis=1).to_numpy()
+            for (new_col, old_col) in pnl_diffs.items():
+                df[new_col] = df[old_col] - previous[old_col].fillna(0)
+                if dropped.any():
+                    df.loc[dropped, new_col] = np.nan
+            df = df.iloc[carried:]
 
             if not upnl_reversals.empty:
                 pass
@@ -185,53 +434,60 @@ class Stats(AbstractStatistics):
 
         except KeyError as e:
             raise KeyError(f"key error {e}")
-        return df
+        return df, carry
 
     @staticmethod
-    def compute_trade_action_metrics(df, event_features):
-        trades_actions = (
-            df.reset_index()
-            .groupby(event_features + ["action"])
-            .agg({"rpnl": ["count", "sum"], "notional_traded": ["sum"]})
-            .unstack(level="action")
-            .fillna(0)
-        )
-
-        trades_actions.columns = [
-            "".join([l + "_" if i != len(x) - 1 else l for i, l in enumerate(x)])
-            for x in trades_actions.columns
-        ]
-
-        trades_types = (
-            df.reset_index()
-            .groupby(event_features + ["type"])
-            .agg({"rpnl": ["count", "sum"], "notional_traded": "sum"})
-        )
-
-        types = list(
-            trades_types["notional_traded"].index.get_level_values("type").unique()
+    def compute_trade_action_metrics(df, event_features, groups=None):
+        groups = groups if groups is not None else EventGroups(df, event_features)
+        rpnl, notional_traded = groups.values("rpnl"), groups.values("notional_traded")
+
+        def breakdown(column):
+            # rpnl count and sum and notional sum of every (group, value of column), as groupby then unstack, over
+            # the groups and values that have trades
+            codes, size, uniques = groups.split(column)
+            shape = (groups.size, len(uniques))
+            present = groups.rows(codes, size).reshape(shape) > 0
+            rows, values = present.any(axis=1), present.any(axis=0)
+            return uniques[values], {
+                f"{name}_{value}": aggregate.reshape(shape)[rows][:, j]
+                for (name, aggregate) in [
+                    ("rpnl_count", groups.count(rpnl, codes, size)),
+                    ("rpnl_sum", groups.sum(rpnl, codes, size)),
+                    ("notional_traded_sum", groups.sum(notional_traded, codes, size)),
+                ]
+                for (j, value) in zip(np.flatnonzero(values), uniques[values])
+            }, groups.index[rows], present[rows][:, values]
+
+        _, actions, index, _ = breakdown("action")
+        trades_actions = pd.DataFrame(actions, index=index)
+
+        types, summary, index, present = breakdown("type")
+        trades_actions_summary = pd.DataFrame(summary, index=index)
+
+        # the share of each type in the row's total, types in the order groupby first sees them
+        notional = trades_actions_summary[[f"notional_traded_sum_{type}" for type in types]].to_numpy()
+        count = trades_actions_summary[[f"rpnl_count_{type}" for type in types]].to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            notional_ratios = np.round(notional * (1 / notional.sum(axis=1, keepdims=True)), 2)
+            count_ratios = np.round(count * (1 / count.sum(axis=1, keepdims=True)), 2)
+        order = pd.unique(np.nonzero(present)[1])
+        trades_actions_ratios = pd.DataFrame(
+            {
+                name: ratios[:, j]
+                for j in order
+                for (name, ratios) in [
+                    (f"notional_{types[j]}_ratio", notional_ratios), (f"count_{types[j]}_ratio", count_ratios)
+                ]
+            },
+            index=index,
         )
-        trades_actions_summary = trades_types.unstack(level="type").fillna(0)
-        trades_actions_ratios = pd.DataFrame()
-        for i, type in enumerate(types):
-            trades_actions_ratios[f"notional_{type}_ratio"] = trades_actions_summary[
-                "notional_traded"
-            ]["sum"].apply(lambda x: round(1 / x.sum() * x[i], 2), axis=1)
-            trades_actions_ratios[f"count_{type}_ratio"] = trades_actions_summary[
-                "rpnl"
-            ]["count"].apply(lambda x: round(1 / x.sum() * x[i], 2), axis=1)
-        trades_actions_ratios.index = trades_actions_summary.index
-        trades_actions_summary.columns = [
-            "".join([l + "_" if i != len(x) - 1 else l for i, l in enumerate(x)])
-            for x in trades_actions_summary.columns
-        ]
 
         return pd.concat(
             [trades_actions, trades_actions_summary, trades_actions_ratios], axis=1
         )
 
     @staticmethod
-    def compute_strategy_pnl_metrics(df, event_features):
+    def compute_strategy_pnl_metrics(df, event_features, groups=None):
         agg_feats = {
             "tob_price": "last",
             "pnl": "sum",
@@ -247,17 +503,22 @@ class Stats(AbstractStatistics):
             "notional_traded": "sum",
             "notional_rejected": "sum",
             "tighten_cost": "sum",
-            "trade_qty": [lambda x: x.abs().sum(), "sum", "count"],
         }
-        agg_feats = {k: v for (k, v) in agg_feats.items() if k in df.columns}
-        df = df.copy()
-        grps = df.reset_index().groupby(event_features)
-        overall_performance = grps.agg(agg_feats)
-        overall_performance.columns = list(agg_feats.keys()) + [
-            "trade_net_qty",
-            "trade_cnt",
-        ]
-        return overall_performance
+        groups = groups if groups is not None else EventGroups(df, event_features)
+        overall_performance = {
+            k: getattr(groups, v)(groups.values(k)) for (k, v) in agg_feats.items() if k in df.columns
+        }
+        if "trade_qty" in df.columns:
+            trade_qty = groups.values("trade_qty")
+            overall_performance.update({
+                "trade_qty": groups.sum(np.abs(trade_qty)),
+                "trade_net_qty": groups.sum(trade_qty),
+                "trade_cnt": groups.count(trade_qty),
+            })
+        overall_performance.update(reduce_groups(
+            groups, {k: v for (k, v) in performance_overview_aggregations.items() if k in df.columns}
+        ))
+        return pd.DataFrame(overall_performance, index=groups.index)
 
     def aggregate_returns(
             self,
@@ -270,8 +531,6 @@ class Stats(AbstractStatistics):
                 "inventory_overview",
             ],
     ):
-        df = df.copy()
-
         time_col = df.index.name
         if event_features is None:
             event_features = [pd.Grouper(key="timestamp", freq=resample_rule)]
@@ -287,8 +546,10 @@ class Stats(AbstractStatistics):
 
         metric_views = self.compute_metrics_by_features(df, event_features, metrics)
 
-        df = pd.concat(metric_views, axis=1).reset_index()
+        return self.index_results(pd.concat(metric_views, axis=1).reset_index(), time_col)
 
+    @staticmethod
+    def index_results(df, time_col="timestamp"):
         if "trading_session" not in df.columns:
             df["trading_session"] = pd.to_datetime(
                 (
@@ -306,20 +567,16 @@ class Stats(AbstractStatistics):
 
     def compute_metrics_by_features(self, df, event_features, metrics):
         metric_views = []
+        # the groups are encoded once for every metric over the events, inventory_overview adds rows of its own
+        groups = EventGroups(df, event_features) if any(
+            m in metrics for m in ["performance_overview", "trading_actions_breakdown", "trading_drawdowns"]
+        ) else None
         if "performance_overview" in metrics:
-            metric_views.append(self.compute_strategy_pnl_metrics(df, event_features))
+            metric_views.append(self.compute_strategy_pnl_metrics(df, event_features, groups))
         if "trading_actions_breakdown" in metrics:
-            metric_views.append(self.compute_trade_action_metrics(df, event_features))
+            metric_views.append(self.compute_trade_action_metrics(df, event_features, groups))
         if "trading_drawdowns" in metrics:
-            metric_views.append(
-                df.reset_index()
-                .groupby(event_features)
-                .apply(
-                    lambda x: self.create_drawdown(
-                        x, col="rpnl_cum", feature="absolute"
-                    )
-                )
-            )
+            metric_views.append(self.compute_drawdown_metrics(df, event_features, col="rpnl_cum", groups=groups))
         if "inventory_overview" in metrics:
             metric_views.append(self.compute_net_weighted_pos(df, event_features))
 
@@ -327,101 +584,74 @@ class Stats(AbstractStatistics):
 
     @staticmethod
     def add_bounding_rows(df, grouper, event_features):
+        # naive timestamps are read as utc
         if grouper.key == "trading_session":
-            sessions = [
-                dt.datetime.fromtimestamp(x / 1e9)
-                for x in df.trading_session.unique().tolist()
-            ]
+            sessions = pd.DatetimeIndex(df.trading_session.unique())
+            if sessions.tz is not None:
+                sessions = sessions.tz_convert(pytz.UTC).tz_localize(None)
             if len(sessions) > 1:
-                sessions_intra_period = sessions[1:]
-                sessions.extend(sessions_intra_period)
-                sessions = sorted(sessions)
-            bounds = [
-                         x.astimezone(pytz.UTC)
-                         .astimezone(nytime)
-                         .replace(hour=17, tzinfo=pytz.UTC)
-                         for x in sessions
-                     ] + [sessions[-1].replace(hour=17)]
-            bounds = [
-                x if (i // 2 or i == 0) else x - dt.timedelta(microseconds=1)
-                for (i, x) in enumerate(bounds)
-            ]
-            trading_session = sessions + [sessions[-1]]
+                sessions = sessions.append(sessions[1:]).sort_values()
+            # 17:00 on the new york date of each session, labelled utc, and 17:00 on the last session
+            new_york = sessions.tz_localize(pytz.UTC).tz_convert(nytime).tz_localize(None)
+            bounds = pd.Series(
+                (new_york - pd.to_timedelta(new_york.hour, unit="h") + pd.Timedelta(hours=17))
+                .append(sessions[-1:] - pd.to_timedelta(sessions[-1:].hour, unit="h") + pd.Timedelta(hours=17))
+                .tz_localize(pytz.UTC)
+            )
+            trading_session = pd.Series(sessions.append(sessions[-1:]))
+            if len(bounds) > 1:
+                bounds.iloc[1] -= dt.timedelta(microseconds=1)
             if len(sessions) > 2:
-                trading_session = [
-                    x if (i // 2 or i == 0) else x - dt.timedelta(days=1)
-                    for (i, x) in enumerate(trading_session)
-                ]
+                trading_session.iloc[1] -= dt.timedelta(days=1)
             df2 = pd.DataFrame(
                 {"timestamp": bounds, "trading_session": trading_session}
             )
         else:
-            converted_dt = [
-                dt.datetime.fromtimestamp(x.astype(int) / 1e9)
-                for x in [
-                    df.reset_index().timestamp.head(1).dt.floor(grouper.freq),
-                    df.reset_index().timestamp.tail(1).dt.ceil(grouper.freq),
-                ]
-            ]
-            bounds = list(
-                pd.date_range(converted_dt[0], converted_dt[1], freq=grouper.freq)
+            timestamps = df.index
+            bounds = pd.date_range(
+                timestamps[0].floor(grouper.freq), timestamps[-1].ceil(grouper.freq), freq=grouper.freq
             )
+            bounds = bounds.tz_convert(pytz.UTC) if bounds.tz is not None else bounds.tz_localize(pytz.UTC)
             if len(bounds) > 1:
-                converted_dt_intra_period = [
-                    x - dt.timedelta(microseconds=1) for x in bounds[1:]
-                ]
-                bounds = bounds[:-1] + converted_dt_intra_period
-                bounds = sorted(bounds)
+                # the start and the end of every period
+                bounds = bounds[:-1].append(bounds[1:] - dt.timedelta(microseconds=1)).sort_values()
 
             df2 = pd.DataFrame({"timestamp": bounds})
-        df2["timestamp"] = pd.to_datetime(df2["timestamp"], utc=True)
-
-        df3 = df.copy()
-        for event_grp in list(df.groupby(event_features).groups.keys()):
-            event_grp = event_grp if type(event_grp) == tuple else tuple([event_grp])
-            df_grp = df2.copy()
-            for i, f in enumerate(event_features):
-                df_grp[f] = event_grp[i]
-            df3 = pd.concat([df3, df_grp.set_index("timestamp")]).sort_index()
-        df3["net_qty"] = (
-            df3.reset_index()
-            .groupby(event_features)["net_qty"]
-            .transform(lambda x: x.ffill())
-            .values
-        )
+
+        # every bound for every group, in one block
+        groups = df.groupby(event_features).size().index.to_frame(index=False)
+        df3 = pd.concat([df, groups.merge(df2, how="cross").set_index("timestamp")]).sort_index(kind="stable")
+        df3["net_qty"] = df3.groupby(event_features)["net_qty"].ffill()
+        # rows before a group's first event hold the position it was opened from
         df3["net_qty"] = df3["net_qty"].fillna(
-            df3.net_qty.shift(-1) - df3.trade_qty.shift(-1)
+            (df3.net_qty - df3.trade_qty).groupby([df3[f] for f in event_features]).bfill()
         )
         return df3
 
     def compute_net_weighted_pos(self, df, event_features):
-        df2 = df.copy()
-
         temporal_period = [
             x for x in event_features if type(x) == pd.core.resample.TimeGrouper
         ][0]
 
         df2 = self.add_bounding_rows(
-            df2,
+            df,
             temporal_period,
             [x for x in event_features if type(x) != pd.core.resample.TimeGrouper],
         )
 
-        def wavg(group):
-            try:
-                d = group["net_qty"]
-                w = group["timedelta"]
-                return (d * w).sum() / w.sum()
-            except ZeroDivisionError:
-                return None
-
-        df2["timedelta"] = (
-            df2.reset_index()
-            .groupby(event_features)["timestamp"]
-            .transform(lambda x: x.shift(-1) - x)
-            .values
+        # each net_qty is held until the next row of its group, the bounding rows closing every period
+        groups = EventGroups(df2, event_features)
+        rows, starts, _ = groups.segments(np.ones(len(groups.codes), dtype=bool))
+        timestamps = groups.frame["timestamp"].to_numpy(dtype="datetime64[ns]")[rows].view("int64")
+        held = np.r_[np.diff(timestamps) / 1e9, np.nan]
+        held[starts[1:] - 1] = np.nan
+        held_qty = groups.values("net_qty")[rows] * held
+        held_sum = np.add.reduceat(np.nan_to_num(held), starts)
+
+        wnq_view = pd.Series(
+            np.add.reduceat(np.nan_to_num(held_qty), starts) / np.where(held_sum != 0, held_sum, np.nan),
+            index=groups.index[groups.codes[rows][starts]],
         )
-        wnq_view = df2.reset_index().groupby(event_features).apply(wavg)
         wnq_view.name = "weighted_net_qty"
         return wnq_view
 
@@ -450,6 +680,41 @@ class Stats(AbstractStatistics):
         idx = [i for i, v in enumerate(df.columns) if v == returns_col][0]
         return df.iat[-1, idx]
 
+    @staticmethod
+    def compute_drawdown_metrics(df, event_features, col="rpnl_cum", groups=None):
+        """
+        The absolute create_drawdown of every event_features group, computed over all groups at once.
+        """
+        feature = "absolute"
+        groups = groups if groups is not None else EventGroups(df, event_features)
+        values = groups.values(col)
+        # groups without values have no drawdown
+        rows, starts, segment = groups.segments(~np.isnan(values))
+        timestamps = groups.frame["timestamp"]
+        values, timestamps = values[rows], timestamps.to_numpy(dtype=f"datetime64[{timestamps.dt.unit}]")[rows]
+        positions = np.arange(len(rows))
+
+        roll_max = pd.Series(values).groupby(segment).cummax().to_numpy()
+        drawdown = roll_max - values
+        max_drawdown = np.maximum.reduceat(drawdown, starts)
+        # the highest point at the largest drawdown, and the first time its peak was reached before it
+        at_max = np.where(drawdown == max_drawdown[segment], values, -np.inf)
+        highest = np.maximum.reduceat(at_max, starts)
+        end = np.minimum.reduceat(np.where(at_max == highest[segment], positions, len(rows)), starts)
+        before_end = timestamps <= timestamps[end][segment]
+        peak = np.maximum.reduceat(np.where(before_end, roll_max, -np.inf), starts)
+        start = np.minimum.reduceat(np.where(before_end & (roll_max == peak[segment]), positions, len(rows)), starts)
+
+        return pd.DataFrame(
+            {
+                f"{feature}_max_drawdown": drawdown[end],
+                f"{feature}_duration": timestamps[end] - timestamps[start],
+                f"{feature}_max_drawdown_start": values[start],
+                f"{feature}_max_drawdown_end": values[end],
+            },
+            index=groups.index[groups.codes[rows][starts]],
+        )
+
     @staticmethod
     def create_drawdown(df, col="rpnl_cum", feature="absolute"):
         df = df.copy().set_index("timestamp")
@@ -11,3 +11,5 @@ Currency = 'currency'
 Apply_Sampling = 'apply_sampling'
 Rate_To_Usd = 'rate_to_usd'
 Date = 'date'
+Price_Scale = 'price_scale'
+Quantity_Scale = 'quantity_scale'
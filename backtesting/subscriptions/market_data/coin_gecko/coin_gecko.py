@@ -1,12 +1,24 @@
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from math import ceil
+from typing import Any, Dict, List, Optional, Tuple, Union
+
 import requests
 import pandas as pd
 import datetime as dt
 
 from pathlib import Path
 from datetime import datetime
-from decimal import Decimal
 
-from backtesting.subscriptions.market_data.market_data import MarketData
+from requests.adapters import HTTPAdapter
+
+from backtesting.fixed_point import DEFAULT_QUANTITY_INCREMENT
+from backtesting.subscriptions.market_data.market_data import MarketData, infer_price_increment
+from backtesting.subscriptions.rate_limiter import RateLimiter
 
 from backtesting.subscriptions.attribute_codes import Apply_Sampling
 from backtesting.subscriptions.attribute_codes import Event_Type
@@ -37,23 +49,210 @@ event_type = _file.parents[1].name
 event_src = _file.name.split('.')[0]
 closing_price = 'closing_price'
 
+BASE_URL = "https://api.coingecko.com/api/v3"
+# the free api allows ~30 calls a minute
+REQUESTS_PER_MINUTE = 30
+MAX_WORKERS = 4
+# ranges longer than 90 days are returned at daily granularity, so windows are split evenly and never below that
+WINDOW_DAYS = 365
+# coin metadata is kept on disk under metadata_dir, or $BACKTESTING_CACHE_DIR/coin_gecko when it is not given
+CACHE_DIR_ENV = "BACKTESTING_CACHE_DIR"
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "backtesting"
+# rate limited (429) and server error responses are retried, backing off RETRY_BACKOFF * 2 ** attempt seconds
+MAX_RETRIES = 3
+RETRY_BACKOFF = 1.0
+
+logger = logging.getLogger("CoinGeckoMarketData")
+
+
+def default_metadata_dir() -> Path:
+    return Path(os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR) / event_src
+
 
 class CoinGeckoMarketData(MarketData):
-    def __init__(self, load_by_session=True):
-        self.base_url = "https://api.coingecko.com/api/v3"
+    def __init__(
+            self,
+            load_by_session=True,
+            base_url: str = BASE_URL,
+            max_workers: int = MAX_WORKERS,
+            requests_per_minute: int = REQUESTS_PER_MINUTE,
+            window_days: int = WINDOW_DAYS,
+            metadata_dir: str = None,
+            max_retries: int = MAX_RETRIES,
+            retry_backoff: float = RETRY_BACKOFF,
+            float32_quantities: bool = False,
+            fixed_point: bool = False,
+            quantity_increment: Union[int, Dict[str, int]] = DEFAULT_QUANTITY_INCREMENT,
+    ):
+        self.base_url: str = base_url
         self.api_key = None
+        self.max_workers: int = max_workers
+        self.requests_per_minute: int = requests_per_minute
+        self.window_days: int = window_days
+        self.metadata_dir: Path = Path(metadata_dir) if metadata_dir else default_metadata_dir()
+        self.max_retries: int = max_retries
+        self.retry_backoff: float = retry_backoff
+
+        self._session: Optional[requests.Session] = None
+        self._rate_limiter: Optional[RateLimiter] = None
+        self._metadata: Dict[str, Dict[str, Any]] = {}
+        self._metadata_lock = threading.Lock()
 
         super().__init__(
-            load_by_session=load_by_session
+            load_by_session=load_by_session,
+            float32_quantities=float32_quantities,
+            fixed_point=fixed_point,
+            quantity_increment=quantity_increment,
         )
 
+    def __getstate__(self):
+        # sessions, locks and the limiter are process local, they are rebuilt lazily after unpickling in a worker
+        state = self.__dict__.copy()
+        state.update({"_session": None, "_rate_limiter": None, "_metadata_lock": None})
+        return state
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(self.max_workers, 1))
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({"Accept": "application/json", "Connection": "keep-alive"})
+            if self.api_key:
+                session.headers.update({"x-cg-demo-api-key": self.api_key})
+            self._session = session
+        return self._session
+
+    @property
+    def rate_limiter(self) -> RateLimiter:
+        if self._rate_limiter is None:
+            self._rate_limiter = RateLimiter(max_calls=self.requests_per_minute, period=60.0)
+        return self._rate_limiter
+
     def subscribe(self, api_key=None):
         """
         Initializes the required keys or configurations to access the data.
         :param api_key: Optional API key for authentication (not required for CoinGecko's free tier)
         """
         self.api_key = api_key
-        print("Subscription initialized. API Key set." if api_key else "Subscription initialized without API Key.")
+        self._session = None
+        logger.info("Subscription initialized. API Key set." if api_key else "Subscription initialized without API Key.")
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def _request(self, url: str, params: Dict[str, Any] = None) -> requests.Response:
+        """
+        GET url within the rate limit, retrying rate limited and server error responses and failed connections.
+        Raises requests.HTTPError for a response that is still not a 200 once the retries are used up.
+        """
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.rate_limiter:
+                    response = self.session.get(url, params=params)
+            except requests.ConnectionError as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"{url}: (attempt) {attempt + 1}/{self.max_retries + 1}, (error) {e}")
+                time.sleep(self.retry_backoff * 2 ** attempt)
+                continue
+
+            if response.status_code == 200:
+                return response
+            if attempt == self.max_retries or (response.status_code != 429 and response.status_code < 500):
+                break
+            logger.warning(f"{url}: (attempt) {attempt + 1}/{self.max_retries + 1}, (status) {response.status_code}")
+            retry_after = response.headers.get("Retry-After")
+            time.sleep(float(retry_after) if retry_after else self.retry_backoff * 2 ** attempt)
+
+        logger.error(f"{url}: (status) {response.status_code} - {response.text}")
+        raise requests.HTTPError(f"Failed to fetch {url}: {response.status_code} - {response.text}", response=response)
+
+    def split_windows(self, start_timestamp: int, end_timestamp: int) -> List[Tuple[int, int]]:
+        window_seconds = self.window_days * 24 * 60 * 60
+        if not self.window_days or end_timestamp - start_timestamp <= window_seconds:
+            return [(start_timestamp, end_timestamp)]
+
+        # equal sized windows keep every window above the api's daily granularity threshold
+        no_of_windows = ceil((end_timestamp - start_timestamp) / window_seconds)
+        step = ceil((end_timestamp - start_timestamp) / no_of_windows)
+        return [
+            (_from, min(_from + step, end_timestamp))
+            for _from in range(start_timestamp, end_timestamp, step)
+        ]
+
+    def _metadata_file(self, instrument: str) -> Path:
+        return self.metadata_dir / f"{instrument}.json"
+
+    @property
+    def metadata_lock(self) -> threading.Lock:
+        if self._metadata_lock is None:
+            self._metadata_lock = threading.Lock()
+        return self._metadata_lock
+
+    def get_coin_metadata(self, instrument: str) -> Dict[str, Any]:
+        with self.metadata_lock:
+            metadata = self._metadata.get(instrument)
+        if metadata is not None:
+            return metadata
+
+        file = self._metadata_file(instrument)
+        if file.exists():
+            with open(file, "r") as inf:
+                metadata = json.load(inf)
+        else:
+            coin_metadata_url = f"{self.base_url}/coins/{instrument}"
+            params = {
+                'localization': 'false',
+                'tickers': 'false',
+                'market_data': 'false',
+                'community_data': 'false',
+                'developer_data': 'false',
+            }
+            coin_metadata_response = self._request(coin_metadata_url, params=params)
+            coin_metadata = coin_metadata_response.json()
+            metadata = {'id': instrument, 'symbol': coin_metadata['symbol']}
+
+            os.makedirs(self.metadata_dir, exist_ok=True)
+            tmp_file = file.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_file, "w") as outf:
+                json.dump(metadata, outf)
+            os.replace(tmp_file, file)
+
+        with self.metadata_lock:
+            self._metadata[instrument] = metadata
+        return metadata
+
+    def _get_prices(self, instrument: str, window: Tuple[int, int]) -> List[List[float]]:
+        url = f"{self.base_url}/coins/{instrument}/market_chart/range"
+        params = {
+            'vs_currency': 'usd',
+            'from': window[0],
+            'to': window[1]
+        }
+
+        return self._request(url, params=params).json().get('prices', [])
+
+    @staticmethod
+    def _build_instrument_frame(instrument: str, prices: List[List[float]], currency: str) -> pd.DataFrame:
+        # Convert the prices data to a pandas DataFrame
+        _df = pd.DataFrame(prices, columns=[Timestamp_Millis, Price])
+        price_increment = infer_price_increment(_df[Price].to_numpy())
+        _df = _df.drop_duplicates(subset=[Timestamp_Millis]).sort_values(Timestamp_Millis)
+        _df['timestamp'] = pd.to_datetime(_df[Timestamp_Millis], unit='ms')
+        _df.set_index('timestamp', inplace=True)
+        _df[Symbol] = instrument
+        _df[Symbol_Id] = f"{event_src}_{instrument}"
+        _df[Price_Increment] = price_increment
+        _df[Currency] = 'USD'
+        _df[Contract_Size] = 1
+        _df[Rate_To_Usd] = 1
+        _df[Source] = event_src
+        _df[Contract_Unit_of_Measure] = currency.upper()
+        return _df
 
     def _get(
             self,
@@ -64,6 +263,7 @@ class CoinGeckoMarketData(MarketData):
     ):
         """
         Loads data for a given cryptocurrency symbol for a specified date range.
+        Instruments and date windows are fetched concurrently over a shared session, subject to the rate limiter.
         :param symbol: The cryptocurrency symbol (e.g., 'bitcoin', 'ethereum')
         :param start_date: The start date for data retrieval in 'YYYY-MM-DD' format
         :param end_date: The end date for data retrieval in 'YYYY-MM-DD' format
@@ -73,59 +273,26 @@ class CoinGeckoMarketData(MarketData):
         end_date = datetime.strptime(end_date, "%Y-%m-%d") + dt.timedelta(days=1)
         end_timestamp = int(end_date.timestamp())
 
-        df = pd.DataFrame()
+        windows = self.split_windows(start_timestamp, end_timestamp)
+        requests_ = [(instrument, window) for instrument in instruments for window in windows]
 
-        for instrument in instruments:
-            url = f"{self.base_url}/coins/{instrument}/market_chart/range"
-            params = {
-                'vs_currency': 'usd',
-                'from': start_timestamp,
-                'to': end_timestamp
-            }
+        with ThreadPoolExecutor(max_workers=max(self.max_workers, 1)) as executor:
+            metadata = dict(zip(instruments, executor.map(self.get_coin_metadata, instruments)))
+            prices = list(executor.map(lambda r: self._get_prices(*r), requests_))
 
-            response = requests.get(url, params=params)
+        instrument_prices: Dict[str, List[List[float]]] = {instrument: [] for instrument in instruments}
+        for (instrument, _), _prices in zip(requests_, prices):
+            instrument_prices[instrument].extend(_prices)
 
-            if response.status_code == 200:
-                data = response.json()
-                prices = data.get('prices', [])
-                price_increment = max([abs(Decimal(str(x[1])).as_tuple().exponent) for x in prices])
-
-                # Convert the prices data to a pandas DataFrame
-                _df = pd.DataFrame(prices, columns=[Timestamp_Millis, Price])
-                _df['timestamp'] = pd.to_datetime(_df[Timestamp_Millis], unit='ms')
-                _df.set_index('timestamp', inplace=True)
-                _df[Symbol] = instrument
-                _df[Symbol_Id] = f"{event_src}_{instrument}"
-                _df[Price_Increment] = price_increment
-                _df[Currency] = 'USD'
-                _df[Contract_Size] = 1
-                _df[Rate_To_Usd] = 1
-                _df[Source] = event_src
-
-                df = pd.concat([df, _df])
-            else:
-                print(f"Failed to fetch {instrument} data: {response.status_code} - {response.text}")
-                return None
-
-            coin_metadata_url = f"{self.base_url}/coins/{instrument}"
-            coin_metadata_response = requests.get(coin_metadata_url, params=params)
-            if coin_metadata_response.status_code == 200:
-                coin_metadata = coin_metadata_response.json()
-                currency = coin_metadata['symbol']
-                df[Contract_Unit_of_Measure] = currency.upper()
-            else:
-                print(f"Failed to fetch {instrument} metadata: {coin_metadata_response.status_code} - {coin_metadata_response.text}")
-                return None
+        dfs = [
+            self._build_instrument_frame(instrument, _prices, metadata[instrument]['symbol'])
+            for (instrument, _prices) in instrument_prices.items()
+            if _prices
+        ]
+        if not dfs:
+            return None
 
+        df = pd.concat(dfs)
         df[Event_Type] = event_type
 
         return df
-
-#
-# # Example usage:
-# loader = CoinGeckoDataLoader()
-# loader.subscribe()  # No API key is needed for basic usage
-# df = loader.load('bitcoin', '2022-01-01', '2022-01-31')
-#
-# if df is not None:
-#     print(df.head())
\ No newline at end of file
@@ -1,16 +1,22 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
+from typing import Dict, Iterable, Union
 
+import numpy as np
 import pandas as pd
 
 from backtesting.subscriptions.subscription import Subscription
 from backtesting.subscriptions.subscription import set_dtypes
+from backtesting.subscriptions.subscription import concat_frames
+from backtesting.fixed_point import to_ticks, quantity_scale, DEFAULT_QUANTITY_INCREMENT
 
 from backtesting.subscriptions.attribute_codes import Apply_Sampling
 from backtesting.subscriptions.attribute_codes import Date
 from backtesting.subscriptions.attribute_codes import Event_Type
 from backtesting.subscriptions.attribute_codes import Price_Increment
 from backtesting.subscriptions.attribute_codes import Price
+from backtesting.subscriptions.attribute_codes import Price_Scale
+from backtesting.subscriptions.attribute_codes import Quantity_Scale
 from backtesting.subscriptions.attribute_codes import Symbol
 from backtesting.subscriptions.attribute_codes import Source
 from backtesting.subscriptions.attribute_codes import Symbol_Id
@@ -22,30 +28,93 @@ from backtesting.subscriptions.attribute_codes import Currency
 
 schema = {}
 
+# descriptive columns repeat the same few values on every tick, so they are stored as categoricals
 schema.update({
     Timestamp_Millis: "int64",
-    Symbol: "object",
+    Symbol: "category",
     Date: "object",
     Price: "float",
-    Contract_Unit_of_Measure: "object",
-    Currency: "object",
-    Symbol: "object",
-    Symbol_Id: "object",
+    Contract_Unit_of_Measure: "category",
+    Currency: "category",
+    Symbol_Id: "category",
     Price_Increment: "float",
-    Event_Type: "object",
+    Event_Type: "category",
     Contract_Size: "float",
     Rate_To_Usd: "float",
-    Source: "object",
+    Source: "category",
     Apply_Sampling: "bool"
 })
 
+# prices are int64 ticks of price_scale per unit and quantities lots of 1 / quantity_scale contracts,
+# enabled per subscription with fixed_point
+fixed_point_schema = {
+    Price: "int64",
+    Price_Scale: "int64",
+    Quantity_Scale: "int64",
+}
+
+# reduced precision for quantity columns, enabled per subscription with float32_quantities
+quantity_schema = {
+    Contract_Size: "float32",
+}
+
+# largest number of decimal places checked when inferring a price increment, beyond this floats are not exact
+MAX_PRICE_DECIMALS = 17
+FLOAT_NOISE_ULPS = 4
+PRICE_INCREMENT_SAMPLE_SIZE = 1000
+
+
+def infer_price_increment(prices: Iterable[float], sample_size: int = PRICE_INCREMENT_SAMPLE_SIZE) -> int:
+    """
+    Infer the number of decimal places quoted by a price series, i.e. the price_increment.
+    Only the distinct prices are inspected, thinned out to an evenly spaced sample of `sample_size`.
+    """
+    values = np.unique(np.asarray(prices, dtype="float64"))
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return 0
+    if values.size > sample_size:
+        values = values[np.linspace(0, values.size - 1, sample_size).astype("int64")]
+
+    # a few ulps of float noise, e.g. 0.1 + 0.2, are not taken for more decimal places
+    tolerance = FLOAT_NOISE_ULPS * np.abs(np.spacing(values))
+    for decimals in range(MAX_PRICE_DECIMALS):
+        if (np.abs(np.round(values, decimals) - values) <= tolerance).all():
+            return decimals
+    return MAX_PRICE_DECIMALS
+
 
 class MarketData(Subscription):
-    def __init__(self, load_by_session=True):
+    def __init__(
+            self,
+            load_by_session=True,
+            float32_quantities=False,
+            fixed_point=False,
+            quantity_increment: Union[int, Dict[str, int]] = DEFAULT_QUANTITY_INCREMENT,
+    ):
+        self.float32_quantities: bool = float32_quantities
+        self.fixed_point: bool = fixed_point
+        # decimal places of a contract traded in fixed point mode, for every instrument or by symbol_id
+        self.quantity_increment: Union[int, Dict[str, int]] = quantity_increment
         super().__init__(
             load_by_session=load_by_session
         )
 
+    @property
+    def schema(self):
+        _schema = schema
+        if self.float32_quantities:
+            _schema = {**_schema, **quantity_schema}
+        if self.fixed_point:
+            _schema = {**_schema, **fixed_point_schema}
+        return _schema
+
+    def quantity_scales(self, symbol_ids: pd.Series) -> np.ndarray:
+        if not isinstance(self.quantity_increment, dict):
+            return np.full(symbol_ids.shape[0], quantity_scale(self.quantity_increment), dtype="int64")
+        increments = symbol_ids.astype("object").map(self.quantity_increment).fillna(DEFAULT_QUANTITY_INCREMENT)
+        return 10 ** increments.to_numpy().astype("int64")
+
     @abstractmethod
     def subscribe(self, api_key=None):
         pass
@@ -78,14 +147,19 @@ class MarketData(Subscription):
             raise TypeError(f"No Data retrieved between dates {start_date} - {end_date} for symbols {', '.join(instruments)}")
 
         df[Apply_Sampling] = True
-
-        # add closing price events
-        cdf = df.reset_index().groupby(Symbol_Id).last().reset_index().set_index('timestamp')
+        if self.fixed_point:
+            # the only conversion, everything downstream works in ticks
+            df[Price] = to_ticks(df[Price].to_numpy(), df[Price_Increment].to_numpy())
+            df[Price_Scale] = 10 ** df[Price_Increment].to_numpy().astype("int64")
+            df[Quantity_Scale] = self.quantity_scales(df[Symbol_Id])
+        df = set_dtypes(df, self.schema)
+
+        # add closing price events, the last row of each symbol
+        last_rows = np.flatnonzero(~df[Symbol_Id].duplicated(keep='last').to_numpy())
+        cdf = df.iloc[last_rows].copy()
         cdf[Event_Type] = 'closing_price'
         cdf[Apply_Sampling] = False
 
-        df = pd.concat([df, cdf])
-
-        df = set_dtypes(df, schema)
+        df = set_dtypes(concat_frames([df, cdf]), self.schema)
 
         return df
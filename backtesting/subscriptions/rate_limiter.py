@@ -0,0 +1,35 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread safe limiter that spaces calls so that no more than `max_calls` are made per `period` seconds.
+    A limiter with `max_calls` of None or 0 never blocks.
+    """
+
+    def __init__(self, max_calls: int = None, period: float = 60.0):
+        self.max_calls: int = max_calls
+        self.period: float = period
+        self._interval: float = period / max_calls if max_calls else 0.0
+        self._next_call: float = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self._interval:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_call - now
+            self._next_call = max(now, self._next_call) + self._interval
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
@@ -1,24 +1,58 @@
+import inspect
 from abc import ABCMeta, abstractmethod, ABC
 
-from pandas import DataFrame
-from typing import Dict, Any, AnyStr
+import pandas as pd
+from pandas import CategoricalDtype, DataFrame
+from typing import Dict, Any, AnyStr, List
 
 
 def set_dtypes(df: DataFrame, schema: Dict[AnyStr, Any]):
-    try:
-        for col in df.columns:
-            dtype = schema.get(col)
-            if dtype:
-                df[col] = df[col].astype(dtype)
-    except ValueError as e:
-        raise e
-    except TypeError as e:
-        raise e
-    except Exception as e:
-        raise e
+    # cast every column in a single astype call, skipping columns that already have the right dtype
+    dtypes = {
+        col: dtype
+        for (col, dtype) in schema.items()
+        if dtype and col in df.columns and df[col].dtype != dtype
+    }
+    if dtypes:
+        df = df.astype(dtypes)
     return df
 
 
+def concat_frames(frames: List[DataFrame]) -> DataFrame:
+    """
+    Concatenate frames, keeping categorical columns categorical.
+    pandas falls back to object when the categories of the inputs differ, so the categories are unioned first.
+    """
+    frames = [f for f in frames if f is not None]
+    categorical = {
+        col
+        for f in frames
+        for (col, dtype) in f.dtypes.items()
+        if isinstance(dtype, CategoricalDtype)
+    }
+
+    if categorical and len(frames) > 1:
+        dtypes = {}
+        for col in categorical:
+            categories = [
+                f[col].cat.categories if isinstance(f[col].dtype, CategoricalDtype) else f[col].dropna().unique()
+                for f in frames
+                if col in f.columns
+            ]
+            dtypes[col] = CategoricalDtype(pd.unique(pd.Index([c for _c in categories for c in _c], dtype=object)))
+        frames = [f.astype({col: dtype for (col, dtype) in dtypes.items() if col in f.columns}) for f in frames]
+
+    return pd.concat(frames) if frames else DataFrame()
+
+
+def fillna_frame(df: DataFrame, value: Any = 0) -> DataFrame:
+    # categoricals only accept known categories, so the fill value is added where a categorical column has gaps
+    for (col, dtype) in df.dtypes.items():
+        if isinstance(dtype, CategoricalDtype) and value not in dtype.categories and df[col].hasnans:
+            df[col] = df[col].cat.add_categories([value])
+    return df.fillna(value)
+
+
 class Subscription(ABC):
     __slots__ = [
         'load_by_session'
@@ -27,14 +61,21 @@ class Subscription(ABC):
     def __init__(self, load_by_session=True):
         self.load_by_session = load_by_session
 
+    @property
+    def schema(self) -> Dict[AnyStr, Any]:
+        return {}
+
     __metaclass__ = ABCMeta
 
     @classmethod
     def create(cls, **kwargs):
+        # slotted subscriptions name their parameters in __slots__, the others in their constructor
+        parameters = [x if x[0] != "_" else x[1:] for x in cls.__slots__]
+        parameters += list(inspect.signature(cls.__init__).parameters)
         attributes = {
             k: v
             for (k, v) in kwargs.items()
-            if k in [x if x[0] != "_" else x[1:] for x in cls.__slots__]
+            if k in parameters and k != "self"
         }
 
         obj = cls(**attributes)
@@ -1,4 +1,9 @@
 from backtesting.subscriptions_cache.subscriptions_cache import SubscriptionsCache
+from backtesting.subscriptions_cache.frame_cache import (
+    SubscriptionFrameCache,
+    DEFAULT_MEMORY_CACHE_BYTES,
+    get_frame_cache,
+)
 from ..subscriptions_cache.csv_cache import CsvCache
 from ..datastore.csv_datastore import CsvDataStore
 
@@ -19,7 +24,8 @@ def create_subscriptions_cache(
         cache_name: str,
         datastore_parameters,
         mode: str,
-        enable_cache: bool
+        enable_cache: bool,
+        memory_cache_bytes: int = DEFAULT_MEMORY_CACHE_BYTES,
 ) -> SubscriptionsCache:
     _cache = get_subscriptions_cache(cache_name)
 
@@ -35,6 +41,7 @@ def create_subscriptions_cache(
     cache_ = _cache.create(
         datastore=datastore,
         mode=mode,
-        enable_cache=enable_cache
+        enable_cache=enable_cache,
+        memory_cache_bytes=memory_cache_bytes
     )
     return cache_
@@ -5,15 +5,17 @@ from datetime import timedelta
 
 from backtesting.datastore.csv_datastore import CsvDataStore
 from backtesting.subscriptions_cache.subscriptions_cache import SubscriptionsCache
+from backtesting.subscriptions_cache.frame_cache import DEFAULT_MEMORY_CACHE_BYTES
 
 
 class CsvCache(SubscriptionsCache):
-    def __init__(self, datastore, enable_cache, mode):
+    def __init__(self, datastore, enable_cache, mode, memory_cache_bytes=DEFAULT_MEMORY_CACHE_BYTES):
         self.datastore: CsvDataStore = datastore
         super().__init__(
             name='CsvCache',
             enable_cache=enable_cache,
-            mode=mode
+            mode=mode,
+            memory_cache_bytes=memory_cache_bytes
         )
 
     def get(
@@ -25,28 +27,49 @@ class CsvCache(SubscriptionsCache):
             interval
     ):
         dates = pd.date_range(start_date, end_date)
-        combinations = [[d.strftime("%Y-%m-%d"), i] for d in dates for i in instruments]
+        combinations = [[d, i] for d in dates for i in instruments]
 
         files = [
-            self.datastore.entry_point / subscription / interval / _date / f"{_instrument}.csv"
+            self.datastore.entry_point / subscription / interval / _date.strftime("%Y-%m-%d") / f"{_instrument}.csv"
             for (_date, _instrument) in combinations
         ]
 
         missing_dates = []
-        data = pd.DataFrame()
-        for _date, _file in zip(dates, files):
+        frames = []
+        for (_date, _), _file in zip(combinations, files):
             try:
                 _data = pd.read_csv(_file)
                 _data = _data.set_index('timestamp')
-                _data = pd.to_datetime(_data.index)
-                data = pd.concat([data, _data])
+                _data.index = pd.to_datetime(_data.index)
+                frames.append(_data)
             except FileNotFoundError:
-                missing_dates.append(_date)
+                if _date not in missing_dates:
+                    missing_dates.append(_date)
             except Exception as e:
                 raise e
 
+        # csv does not keep dtypes, callers restore them from the subscription schema
+        data = pd.concat(frames) if frames else pd.DataFrame()
+
         return data, missing_dates
 
+    def missing_dates(
+            self,
+            subscription,
+            start_date,
+            end_date,
+            instruments,
+            interval
+    ):
+        # only checks that the files exist, nothing is read
+        dates = pd.date_range(start_date, end_date)
+        base = self.datastore.entry_point / subscription / interval
+        return [
+            _date
+            for _date in dates
+            if not all((base / _date.strftime("%Y-%m-%d") / f"{_instrument}.csv").exists() for _instrument in instruments)
+        ]
+
     def save(
             self,
             subscription: str,
@@ -54,7 +77,7 @@ class CsvCache(SubscriptionsCache):
             interval
     ):
         for (_trade_date, _symbol), grp in \
-                subscription_events.reset_index().groupby([pd.Grouper(key='timestamp', freq='D'), 'symbol']):
+                subscription_events.reset_index().groupby([pd.Grouper(key='timestamp', freq='D'), 'symbol'], observed=True):
             grp = grp.set_index('timestamp')
             _trade_date_str = _trade_date.strftime('%Y-%m-%d')
             _dir = self.datastore.entry_point / subscription / interval / _trade_date_str
@@ -0,0 +1,131 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from pandas import DataFrame
+
+DEFAULT_MEMORY_CACHE_BYTES: int = 512 * 1024 * 1024
+
+
+class SubscriptionFrameCache:
+    """
+    In-process LRU of subscription frames keyed by
+    (subscription, instruments, start_date, end_date, interval, parameters), parameters being the public attributes
+    of the subscription instance, so differently configured instances of a subscription do not share frames.
+
+    The cache is bounded by the in-memory size of the cached frames rather than
+    the number of entries. Frames are copied in and out, so callers filling or
+    converting the frames they load can not change what later plans get.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MEMORY_CACHE_BYTES):
+        self.max_bytes: int = max_bytes
+        self.current_bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._frames: "OrderedDict[Hashable, Tuple[DataFrame, int]]" = OrderedDict()
+
+    @staticmethod
+    def build_key(
+            subscription: str,
+            instruments: List[Any],
+            start_date: Any,
+            end_date: Any,
+            interval: str,
+            parameters: Tuple = ()
+    ) -> Tuple:
+        return subscription, tuple(instruments), str(start_date), str(end_date), interval, parameters
+
+    @staticmethod
+    def subscription_parameters(subscription: Any) -> Tuple:
+        if subscription is None:
+            return ()
+
+        attributes = dict(getattr(subscription, "__dict__", {}))
+        for cls in type(subscription).__mro__:
+            slots = getattr(cls, "__slots__", ())
+            for slot in [slots] if isinstance(slots, str) else slots:
+                if hasattr(subscription, slot):
+                    attributes.setdefault(slot, getattr(subscription, slot))
+
+        # private attributes are sessions, locks and memoised state, values are repr'd as some are dicts
+        return tuple(sorted((k, repr(v)) for (k, v) in attributes.items() if not k.startswith("_")))
+
+    @staticmethod
+    def frame_size(df: DataFrame) -> int:
+        return int(df.memory_usage(index=True, deep=True).sum())
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._frames
+
+    def get(self, key: Hashable) -> Optional[DataFrame]:
+        entry = self._frames.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._frames.move_to_end(key)
+        self.hits += 1
+        return entry[0].copy()
+
+    def put(self, key: Hashable, df: DataFrame):
+        if not self.enabled or df is None:
+            return
+
+        size = self.frame_size(df)
+        if size > self.max_bytes:
+            # a single frame larger than the whole budget would evict everything and still not fit
+            return
+
+        if key in self._frames:
+            self.current_bytes -= self._frames.pop(key)[1]
+
+        self._frames[key] = (df.copy(), size)
+        self.current_bytes += size
+        self._evict()
+
+    def resize(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def _evict(self):
+        while self._frames and self.current_bytes > self.max_bytes:
+            _, (_, evicted_size) = self._frames.popitem(last=False)
+            self.current_bytes -= evicted_size
+            self.evictions += 1
+
+    def clear(self):
+        self._frames.clear()
+        self.current_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._frames),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+# one cache per process, so that plans executed by the same pool worker share loaded frames
+_frame_cache: Optional[SubscriptionFrameCache] = None
+
+
+def get_frame_cache(max_bytes: int = None) -> SubscriptionFrameCache:
+    global _frame_cache
+    if _frame_cache is None:
+        _frame_cache = SubscriptionFrameCache(
+            DEFAULT_MEMORY_CACHE_BYTES if max_bytes is None else max_bytes
+        )
+    elif max_bytes is not None and max_bytes != _frame_cache.max_bytes:
+        _frame_cache.resize(max_bytes)
+    return _frame_cache
@@ -5,6 +5,7 @@ from pandas import DataFrame
 from abc import abstractmethod
 
 from ..datastore.datastore import DataStore
+from ..subscriptions_cache.frame_cache import DEFAULT_MEMORY_CACHE_BYTES
 
 
 class SubscriptionsCache:
@@ -13,23 +14,27 @@ class SubscriptionsCache:
             name: str,
             enable_cache: bool,
             mode: str,
+            memory_cache_bytes: int = DEFAULT_MEMORY_CACHE_BYTES,
     ):
         self.name: str = name
         self.enable_cache: bool = enable_cache
         self.mode: str = mode
+        self.memory_cache_bytes: int = memory_cache_bytes
 
     @classmethod
     def create(
             cls,
             datastore: DataStore,
             enable_cache: bool,
-            mode: str
+            mode: str,
+            memory_cache_bytes: int = DEFAULT_MEMORY_CACHE_BYTES,
     ):
 
         instance = cls(
             datastore=datastore,
             enable_cache=enable_cache,
-            mode=mode
+            mode=mode,
+            memory_cache_bytes=memory_cache_bytes
         )
 
         return instance
@@ -45,6 +50,23 @@ class SubscriptionsCache:
     ):
         pass
 
+    def missing_dates(
+            self,
+            subscription,
+            start_date,
+            end_date,
+            instruments,
+            interval
+    ):
+        _, missing_dates = self.get(
+            subscription=subscription,
+            start_date=start_date,
+            end_date=end_date,
+            instruments=instruments,
+            interval=interval
+        )
+        return missing_dates
+
     @abstractmethod
     def save(
             self,
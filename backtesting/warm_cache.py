@@ -0,0 +1,258 @@
+from typing import Dict, Any, AnyStr, List, Set, Tuple
+import datetime as dt
+import logging
+import sys
+import time
+
+from argparse import ArgumentParser, Namespace
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+from backtesting.config.backtesting_config import BackTestingConfig
+from backtesting.main import build_parser, config_arguments, load_config, setup_logging
+from backtesting.simulator.simulator_pool import SimulatorPool
+from backtesting.subscriptions import create_subscription
+from backtesting.subscriptions.subscription import Subscription
+from backtesting.subscriptions_cache import (
+    create_subscriptions_cache,
+    SubscriptionsCache,
+    DEFAULT_MEMORY_CACHE_BYTES,
+)
+
+# the interval simulations load subscriptions at, see SimulatorPool.load_subscription_events
+INTERVAL: str = '1d'
+
+
+class CacheWarmTask:
+    __slots__ = ("subscription", "instrument", "start_date", "end_date")
+
+    def __init__(self, subscription: AnyStr, instrument: Any, start_date: dt.date, end_date: dt.date):
+        self.subscription: AnyStr = subscription
+        self.instrument: Any = instrument
+        self.start_date: dt.date = start_date
+        self.end_date: dt.date = end_date
+
+    def __str__(self) -> str:
+        return f"{self.subscription}/{self.instrument} {self.start_date}-{self.end_date}"
+
+
+def parse_args() -> Namespace:
+    parser: ArgumentParser = build_parser()
+
+    parser.add_argument(
+        "-w",
+        "--workers",
+        help="Number of subscription requests to run concurrently. Defaults to the number of cores in the config",
+        type=int,
+    )
+
+    return parser.parse_args()
+
+
+def build_coverage(config: BackTestingConfig) -> Dict[Tuple[AnyStr, Any], Set[dt.date]]:
+    """
+    The dates each (subscription, instrument) pair is needed for, across every simulation in the config.
+    """
+    coverage: Dict[Tuple[AnyStr, Any], Set[dt.date]] = {}
+    for simulation_config in config.simulation_configs.values():
+        dates = [d.date() for d in pd.date_range(simulation_config.start_date, simulation_config.end_date)]
+        for subscription in simulation_config.subscriptions:
+            for instrument in simulation_config.instruments:
+                coverage.setdefault((subscription, instrument), set()).update(dates)
+    return coverage
+
+
+def build_tasks(
+        coverage: Dict[Tuple[AnyStr, Any], Set[dt.date]],
+        subscriptions_cache: SubscriptionsCache,
+        interval: str = INTERVAL
+) -> List[CacheWarmTask]:
+    tasks: List[CacheWarmTask] = []
+    for (subscription, instrument), dates in coverage.items():
+        dates = sorted(dates)
+        ranges = SimulatorPool.get_missing_date_ranges([pd.Timestamp(d) for d in dates])
+
+        missing_dates: List[pd.Timestamp] = []
+        for date_range in ranges:
+            missing_dates.extend(
+                subscriptions_cache.missing_dates(
+                    subscription=subscription,
+                    start_date=str(date_range[0].date()),
+                    end_date=str(date_range[-1].date()),
+                    instruments=[instrument],
+                    interval=interval
+                )
+            )
+
+        if missing_dates:
+            tasks.extend(
+                CacheWarmTask(subscription, instrument, date_range[0].date(), date_range[-1].date())
+                for date_range in SimulatorPool.get_missing_date_ranges(missing_dates)
+            )
+    return tasks
+
+
+def warm_subscription(
+        task: CacheWarmTask,
+        subscription: Subscription,
+        subscriptions_cache: SubscriptionsCache,
+        interval: str = INTERVAL
+) -> int:
+    subscription_events = subscription.get(
+        start_date=str(task.start_date),
+        end_date=str(task.end_date),
+        instruments=[task.instrument],
+        interval=interval
+    )
+
+    subscriptions_cache.save(
+        subscription=task.subscription,
+        subscription_events=subscription_events,
+        interval=interval
+    )
+    return subscription_events.shape[0]
+
+
+def warm_cache(
+        tasks: List[CacheWarmTask],
+        subscriptions: Dict[AnyStr, Subscription],
+        subscriptions_cache: SubscriptionsCache,
+        workers: int,
+        interval: str = INTERVAL
+) -> List[Tuple[CacheWarmTask, Exception]]:
+    """
+    Load every task from its subscription and save it to the cache.
+    Requests are io bound, so they run on threads that share each subscription's session and rate limiter.
+    """
+    logger: logging.Logger = logging.getLogger("WarmCache")
+
+    errors: List[Tuple[CacheWarmTask, Exception]] = []
+    total_rows: int = 0
+    total_days: int = 0
+    start_time = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+        futures = {
+            executor.submit(
+                warm_subscription, task, subscriptions[task.subscription], subscriptions_cache, interval
+            ): task
+            for task in tasks
+        }
+
+        for completed, future in enumerate(as_completed(futures), start=1):
+            task = futures[future]
+            elapsed = max(time.monotonic() - start_time, 1e-9)
+            try:
+                rows = future.result()
+            except Exception as e:
+                errors.append((task, e))
+                logger.error(f"[{completed}/{len(tasks)}] {task} failed: {e}")
+                continue
+
+            total_rows += rows
+            total_days += (task.end_date - task.start_date).days + 1
+            logger.info(
+                f"[{completed}/{len(tasks)}] {task}, {rows} rows, "
+                f"(throughput) {total_rows / elapsed:.0f} rows/s, {total_days / elapsed:.2f} days/s"
+            )
+
+    logger.info(
+        f"cache warm: (tasks) {len(tasks)}, (failed) {len(errors)}, (rows) {total_rows}, "
+        f"(elapsed) {time.monotonic() - start_time:.1f}s"
+    )
+    return errors
+
+
+def main(
+        datastore: AnyStr,
+        datastore_parameters: Dict[Any, Any],
+        scenario_path: Any,
+        scenario: AnyStr,
+        subscriptions_path: AnyStr,
+        pipeline_path: AnyStr,
+        simulations_path: AnyStr,
+        output_path: AnyStr,
+        workers: int,
+        start_date: AnyStr,
+        end_date: AnyStr,
+        simulations_filter: List[AnyStr],
+) -> List[Tuple[CacheWarmTask, Exception]]:
+
+    """
+    Fill the subscriptions cache with everything the scenario's simulations will load, so they start against a warm cache.
+    The parameters are the same as backtesting.main, with workers setting how many requests run concurrently.
+    """
+    logger: logging.Logger = logging.getLogger("WarmCache")
+
+    config: BackTestingConfig = load_config(
+        datastore=datastore,
+        datastore_parameters=datastore_parameters,
+        scenario=scenario,
+        scenario_path=scenario_path,
+        subscriptions_path=subscriptions_path,
+        pipeline_path=pipeline_path,
+        simulations_path=simulations_path,
+        output_path=output_path,
+        num_cores=workers,
+        num_batches=None,
+        start_date=start_date,
+        end_date=end_date,
+        simulations_filter=simulations_filter,
+    )
+
+    subscriptions_cache: SubscriptionsCache = create_subscriptions_cache(
+        cache_name=config.subscriptions_cache['datastore'],
+        datastore_parameters=config.subscriptions_cache['datastore_parameters'],
+        mode=config.subscriptions_cache['mode'],
+        enable_cache=config.subscriptions_cache['enable_cache'],
+        memory_cache_bytes=config.subscriptions_cache.get('memory_cache_bytes', DEFAULT_MEMORY_CACHE_BYTES),
+    )
+    if not subscriptions_cache.enable_cache:
+        logger.warning("subscriptions cache is disabled, there is nothing to warm")
+        return []
+
+    coverage = build_coverage(config)
+    subscriptions: Dict[AnyStr, Subscription] = {
+        k: create_subscription(k, v)
+        for (k, v) in config.subscriptions.items()
+        if k in set(subscription for (subscription, _) in coverage)
+    }
+
+    tasks: List[CacheWarmTask] = build_tasks(coverage, subscriptions_cache)
+    logger.info(
+        f"coverage: (subscription/instruments) {len(coverage)}, "
+        f"(days) {sum(len(dates) for dates in coverage.values())}, (to load) {len(tasks)} date ranges"
+    )
+
+    return warm_cache(
+        tasks=tasks,
+        subscriptions=subscriptions,
+        subscriptions_cache=subscriptions_cache,
+        workers=config.num_cores,
+    )
+
+
+if __name__ == "__main__":
+    args: Namespace = parse_args()
+    logger: logging.Logger = setup_logging(args, "warm_cache")
+
+    try:
+
+        errors = main(**config_arguments(args), workers=args.workers)
+
+        if 0 != len(errors):
+            logger.error("Encountered errors warming the subscriptions cache, please check logs")
+            sys.exit(1)
+
+    except KeyboardInterrupt:
+        logger.info("Received KeyboardInterrupt")
+
+    except Exception as ex:
+        logger.exception("Unexpected exception: ", ex)
+        sys.exit(1)
+
+    finally:
+        logger.info("Shutting down")
+
+    logger.info("Exit")
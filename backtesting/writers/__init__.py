@@ -1,18 +1,24 @@
 from backtesting.writers.writer import Writer
 from ..writers.csv_writer import CsvWriter
+from ..writers.parquet_writer import ParquetWriter
+from ..writers.background_writer import BackgroundWriter
 
 
 def get_writer(datastore):
     if datastore == CsvWriter.__name__:
         writer = CsvWriter
+    elif datastore == ParquetWriter.__name__:
+        writer = ParquetWriter
     return writer
 
 
-def create_writer(writer_name: str, datastore_parameters) -> Writer:
+def create_writer(writer_name: str, datastore_parameters, write_queue_size: int = None) -> Writer:
     _writer = get_writer(writer_name)
     writer_ = _writer.create(
         datastore_attributes=datastore_parameters
     )
 
+    if write_queue_size:
+        return BackgroundWriter(writer_, write_queue_size)
     return writer_
 
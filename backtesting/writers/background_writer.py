@@ -0,0 +1,78 @@
+import datetime as dt
+import logging
+import queue
+import threading
+from typing import Optional
+
+import pandas as pd
+
+from backtesting.writers.writer import Writer
+
+DEFAULT_WRITE_QUEUE_SIZE = 8
+
+
+class BackgroundWriter(Writer):
+    """
+    Writes results with another writer on a background thread, so simulations carry on while they are written.
+
+    Writes are queued, at most queue_size at a time: write_results blocks while the queue is full, which holds
+    back simulations that produce results faster than they can be written. flush waits for the queued writes and
+    fsyncs their files. Once a write fails, the writes queued after it are dropped and its error is raised by
+    every later write_results and flush.
+    """
+
+    def __init__(self, writer: Writer, queue_size: int = DEFAULT_WRITE_QUEUE_SIZE):
+        super().__init__(f"BackgroundWriter[{writer.name}]")
+        self.writer: Writer = writer
+        self.queue: queue.Queue = queue.Queue(maxsize=max(queue_size, 1))
+        self.error: Optional[Exception] = None
+        self.thread: Optional[threading.Thread] = None
+        # save_simulation writes partitions from several threads
+        self.lock: threading.Lock = threading.Lock()
+        self.logger: logging.Logger = logging.getLogger(self.name)
+
+    def _run(self):
+        while True:
+            kwargs = self.queue.get()
+            try:
+                if kwargs is None:
+                    return
+                if self.error is None:
+                    self.writer.write_results(**kwargs)
+            except Exception as e:
+                self.logger.error(f"write_results: (file) {kwargs.get('file')}, (error) {e}")
+                self.error = e
+            finally:
+                self.queue.task_done()
+
+    def _raise_error(self):
+        if self.error is not None:
+            raise self.error
+
+    def write_results(
+            self,
+            results: pd.DataFrame,
+            mode: str,
+            store_index: bool,
+            file: str = None,
+            date: dt.date = None,
+            uid: str = None,
+            version: int = None,
+    ):
+        self._raise_error()
+        with self.lock:
+            if self.thread is None:
+                # started with the first write after a flush, so an idle writer holds no thread
+                self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self.thread.start()
+        self.queue.put(dict(
+            results=results, mode=mode, store_index=store_index, file=file, date=date, uid=uid, version=version
+        ))
+
+    def flush(self):
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+        self._raise_error()
+        self.writer.flush()
@@ -5,11 +5,16 @@ import os
 
 import pandas as pd
 
-from backtesting.writers.writer import Writer
+from backtesting.writers.writer import Writer, format_trading_session
 from backtesting.datastore.csv_datastore import CsvDataStore
 
 
 class CsvWriter(Writer):
+    """
+    Writes results as csv files under the datastore's entry_point: mode "w" replaces the file and mode "a" adds the
+    rows to the end of it, writing the header only when the file is new or empty.
+    """
+
     def __init__(self, datastore):
         self.datastore: CsvDataStore = datastore
         super().__init__('CsvWriter')
@@ -41,12 +46,16 @@ class CsvWriter(Writer):
             store_index: bool,
             file: str = None,
             date: dt.date = None,
+            uid: str = None,
+            version: int = None,
     ):
         results["creation_timestamp"] = dt.datetime.now()
-        results["trading_session"] = results["trading_session"].apply(
-            lambda x: x.strftime("%Y-%m-%d")
-        )
+        results["trading_session"] = format_trading_session(results["trading_session"])
 
         path = os.path.join(self.datastore.entry_point, file)
         os.makedirs(os.path.dirname(path), exist_ok=True)
-        results.to_csv(path)
+        if mode == "a" and os.path.exists(path) and os.path.getsize(path) > 0:
+            results.to_csv(path, mode="a", header=False)
+        else:
+            results.to_csv(path, mode="w")
+        self.written.append(path)
@@ -0,0 +1,124 @@
+from typing import Dict, Any, AnyStr, List
+
+import datetime as dt
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from backtesting.writers.writer import Writer
+from backtesting.datastore.csv_datastore import CsvDataStore
+
+try:
+    import pyarrow
+except ImportError:
+    # an optional dependency, pip install backtesting[parquet]
+    pyarrow = None
+
+# columns repeating one value per simulation, stored dictionary encoded
+DICTIONARY_PREFIXES = ("strategy_", "model_", "exit_", "risk_")
+
+
+class ParquetWriter(Writer):
+    """
+    Writes results as a hive partitioned parquet dataset, uid=/version=/trading_session=, under the datastore's
+    entry_point, which pd.read_parquet reads back whole or filtered by partition.
+
+    Every write adds a part file to each trading_session partition it has rows for, named after the file it was
+    given: mode "w" replaces that file's earlier parts and mode "a" adds another, so appending never rewrites
+    what was already written. compact merges the parts of each partition into one file, which later writes in
+    mode "w" no longer replace.
+    """
+
+    def __init__(self, datastore):
+        if pyarrow is None:
+            raise ImportError("ParquetWriter needs pyarrow, install it with pip install backtesting[parquet]")
+        self.datastore: CsvDataStore = datastore
+        super().__init__('ParquetWriter')
+
+    @classmethod
+    def create(
+            cls,
+            datastore_attributes: Dict[AnyStr, Any]
+    ):
+
+        _auth = datastore_attributes.get('auth', {})
+
+        datastore = CsvDataStore.create(
+            {k: v for (k, v) in datastore_attributes.items() if k != 'auth'}
+        )
+
+        datastore.authenticate(
+            auth=_auth
+        )
+
+        instance = cls(datastore=datastore)
+
+        return instance
+
+    def dataset_path(self, uid: str, version: int) -> Path:
+        return Path(self.datastore.entry_point) / f"uid={uid}" / f"version={version}"
+
+    @staticmethod
+    def _dictionary_encode(results: pd.DataFrame) -> pd.DataFrame:
+        for column in results.columns:
+            dtype = results[column].dtype
+            strings = dtype == object or pd.api.types.is_string_dtype(dtype)
+            if str(column).startswith(DICTIONARY_PREFIXES) and strings:
+                results[column] = results[column].astype("category")
+        return results
+
+    @staticmethod
+    def _parts(directory: Path, name: str = None) -> List[Path]:
+        parts = sorted(directory.glob("*.parquet"))
+        if name is None:
+            return parts
+        # parts are named {name}-{write time}
+        return [part for part in parts if part.stem.rsplit("-", 1)[0] == name]
+
+    def write_results(
+            self,
+            results: pd.DataFrame,
+            mode: str,
+            store_index: bool,
+            file: str = None,
+            date: dt.date = None,
+            uid: str = None,
+            version: int = None,
+    ):
+        results["creation_timestamp"] = dt.datetime.now()
+        results = self._dictionary_encode(results)
+        # sessions are formatted once per distinct value rather than per row
+        codes, sessions = pd.factorize(results.pop("trading_session"))
+        sessions = pd.to_datetime(sessions).strftime("%Y-%m-%d")
+
+        name = Path(file).stem if file else "part"
+        suffix = dt.datetime.now().strftime("%Y%m%d%H%M%S%f")
+        base = self.dataset_path(uid, version)
+        for (i, session) in enumerate(sessions):
+            directory = base / f"trading_session={session}"
+            os.makedirs(directory, exist_ok=True)
+            if mode == "w":
+                for part in self._parts(directory, name):
+                    part.unlink()
+            path = directory / f"{name}-{suffix}.parquet"
+            results[codes == i].to_parquet(path, index=store_index)
+            self.written.append(str(path))
+
+    def compact(self, uid: str, version: int):
+        """
+        Rewrite the part files of every trading_session partition of a uid and version as a single file.
+        """
+        for directory in sorted(self.dataset_path(uid, version).glob("trading_session=*")):
+            parts = self._parts(directory)
+            if len(parts) < 2:
+                continue
+            df = self._dictionary_encode(pd.concat([pd.read_parquet(part) for part in parts]))
+            compacted = directory / f"compacted-{dt.datetime.now().strftime('%Y%m%d%H%M%S%f')}.parquet"
+            # written aside first, so a failure leaves the parts as they were
+            tmp = directory / f"{compacted.name}.tmp"
+            df.to_parquet(tmp)
+            for part in parts:
+                part.unlink()
+            os.replace(tmp, compacted)
+            self.written.append(str(compacted))
@@ -1,15 +1,28 @@
 import datetime as dt
+import os
 from abc import abstractmethod
+from typing import List
 
+import numpy as np
 import pandas as pd
 
 
+def format_trading_session(sessions: pd.Series) -> pd.Series:
+    # sessions as %Y-%m-%d strings, formatted once per distinct session rather than per row
+    codes, uniques = pd.factorize(sessions)
+    formatted = np.asarray(pd.to_datetime(uniques).strftime("%Y-%m-%d"), dtype=object)[codes]
+    formatted[codes < 0] = None
+    return pd.Series(formatted, index=sessions.index, name=sessions.name)
+
+
 class Writer:
     def __init__(
             self,
             name: str,
     ):
         self.name: str = name
+        # files written since the last flush
+        self.written: List[str] = []
 
     @classmethod
     def create(cls, attributes):
@@ -24,5 +37,19 @@ class Writer:
             store_index: bool,
             file: str = None,
             date: dt.date = None,
+            uid: str = None,
+            version: int = None,
     ):
         pass
+
+    def flush(self):
+        # fsync the files written since the last flush, those replaced since are skipped
+        for path in dict.fromkeys(self.written):
+            if not os.path.exists(path):
+                continue
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        self.written = []
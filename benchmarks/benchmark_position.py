@@ -0,0 +1,36 @@
+"""
+Time fills against positions holding 10, 1,000 and 100,000 open lots.
+
+    python benchmarks/benchmark_position.py
+"""
+import timeit
+
+from backtesting.position import Position
+
+LOTS = [10, 1000, 100000]
+NUMBER = 1000
+
+
+def build_position(netting_engine: str, lots: int) -> Position:
+    position = Position(name="btc", contract_size=1, price_increment=2, netting_engine=netting_engine)
+    for i in range(lots):
+        position.on_trade(1, 100 + i % 10, 1)
+    return position
+
+
+def benchmark(netting_engine: str, lots: int):
+    position = build_position(netting_engine, lots)
+
+    # every closing fill consumes one lot and every extending fill adds one back, so the book size is constant
+    def fill():
+        position.on_trade(-1, 105, 1)
+        position.on_trade(1, 105, 1)
+
+    seconds = timeit.timeit(fill, number=NUMBER)
+    print(f"{netting_engine:>4} {lots:>7} lots: {seconds / (NUMBER * 2) * 1e6:8.2f}us per fill")
+
+
+if __name__ == "__main__":
+    for _netting_engine in ["fifo", "lifo"]:
+        for _lots in LOTS:
+            benchmark(_netting_engine, _lots)
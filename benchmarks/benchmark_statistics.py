@@ -0,0 +1,84 @@
+"""
+Time recording event, order and trade snapshots into Stats, and turning them into a DataFrame.
+
+    python benchmarks/benchmark_statistics.py
+"""
+import time
+import tracemalloc
+
+import pandas as pd
+
+from backtesting.event import Event
+from backtesting.order import Order
+from backtesting.portfolio import Portfolio
+from backtesting.statistics.statistics import Stats
+from backtesting.trade import Trade
+
+ROWS = 50000
+# best of, the machine's noise is about as large as the differences measured
+REPEAT = 20
+SYMBOLS = ["btc", "eth", "sol", "ada"]
+
+
+def build_rows(rows: int):
+    start = pd.Timestamp("2022-01-03", tz="UTC")
+    snapshots = []
+    for i in range(rows):
+        symbol_id = SYMBOLS[i % len(SYMBOLS)]
+        event = Event.create(dict(
+            timestamp=start + pd.Timedelta(seconds=i),
+            timestamp_millis=1641168000000 + i * 1000,
+            event_type="market_data",
+            source="coin_gecko",
+            symbol=symbol_id,
+            symbol_id=symbol_id,
+            price=100.0 + i % 13,
+            rate_to_usd=1,
+        ))
+        if i % 10 == 1:
+            order = Order(
+                timestamp=event.timestamp, source="coin_gecko", symbol_id=symbol_id, account_id=1, contract_qty=1,
+                order_type="R", time_in_force="K", symbol=symbol_id, signal="DCA",
+            )
+            snapshots.append(dict(event=event, order=order))
+        elif i % 10 == 2:
+            trade = Trade(event.timestamp, "coin_gecko", symbol_id, symbol_id, 1, 1, event.price, 1)
+            snapshots.append(dict(event=event, trade=trade))
+        else:
+            snapshots.append(dict(event=event))
+    return snapshots
+
+
+def record(snapshots) -> Stats:
+    portfolio = Portfolio()
+    stats = Stats(portfolio)
+    for snapshot in snapshots:
+        stats.update_event_snapshot(portfolio=portfolio, **snapshot)
+    return stats
+
+
+def benchmark(rows: int):
+    snapshots = build_rows(rows)
+
+    recording = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        stats = record(snapshots)
+        recording = min(recording, time.perf_counter() - start)
+
+    # traced separately, tracing slows recording down
+    tracemalloc.start()
+    record(snapshots)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    stats.events_to_df(["symbol_id"])
+    to_df = time.perf_counter() - start
+
+    print(f"{rows} rows: (recording) {recording / rows * 1e6:.2f}us per row, (memory) {peak / rows:.0f} bytes per row, "
+          f"(events_to_df) {to_df:.2f}s")
+
+
+if __name__ == "__main__":
+    benchmark(ROWS)
@@ -17,4 +17,8 @@ setup(
         'numpy',
         'jupyterlab'
     ],
+    extras_require={
+        'parquet': ['pyarrow'],
+        'test': ['pytest', 'pyarrow'],
+    },
 )
\ No newline at end of file
@@ -0,0 +1,69 @@
+import datetime as dt
+from unittest.mock import Mock
+
+import pandas as pd
+import pytest
+from backtesting.backtester import Backtester
+from backtesting.event import Event
+from backtesting.event_stream.event_stream_no_sample import EventStreamNoSample
+from backtesting.portfolio import ArrayPortfolio, Portfolio
+from backtesting.risk_manager.no_risk import NoRisk
+from backtesting.trade import Trade
+
+
+@pytest.fixture
+def events():
+    timestamps = pd.to_datetime(["2022-01-03 10:00", "2022-01-03 10:00", "2022-01-03 22:00", "2022-01-03 22:00"], utc=True)
+    return pd.DataFrame({
+        "timestamp_millis": timestamps.asi8 // 10 ** 6,
+        "source": "coin_gecko",
+        "symbol_id": ["btc", "eth", "btc", "eth"],
+        "bid_price": [99.0, 9.5, 104.0, 8.0],
+        "ask_price": [101.0, 10.5, 106.0, 9.0],
+        "rate_to_usd": [1.0, 1.0, 1.0, 0.5],
+        "event_type": ["market_data", "market_data", "closing_price", "closing_price"],
+    }, index=pd.Index(timestamps, name="timestamp"))
+
+
+def run(events, portfolio, matching_method, batch_eod):
+    backtester = Backtester(
+        risk_manager=NoRisk(),
+        strategy=Mock(**{"on_state.return_value": []}),
+        netting_engine="avg_price",
+        matching_method=matching_method,
+        event_stream=EventStreamNoSample(),
+        store_md_snapshot=True,
+        batch_eod=batch_eod,
+        portfolio=portfolio,
+    )
+    # a long and a short position in btc, a short one in eth
+    for (account_id, symbol_id, contract_qty, price) in [(1, "btc", 2, 100), (2, "btc", -1, 102), (1, "eth", -3, 10)]:
+        event = Event(source="coin_gecko", symbol_id=symbol_id, price=price, contract_size=1, price_increment=2,
+                      rate_to_usd=1, currency="USD", contract_unit_of_measure=symbol_id.upper())
+        backtester.portfolio.on_trade(Trade(0, "coin_gecko", symbol_id, symbol_id, account_id, contract_qty, price, 1), event)
+
+    backtester.event_stream.generate_events = lambda date, subscriptions: events.copy()
+    backtester.run_day_simulation(dt.date(2022, 1, 3), subscriptions=[events])
+    return backtester.portfolio
+
+
+class TestBatchEod:
+
+    @pytest.mark.parametrize("portfolio", [Portfolio, ArrayPortfolio])
+    @pytest.mark.parametrize("matching_method", ["side_of_book", "mid"])
+    def test_matches_event_by_event(self, events, portfolio, matching_method):
+        batched = run(events, portfolio, matching_method, batch_eod=True)
+        expected = run(events, portfolio, matching_method, batch_eod=False)
+
+        assert {k: p.unrealised_pnl for (k, p) in batched.positions.items()} == pytest.approx(
+            {k: p.unrealised_pnl for (k, p) in expected.positions.items()}
+        )
+        assert batched.unrealised_pnl == pytest.approx(expected.unrealised_pnl)
+
+    def test_side_of_book(self, events):
+        portfolio = run(events, Portfolio, "side_of_book", batch_eod=True)
+
+        # longs are marked at the ask and shorts at the bid
+        assert portfolio.positions[("coin_gecko", "btc", 1)].unrealised_pnl == pytest.approx(2 * (106 - 100))
+        assert portfolio.positions[("coin_gecko", "btc", 2)].unrealised_pnl == pytest.approx(-1 * (104 - 102))
+        assert portfolio.positions[("coin_gecko", "eth", 1)].unrealised_pnl == pytest.approx(-3 * (8 - 10) * 0.5)
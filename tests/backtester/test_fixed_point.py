@@ -0,0 +1,84 @@
+import datetime as dt
+from unittest.mock import Mock
+
+import pytest
+
+from backtesting.backtester import Backtester
+from backtesting.event import Event
+from backtesting.event_stream.event_stream_no_sample import EventStreamNoSample
+from backtesting.exit_strategy import AbstractExitStrategy
+from backtesting.risk_manager.no_risk import NoRisk
+from backtesting.strategy.dca import DCA
+from backtesting.subscriptions.market_data.coin_gecko.coin_gecko import CoinGeckoMarketData
+from backtesting.trade import Trade
+
+HOUR = 60 * 60 * 1000
+
+
+class StubCoinGecko(CoinGeckoMarketData):
+    """
+    Hourly prices quoted to 2 decimal places, so that floats and ticks disagree unless they are converted exactly.
+    """
+
+    def get_coin_metadata(self, instrument):
+        return {"id": instrument, "symbol": "btc"}
+
+    def _get_prices(self, instrument, window):
+        start, end = window
+        start_millis = start * 1000
+        return [[start_millis + i * HOUR, round(100 + 0.01 * (i % 7) + 0.1 * i, 2)] for i in range((end - start) // 3600)]
+
+
+def run_dca(fixed_point, contract_qty=0.01):
+    market_data = StubCoinGecko(fixed_point=fixed_point, quantity_increment=2)
+    events = market_data.get("2022-01-03", "2022-01-03", ["bitcoin"], "1h")
+
+    dca = DCA(
+        account_id=1,
+        contract_qty=contract_qty,
+        time="0000",
+        day="monday",
+        freq="1h",
+        exit_strategy=Mock(spec=AbstractExitStrategy, **{"generate_exit_order_signal.return_value": []}),
+    )
+    dca.update(start_date=dt.date(2022, 1, 3))
+    backtester = Backtester(
+        risk_manager=NoRisk(),
+        strategy=dca,
+        netting_engine="fifo",
+        event_stream=EventStreamNoSample(),
+        store_md_snapshot=True,
+    )
+    backtester.event_stream.generate_events = lambda date, subscriptions: events
+    backtester.run_day_simulation(dt.date(2022, 1, 3), subscriptions=[events])
+    return backtester.portfolio
+
+
+class TestFixedPoint:
+
+    def test_fractional_quantities(self):
+        fixed, floats = run_dca(fixed_point=True), run_dca(fixed_point=False)
+        position = fixed.positions[("coin_gecko", "coin_gecko_bitcoin", 1)]
+
+        assert position.quantity_scale == 100
+        assert position.open_positions.quantity == position.net_lots == position.no_of_trades
+        assert position.net_position == pytest.approx(0.01 * position.no_of_trades)
+        assert position.no_of_trades == floats.positions[("coin_gecko", "coin_gecko_bitcoin", 1)].no_of_trades
+        assert fixed.unrealised_pnl == pytest.approx(floats.unrealised_pnl)
+        assert fixed.inventory_dollars == pytest.approx(floats.inventory_dollars)
+
+    def test_positions_close_exactly(self):
+        portfolio = run_dca(fixed_point=True, contract_qty=0.07)
+        position = portfolio.positions[("coin_gecko", "coin_gecko_bitcoin", 1)]
+        avg_price, net_position = position.get_price(), position.net_position
+        price = int(avg_price) + 100
+        close = Trade(0, "coin_gecko", "bitcoin", "coin_gecko_bitcoin", 1, -position.net_position, price, 1)
+        event = Event(
+            source="coin_gecko", symbol_id="coin_gecko_bitcoin", price=price, contract_size=1, rate_to_usd=1,
+            contract_unit_of_measure="BTC", price_scale=100, quantity_scale=100,
+        )
+        portfolio.on_trade(close, event)
+
+        assert len(portfolio.positions) == 0
+        assert position.net_lots == 0 and position.net_position == 0
+        assert position.realised_pnl == pytest.approx((price - avg_price) / 100 * net_position)
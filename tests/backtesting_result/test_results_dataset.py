@@ -0,0 +1,52 @@
+import pandas as pd
+import pytest
+from backtesting.backtesting_result import ResultsDataset
+
+
+def batch(i):
+    timestamps = pd.date_range("2022-01-03", periods=4, freq="6h", tz="US/Eastern") + pd.Timedelta(days=i)
+    return pd.DataFrame(
+        {
+            "symbol_id": pd.Series(["btc", "eth", None, "btc"], dtype="str"),
+            "trading_session": timestamps.normalize().tz_localize(None),
+            "hash": [f"plan-{i}"] * 4,
+            "realised_pnl": [1.5, float("nan"), -2.0, 0.25],
+            "trade_cnt": [i, 1, 0, 2],
+            "flag": [True, False, True, False],
+            "signal": pd.Categorical(["DCA", None, "DCA", "Oscillator"]),
+            "session_date": [ts.date() for ts in timestamps],
+        },
+        index=pd.Index(timestamps, name="timestamp"),
+    )
+
+
+class TestResultsDataset:
+
+    def test_spilled_batches_read_back(self, tmp_path):
+        batches = [batch(i) for i in range(3)]
+        dataset = ResultsDataset(spill_dir=str(tmp_path))
+        for df in batches:
+            dataset.append(df)
+        dataset.append(pd.DataFrame())
+
+        assert len(dataset) == 3
+        assert sorted(p.suffix for p in (tmp_path / dataset.spill_path).iterdir()) == [".npz"] * 3
+        # concat infers the frequency of the contiguous timestamps, which is not kept
+        pd.testing.assert_frame_equal(dataset.to_frame(), pd.concat(batches), check_freq=False)
+
+        dataset.close()
+        assert list(tmp_path.iterdir()) == []
+
+    def test_multi_index(self, tmp_path):
+        batches = [batch(i).set_index("hash", append=True) for i in range(2)]
+        dataset = ResultsDataset(spill_dir=str(tmp_path))
+        for df in batches:
+            dataset.append(df)
+        pd.testing.assert_frame_equal(dataset.to_frame(), pd.concat(batches))
+
+    def test_in_memory(self):
+        batches = [batch(i) for i in range(2)]
+        dataset = ResultsDataset()
+        for df in batches:
+            dataset.append(df)
+        pd.testing.assert_frame_equal(dataset.to_frame(), pd.concat(batches))
@@ -0,0 +1,37 @@
+import importlib.util
+import os
+import sys
+import types
+
+# backtesting.subscriptions imports every subscription module, and the yahoo and crypto fear & greed modules are
+# not in every checkout: where they are missing, placeholders that refuse to be created stand in for them, so the
+# other subscriptions and everything importing the package are still tested
+OPTIONAL_SUBSCRIPTIONS = {
+    "backtesting.subscriptions.market_data.yahoo.yahoo": "YahooMarketData",
+    "backtesting.subscriptions.indicator.crypto_fear_greed_index.crypto_fear_greed_index": "CryptoFearGreedIndex",
+}
+
+
+def missing_subscription(name):
+    def create(cls, **kwargs):
+        raise NotImplementedError(f"{name} is not in this checkout")
+
+    return type(name, (), {"create": classmethod(create)})
+
+
+def stub_missing_subscriptions():
+    root = os.path.dirname(os.path.dirname(importlib.util.find_spec("backtesting").origin))
+    for (module, name) in OPTIONAL_SUBSCRIPTIONS.items():
+        parts = module.split(".")
+        if os.path.exists(os.path.join(root, *parts) + ".py"):
+            continue
+        for i in range(len(parts)):
+            package = ".".join(parts[:i + 1])
+            path = os.path.join(root, *parts[:i + 1])
+            if package not in sys.modules and not os.path.exists(path) and not os.path.exists(path + ".py"):
+                sys.modules[package] = types.ModuleType(package)
+                sys.modules[package].__path__ = []
+        setattr(sys.modules[module], name, missing_subscription(name))
+
+
+stub_missing_subscriptions()
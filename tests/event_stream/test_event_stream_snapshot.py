@@ -0,0 +1,28 @@
+import datetime as dt
+
+import pandas as pd
+import pytest
+from backtesting.event_stream.event_stream_snapshot import EventStreamSnapshot
+
+
+@pytest.fixture
+def market_data():
+    timestamps = pd.to_datetime(["2022-01-03 00:00", "2022-01-03 00:30", "2022-01-03 01:30"], utc=True)
+    return pd.DataFrame({
+        "symbol_id": pd.Series(["btc", "eth", "btc"], dtype="category", index=timestamps),
+        "price": [100.0, 10.0, 101.0],
+    }, index=timestamps)
+
+
+class TestEventStreamSnapshot:
+
+    @pytest.mark.parametrize("dtype", ["category", object])
+    def test_sample(self, market_data, dtype):
+        market_data["symbol_id"] = market_data["symbol_id"].astype(dtype)
+        df = EventStreamSnapshot(sample_rate="1h").sample(market_data, dt.datetime(2022, 1, 3))
+
+        assert df["symbol_id"].dtype == market_data["symbol_id"].dtype
+        at = df.loc[pd.Timestamp("2022-01-03 02:00", tz="UTC")].set_index("symbol_id")["price"]
+        assert at.to_dict() == {"btc": 101.0, "eth": 10.0}
+        at = df.loc[pd.Timestamp("2022-01-03 01:00", tz="UTC")].set_index("symbol_id")["price"]
+        assert at.to_dict() == {"btc": 100.0, "eth": 10.0}
@@ -0,0 +1,31 @@
+import pytest
+from backtesting.event import Event
+from backtesting.trade import Trade
+
+
+@pytest.fixture
+def make_event():
+    def make_event(symbol_id, price, **kwargs):
+        return Event(
+            timestamp_millis=0,
+            source="coin_gecko",
+            symbol=symbol_id,
+            symbol_id=symbol_id,
+            price=price,
+            rate_to_usd=1,
+            contract_size=1,
+            price_increment=2,
+            currency="USD",
+            contract_unit_of_measure=symbol_id.upper(),
+            **kwargs,
+        )
+
+    return make_event
+
+
+@pytest.fixture
+def make_trade():
+    def make_trade(symbol_id, account_id, contract_qty, price):
+        return Trade(0, "coin_gecko", symbol_id, symbol_id, account_id, contract_qty, price, 1)
+
+    return make_trade
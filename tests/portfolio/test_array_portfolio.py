@@ -0,0 +1,82 @@
+import pytest
+from backtesting.fixed_point import LEGACY_VALUE_SCALE
+from backtesting.portfolio import ArrayPortfolio, Portfolio, determine_portfolio_constructor
+
+
+@pytest.fixture
+def portfolio():
+    return ArrayPortfolio(calc_upnl=True, accounts_capacity=1, instruments_capacity=1)
+
+
+class TestArrayPortfolio:
+
+    def test_determine_portfolio_constructor(self):
+        assert determine_portfolio_constructor("array_portfolio") is ArrayPortfolio
+        with pytest.raises(ValueError):
+            determine_portfolio_constructor("unknown")
+
+    @pytest.mark.parametrize("netting_engine", ["fifo", "lifo", "side_of_book"])
+    def test_only_nets_at_average_cost(self, netting_engine):
+        with pytest.raises(ValueError):
+            ArrayPortfolio(netting_engine=netting_engine)
+        assert ArrayPortfolio(netting_engine="avg_price").netting_engine == "avg_price"
+
+    def test_average_cost_netting(self, portfolio, make_event, make_trade):
+        portfolio.on_trade(make_trade("btc", 1, 1, 100), make_event("btc", 100))
+        portfolio.on_trade(make_trade("btc", 1, 1, 110), make_event("btc", 110))
+        position = portfolio.positions[("coin_gecko", "btc", 1)]
+        assert position.net_position == 2
+        assert position.get_price() == 105
+
+        portfolio.on_trade(make_trade("btc", 1, -1, 120), make_event("btc", 120))
+        assert portfolio.realised_pnl == 15 / LEGACY_VALUE_SCALE
+        assert position.get_price() == 105
+
+    def test_mark_to_market_all_accounts(self, portfolio, make_event, make_trade):
+        for account in range(1, 4):
+            portfolio.on_trade(make_trade("btc", account, account, 100), make_event("btc", 100))
+        portfolio.on_trade(make_trade("eth", 1, -1, 10), make_event("eth", 10))
+
+        portfolio.update_portfolio(make_event("btc", 110))
+        assert portfolio.unrealised_pnl == 60
+        portfolio.update_portfolio(make_event("eth", 12))
+        assert portfolio.unrealised_pnl == 58
+        assert len(portfolio.positions) == 4
+
+    def test_close_position(self, portfolio, make_event, make_trade):
+        portfolio.on_trade(make_trade("btc", 7, 2, 100), make_event("btc", 100))
+        portfolio.on_trade(make_trade("btc", 7, -2, 90), make_event("btc", 90))
+        assert len(portfolio.positions) == 0
+        assert portfolio.positions.get(("coin_gecko", "btc", 7)) is None
+        assert portfolio.realised_pnl == -20 / LEGACY_VALUE_SCALE
+        assert portfolio.unrealised_pnl == 0
+        assert portfolio.closed_positions[("coin_gecko", "btc", 7)].realised_pnl == -20 / LEGACY_VALUE_SCALE
+
+        portfolio.on_trade(make_trade("btc", 7, 1, 95), make_event("btc", 95))
+        assert portfolio.closed_positions == {}
+        assert portfolio.positions[("coin_gecko", "btc", 7)].exit_attr == {}
+
+    @pytest.mark.parametrize("price_scale", [None, 100])
+    def test_matches_portfolio(self, portfolio, price_scale, make_event, make_trade):
+        scale = {} if price_scale is None else {"price_scale": price_scale}
+        reference = Portfolio(netting_engine="avg_price", calc_upnl=True)
+        # opens, extends to a fractional average price, reduces, inverts, closes and reopens, across accounts
+        trades = [
+            ("btc", 1, 2, 100), ("btc", 2, -1, 100), ("btc", 1, 1, 103), ("eth", 1, 3, 10), ("btc", 1, -1, 110),
+            ("btc", 2, 3, 95), ("eth", 1, -5, 12), ("btc", 1, -2, 90), ("eth", 1, 2, 11), ("btc", 2, 2, 97),
+            ("btc", 1, 4, 91),
+        ]
+        for (symbol_id, account_id, contract_qty, price) in trades:
+            for p in (portfolio, reference):
+                p.on_trade(make_trade(symbol_id, account_id, contract_qty, price), make_event(symbol_id, price, **scale))
+                p.update_portfolio(make_event(symbol_id, price + 1, **scale))
+
+            assert portfolio.realised_pnl == pytest.approx(reference.realised_pnl, rel=1e-12)
+            assert portfolio.unrealised_pnl == pytest.approx(reference.unrealised_pnl, rel=1e-12)
+            assert {k: p.net_position for (k, p) in portfolio.positions.items()} == {
+                k: p.net_position for (k, p) in reference.positions.items()
+            }
+            assert {k: p.get_price() for (k, p) in portfolio.positions.items()} == {
+                k: p.get_price() for (k, p) in reference.positions.items()
+            }
+        assert portfolio.realised_pnl != 0
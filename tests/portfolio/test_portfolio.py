@@ -0,0 +1,114 @@
+import pandas as pd
+import pytest
+from backtesting.portfolio import Portfolio
+from backtesting.position import Position
+
+
+def recompute_unrealised_pnl(portfolio, prices):
+    # every open position revalued from scratch at the last price of its symbol
+    return sum(
+        (prices[symbol_id] - pos.get_price()) * pos.net_position * pos.contract_size
+        for ((_, symbol_id, _), pos) in portfolio.positions.items()
+    )
+
+
+@pytest.fixture
+def portfolio():
+    return Portfolio(netting_engine="avg_price", calc_upnl=True)
+
+
+class TestPortfolio:
+
+    def test_symbol_positions(self, portfolio, make_event, make_trade):
+        portfolio.on_trade(make_trade("btc", 1, 1, 100), make_event("btc", 100))
+        portfolio.on_trade(make_trade("btc", 2, -2, 100), make_event("btc", 100))
+        portfolio.on_trade(make_trade("eth", 1, 3, 10), make_event("eth", 10))
+        assert set(portfolio.symbol_positions) == {"btc", "eth"}
+        assert set(portfolio.symbol_positions["btc"]) == {("coin_gecko", "btc", 1), ("coin_gecko", "btc", 2)}
+        assert portfolio.symbol_positions["eth"][("coin_gecko", "eth", 1)] is portfolio.positions[("coin_gecko", "eth", 1)]
+
+        # closing one of two btc positions keeps the symbol, closing the last one removes it
+        portfolio.on_trade(make_trade("btc", 1, -1, 105), make_event("btc", 105))
+        assert set(portfolio.symbol_positions["btc"]) == {("coin_gecko", "btc", 2)}
+        portfolio.on_trade(make_trade("eth", 1, -3, 12), make_event("eth", 12))
+        assert "eth" not in portfolio.symbol_positions
+        assert set(portfolio.symbol_positions) == {"btc"}
+
+        # reopening adds it back
+        portfolio.on_trade(make_trade("eth", 1, 1, 11), make_event("eth", 11))
+        assert set(portfolio.symbol_positions["eth"]) == {("coin_gecko", "eth", 1)}
+
+    def test_remove_symbol_position(self, portfolio, make_event, make_trade):
+        portfolio.on_trade(make_trade("btc", 1, 1, 100), make_event("btc", 100))
+        portfolio.on_trade(make_trade("btc", 2, 1, 100), make_event("btc", 100))
+
+        portfolio.remove_symbol_position(("coin_gecko", "btc", 1))
+        assert set(portfolio.symbol_positions["btc"]) == {("coin_gecko", "btc", 2)}
+        portfolio.remove_symbol_position(("coin_gecko", "btc", 2))
+        assert portfolio.symbol_positions == {}
+        # removing a key that is not there is a no-op
+        portfolio.remove_symbol_position(("coin_gecko", "sol", 1))
+
+    def test_incremental_unrealised_pnl(self, portfolio, make_event, make_trade):
+        prices = {}
+
+        def trade(symbol_id, account_id, contract_qty, price):
+            prices[symbol_id] = price
+            portfolio.on_trade(make_trade(symbol_id, account_id, contract_qty, price), make_event(symbol_id, price))
+
+        def mark(symbol_id, price):
+            prices[symbol_id] = price
+            portfolio.update_portfolio(make_event(symbol_id, price))
+
+        trade("btc", 1, 2, 100)
+        trade("btc", 2, -1, 101)
+        trade("eth", 1, 5, 10)
+        trade("sol", 3, 4, 20)
+        mark("btc", 110)
+        mark("eth", 9)
+        trade("btc", 1, -1, 112)
+        trade("eth", 1, -5, 8)
+        mark("sol", 25)
+        trade("eth", 2, 2, 7)
+        mark("btc", 95)
+        portfolio.mark_to_market(pd.DataFrame({
+            "symbol_id": ["btc", "eth", "sol"], "price": [96, 7.5, 24], "rate_to_usd": [1, 1, 1]
+        }))
+        prices.update(btc=96, eth=7.5, sol=24)
+
+        assert set(portfolio.symbol_positions) == {"btc", "eth", "sol"}
+        assert portfolio.unrealised_pnl == pytest.approx(recompute_unrealised_pnl(portfolio, prices))
+        assert portfolio.unrealised_pnl == pytest.approx(sum(p.unrealised_pnl for p in portfolio.positions.values()))
+
+    @pytest.mark.parametrize("netting_engine", ["fifo", "lifo", "avg_price"])
+    def test_mark_to_market_matches_positions(self, netting_engine, make_event, make_trade):
+        portfolio = Portfolio(netting_engine=netting_engine, calc_upnl=True)
+        for account, (symbol_id, qty, price) in enumerate(
+                [("btc", 2, 100), ("btc", -3, 104), ("eth", 5, 10), ("sol", 1, 20), ("ada", 4, 1)]
+        ):
+            portfolio.on_trade(make_trade(symbol_id, account, qty, price), make_event(symbol_id, price))
+            portfolio.on_trade(make_trade(symbol_id, account, qty, price + 1), make_event(symbol_id, price + 1))
+
+        closing_prices = pd.DataFrame({
+            "symbol_id": ["btc", "eth", "btc", "sol"],
+            "price": [90, 11.5, 95, 18],
+            "rate_to_usd": [1, 1, 1, 0.5],
+        })
+        ada = portfolio.positions[("coin_gecko", "ada", 4)].unrealised_pnl
+        portfolio.mark_to_market(closing_prices)
+
+        # every position as revalued one at a time, the last btc close wins and ada keeps its last mark
+        expected = {}
+        for key, pos in portfolio.positions.items():
+            reference = Position(pos.name, pos.contract_size, pos.price_increment, netting_engine=netting_engine)
+            reference.open_positions = pos.open_positions
+            close = closing_prices.drop_duplicates("symbol_id", keep="last").set_index("symbol_id")
+            if key[1] in close.index:
+                reference.update_unrealised_pnl(close.loc[key[1], "price"], close.loc[key[1], "rate_to_usd"])
+                expected[key] = reference.unrealised_pnl
+            else:
+                expected[key] = pos.unrealised_pnl
+
+        assert {k: p.unrealised_pnl for (k, p) in portfolio.positions.items()} == pytest.approx(expected)
+        assert expected[("coin_gecko", "ada", 4)] == ada != 0
+        assert portfolio.unrealised_pnl == pytest.approx(sum(expected.values()))
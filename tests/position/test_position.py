@@ -0,0 +1,113 @@
+import pytest
+from backtesting.position import Position, LotBook
+
+
+@pytest.fixture
+def fifo_position():
+    return Position(name="btc", contract_size=1, price_increment=2, netting_engine="fifo")
+
+
+@pytest.fixture
+def lifo_position():
+    return Position(name="btc", contract_size=1, price_increment=2, netting_engine="lifo")
+
+
+class TestPosition:
+
+    def test_initialization(self, fifo_position, lifo_position):
+        assert isinstance(fifo_position.open_positions, LotBook)
+        assert not fifo_position.open_positions.lifo
+        assert lifo_position.open_positions.lifo
+
+    def test_extend_position(self, fifo_position):
+        fifo_position.on_trade(1, 100, 1)
+        fifo_position.on_trade(2, 110, 1)
+        assert [(p.quantity, p.price) for p in fifo_position.open_positions] == [(1, 100), (2, 110)]
+        assert fifo_position.realised_pnl == 0
+
+    def test_fifo_nets_oldest_lot(self, fifo_position):
+        fifo_position.on_trade(1, 100, 1)
+        fifo_position.on_trade(1, 110, 1)
+        pnl = fifo_position.on_trade(-1, 120, 1)
+        assert pnl == 20
+        assert [(p.quantity, p.price) for p in fifo_position.open_positions] == [(1, 110)]
+
+    def test_lifo_nets_newest_lot(self, lifo_position):
+        lifo_position.on_trade(1, 100, 1)
+        lifo_position.on_trade(1, 110, 1)
+        pnl = lifo_position.on_trade(-1, 120, 1)
+        assert pnl == 10
+        assert [(p.quantity, p.price) for p in lifo_position.open_positions] == [(1, 100)]
+
+    def test_partial_fill(self, fifo_position):
+        fifo_position.on_trade(3, 100, 1)
+        pnl = fifo_position.on_trade(-1, 110, 1)
+        assert pnl == 10
+        assert [(p.quantity, p.price, p.cost) for p in fifo_position.open_positions] == [(2, 100, 200)]
+
+    def test_invert_position(self, fifo_position):
+        fifo_position.on_trade(1, 100, 1)
+        fifo_position.on_trade(1, 110, 1)
+        pnl = fifo_position.on_trade(-3, 120, 1)
+        assert pnl == 30
+        assert [(p.quantity, p.price, p.cost) for p in fifo_position.open_positions] == [(-1, 120, -120)]
+        assert fifo_position.net_position == -1
+
+    def test_close_position(self, lifo_position):
+        lifo_position.on_trade(-2, 100, 1)
+        pnl = lifo_position.on_trade(2, 90, 1)
+        assert pnl == 20
+        assert len(lifo_position.open_positions) == 0
+        assert lifo_position.get_price() == 0
+
+    def test_running_aggregates(self, fifo_position):
+        fifo_position.on_trade(1, 100, 1)
+        fifo_position.on_trade(3, 120, 1)
+        fifo_position.on_trade(-2, 130, 1)
+        assert fifo_position.open_positions.quantity == 2
+        assert fifo_position.open_positions.cost == 240
+        assert fifo_position.get_price() == 120
+
+        fifo_position.update_unrealised_pnl(125, 1)
+        assert fifo_position.unrealised_pnl == 10
+
+    def test_running_price(self, fifo_position):
+        fifo_position.on_trade(1, 100, 1)
+        fifo_position.on_trade(1, 110, 1)
+        fifo_position.open_positions.set_running_price(120)
+        fifo_position.on_trade(2, 90, 1)
+        assert fifo_position.open_positions.running_average_price() == 105
+        fifo_position.on_trade(-1, 100, 1)
+        assert fifo_position.open_positions.running_average_price() == 100
+        assert fifo_position.get_price() == 290 / 3
+
+    def test_fixed_point(self):
+        position = Position(name="btc", contract_size=1, price_increment=2, netting_engine="fifo", price_scale=100)
+        assert position.tick_size == 1
+        position.on_trade(2, 10050, 1)
+        pnl = position.on_trade(-1, 10175, 2)
+        assert pnl == 2.5
+        position.update_unrealised_pnl(10000, 1)
+        assert position.unrealised_pnl == -0.5
+        assert position.get_price() == 10050
+
+        with pytest.raises(ValueError):
+            position.on_trade(0.5, 10000, 1)
+
+    @pytest.mark.parametrize("netting_engine", ["fifo", "lifo", "avg_price"])
+    def test_fixed_point_fractional_quantities(self, netting_engine):
+        position = Position(
+            name="btc", contract_size=1, price_increment=2, netting_engine=netting_engine, price_scale=100,
+            quantity_scale=100,
+        )
+        for _ in range(3):
+            position.on_trade(0.07, 10000, 1)
+        assert position.net_lots == 21 and position.net_position == 0.21
+
+        position.update_unrealised_pnl(10100, 1)
+        assert position.unrealised_pnl == pytest.approx(0.21)
+        assert position.on_trade(-0.21, 10050, 1) == pytest.approx(0.105)
+        assert position.net_position == 0
+
+        with pytest.raises(ValueError):
+            position.on_trade(0.001, 10000, 1)
@@ -0,0 +1,61 @@
+import datetime as dt
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from backtesting.simulator.simulator_pool import SimulatorPool
+from backtesting.subscriptions_cache import frame_cache
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(frame_cache, "_frame_cache", None)
+    pool = SimulatorPool(event_stream=None)
+    pool.loads = 0
+
+    def load(plan, sub_name, sub_obj, interval):
+        pool.loads += 1
+        return pd.DataFrame({"price": [1.0, 2.0]})
+
+    monkeypatch.setattr(pool, "_load_subscription_events", load)
+    return pool
+
+
+def plan(instruments, mode="r"):
+    return SimpleNamespace(
+        instruments=instruments,
+        start_date=dt.date(2022, 1, 3),
+        end_date=dt.date(2022, 1, 4),
+        subscriptions_cache=SimpleNamespace(memory_cache_bytes=1024 * 1024, mode=mode),
+    )
+
+
+class TestLoadSubscriptionEvents:
+
+    def test_plans_share_loaded_frames(self, pool):
+        first = pool.load_subscription_events(plan(["btc"]), "CoinGecko", None)
+        first["price"] = 0.0
+        second = pool.load_subscription_events(plan(["btc"]), "CoinGecko", None)
+
+        assert pool.loads == 1
+        assert second["price"].tolist() == [1.0, 2.0]
+        assert frame_cache.get_frame_cache().hits == 1
+
+    def test_other_instruments_are_loaded(self, pool):
+        pool.load_subscription_events(plan(["btc"]), "CoinGecko", None)
+        pool.load_subscription_events(plan(["eth"]), "CoinGecko", None)
+        assert pool.loads == 2
+
+    def test_other_subscription_parameters_are_loaded(self, pool):
+        pool.load_subscription_events(plan(["btc"]), "CoinGecko", SimpleNamespace(fixed_point=False))
+        pool.load_subscription_events(plan(["btc"]), "CoinGecko", SimpleNamespace(fixed_point=True))
+        pool.load_subscription_events(plan(["btc"]), "CoinGecko", SimpleNamespace(fixed_point=True))
+        assert pool.loads == 2
+
+    def test_write_mode_bypasses_the_cache(self, pool):
+        pool.load_subscription_events(plan(["btc"]), "CoinGecko", None)
+        pool.load_subscription_events(plan(["btc"], mode="w"), "CoinGecko", None)
+        pool.load_subscription_events(plan(["btc"], mode="w"), "CoinGecko", None)
+
+        assert pool.loads == 3
+        assert frame_cache.get_frame_cache().hits == 0
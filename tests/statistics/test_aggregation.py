@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backtesting.statistics.aggregation import EventGroups, Max, partial_aggregate, merge_partials
+from backtesting.statistics.online_aggregator import Sum, Last, Count, Abs_Sum
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(11)
+    n = 200
+    return pd.DataFrame({
+        "timestamp": pd.date_range("2022-01-03", periods=n, freq="7min", tz="UTC"),
+        "symbol_id": rng.choice(["btc", "eth", None], n),
+        "type": rng.choice(["passive", "aggressive", None], n),
+        "qty": np.where(rng.random(n) < 0.2, np.nan, rng.integers(-5, 5, n)),
+    }).set_index("timestamp")
+
+
+@pytest.fixture
+def event_features():
+    return ["symbol_id", pd.Grouper(key="timestamp", freq="1h")]
+
+
+class TestEventGroups:
+
+    def test_reductions(self, df, event_features):
+        groups = EventGroups(df, event_features)
+        qty = groups.values("qty")
+        expected = df.reset_index().groupby(event_features)["qty"].agg(["sum", "count", "last"])
+
+        assert groups.index.equals(expected.index)
+        np.testing.assert_allclose(groups.sum(qty), expected["sum"])
+        np.testing.assert_array_equal(groups.count(qty), expected["count"])
+        np.testing.assert_allclose(groups.last(qty), expected["last"])
+
+    def test_split(self, df, event_features):
+        groups = EventGroups(df, event_features)
+        codes, size, types = groups.split("type")
+        expected = df.reset_index().groupby(event_features + ["type"])["qty"].sum().unstack("type").fillna(0)
+
+        assert types.tolist() == ["aggressive", "passive"]
+        sums = pd.DataFrame(groups.sum(groups.values("qty"), codes, size).reshape(-1, len(types)), columns=types)
+        np.testing.assert_allclose(sums.set_index(groups.index).loc[expected.index], expected)
+
+    def test_segments(self, df, event_features):
+        groups = EventGroups(df, event_features)
+        rows, starts, segment = groups.segments(np.ones(len(groups.codes), dtype=bool))
+
+        codes = groups.codes[rows]
+        assert (codes >= 0).all() and (np.diff(codes) >= 0).all()
+        assert len(starts) == groups.size
+        assert (segment == np.searchsorted(starts, np.arange(len(rows)), side="right") - 1).all()
+        # rows keep their order within a group
+        assert all((np.diff(rows[segment == s]) > 0).all() for s in range(len(starts)))
+
+
+class TestPartialAggregates:
+
+    def test_merge_partials(self, df, event_features):
+        aggregations = {"qty": [Sum, Last, Count, Abs_Sum, Max]}
+        whole = partial_aggregate(df, event_features, aggregations)
+        # partials of consecutive slices, merged out of order
+        partials = [partial_aggregate(part, event_features, aggregations) for part in (df[90:], df[:37], df[37:90])]
+        merged = merge_partials(partials, ["symbol_id", "timestamp"], aggregations)
+
+        pd.testing.assert_frame_equal(merged, whole)
+        expected = df.reset_index().groupby(event_features)["qty"].agg(["sum", "last", "count", "max"])
+        np.testing.assert_allclose(merged["qty_max"], expected["max"])
+        np.testing.assert_allclose(merged["qty_last"], expected["last"])
+        assert merged["qty_count"].dtype == "int64"
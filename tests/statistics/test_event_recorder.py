@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backtesting.statistics.event_recorder import EventRecorder, Float, Int, Datetime, Dictionary, Object
+
+
+@pytest.fixture
+def recorder():
+    return EventRecorder(
+        {"id": Int, "timestamp": Datetime, "symbol_id": Dictionary, "price": Float, "note": Object},
+        capacity=2,
+        chunk_size=3,
+    )
+
+
+def timestamp(i):
+    return pd.Timestamp("2022-01-01", tz="UTC") + pd.Timedelta(seconds=i)
+
+
+class TestEventRecorder:
+
+    def test_append_grows_buffers(self, recorder):
+        for i in range(10):
+            recorder.append((i, timestamp(i), "btc" if i % 2 else "eth", float(i), None))
+        assert len(recorder) == 10
+        df = recorder.to_frame()
+        assert recorder.capacity >= 10
+        assert df["id"].tolist() == list(range(10))
+        assert df["timestamp"].tolist() == [timestamp(i) for i in range(10)]
+        assert df["symbol_id"].tolist() == ["btc" if i % 2 else "eth" for i in range(10)]
+
+    def test_missing_values(self, recorder):
+        recorder.append((1, timestamp(1), None, None, "a"))
+        df = recorder.to_frame()
+        assert pd.isna(df["symbol_id"].iloc[0])
+        assert np.isnan(df["price"].iloc[0])
+        assert df["note"].tolist() == ["a"]
+
+    def test_dictionary_encoding(self, recorder):
+        for i in range(6):
+            recorder.append((i, timestamp(i), "btc", 1.0, None))
+        recorder.flush()
+        assert recorder.buffers[2].dtype == np.int32
+        assert recorder.dictionaries[2] == {None: -1, "btc": 0}
+
+    def test_extend(self, recorder):
+        recorder.append((0, timestamp(0), "btc", 1.0, None))
+        recorder.extend(
+            {"id": 1, "timestamp": pd.DatetimeIndex([timestamp(1), timestamp(2)]), "symbol_id": ["eth", None]}, 2
+        )
+        df = recorder.to_frame()
+        assert df["id"].tolist() == [0, 1, 1]
+        assert df["symbol_id"].iloc[:2].tolist() == ["btc", "eth"]
+        assert pd.isna(df["symbol_id"].iloc[2])
+        assert df["timestamp"].tolist() == [timestamp(i) for i in range(3)]
+        assert np.isnan(df["price"].iloc[1:]).all()
+
+    def test_spill(self, tmp_path):
+        recorder = EventRecorder({"id": Int, "symbol_id": Dictionary}, spill_dir=str(tmp_path), spill_rows=4)
+        for i in range(10):
+            recorder.append((i, "btc" if i % 2 else "eth"))
+            recorder.spill()
+        assert [rows for (_, rows) in recorder.spilled] == [4, 4]
+        assert len(recorder) == 10
+        assert [chunk.shape[0] for chunk in recorder.chunks()] == [4, 4, 2]
+        df = recorder.to_frame()
+        assert df["id"].tolist() == list(range(10))
+        assert df["symbol_id"].tolist() == ["btc" if i % 2 else "eth" for i in range(10)]
+
+        recorder.close()
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backtesting.statistics.online_aggregator import OnlineAggregator, Sum, Last, Count, Abs_Sum
+from backtesting.statistics.statistics import Stats
+
+
+@pytest.fixture
+def rows():
+    rng = np.random.default_rng(7)
+    start = pd.Timestamp("2022-01-03 20:00", tz="US/Eastern")
+    realised, unrealised = {"btc": 0.0, "eth": 0.0}, {"btc": 0.0, "eth": 0.0}
+    rows = []
+    for i in range(400):
+        symbol_id = "btc" if rng.random() < 0.6 else "eth"
+        realised[symbol_id] += round(rng.normal(), 2)
+        unrealised[symbol_id] = round(rng.normal(), 2)
+        contract_qty = None if rng.random() < 0.3 else float(rng.integers(-5, 5))
+        rows.append((
+            0,
+            start + pd.Timedelta(minutes=7 * i),
+            "2022-01-03",
+            "market_data",
+            "coin_gecko",
+            symbol_id,
+            float(rng.integers(9000, 11000)),
+            100 if symbol_id == "btc" else None,
+            float(rng.integers(-3, 3)),
+            realised[symbol_id],
+            unrealised[symbol_id],
+            realised[symbol_id] + unrealised[symbol_id],
+            None,
+            contract_qty,
+        ))
+    return rows
+
+
+class TestOnlineAggregator:
+
+    @pytest.mark.parametrize("resample_rule", ["1h", "1D"])
+    def test_matches_groupby(self, rows, resample_rule):
+        event_features = ["symbol_id"]
+        stats = Stats(None, online_aggregation=True, resample_rule=resample_rule, event_features=event_features)
+        for row in rows:
+            stats.aggregator.update(row)
+            stats.events.append(row)
+        assert len(stats) == len(rows)
+
+        df = stats.events_to_df(event_features).reset_index()
+        expected = df.groupby(event_features + [pd.Grouper(key="timestamp", freq=resample_rule)]).agg(
+            price=("price", "last"),
+            net_position=("net_position", "last"),
+            realised_pnl=("realised_pnl", "sum"),
+            realised_pnl_cum=("realised_pnl_cum", "last"),
+            unrealised_pnl=("unrealised_pnl", "sum"),
+            unrealised_pnl_cum=("unrealised_pnl_cum", "last"),
+            equity=("equity", "last"),
+            contract_qty_abs_sum=("contract_qty", lambda x: x.abs().sum()),
+            contract_qty_sum=("contract_qty", "sum"),
+            contract_qty_count=("contract_qty", "count"),
+        )
+        # Grouper keeps empty buckets, the aggregator only has the buckets events fell in
+        expected = expected[df.groupby(
+            event_features + [pd.Grouper(key="timestamp", freq=resample_rule)]
+        ).size() > 0]
+
+        result = stats.aggregator.to_frame()
+        pd.testing.assert_frame_equal(result, expected, check_index_type=False, check_dtype=False)
+
+    @pytest.mark.parametrize("resample_rule", ["1h", "1D"])
+    @pytest.mark.parametrize("chunk_size", [7, 4096])
+    def test_matches_aggregate_returns(self, rows, resample_rule, chunk_size):
+        event_features = ["symbol_id"]
+        stats = Stats(None, online_aggregation=True, resample_rule=resample_rule, event_features=event_features)
+        # pnl is differenced across chunks
+        stats.aggregator.chunk_size = chunk_size
+        for row in rows:
+            stats.aggregator.update(row)
+            stats.events.append(row)
+
+        expected = stats.aggregate_returns(
+            stats.events_to_df(event_features), resample_rule, event_features, ["performance_overview"]
+        )
+        pd.testing.assert_frame_equal(stats.aggregate_online(), expected)
+
+    def test_skips_missing_values(self):
+        aggregator = OnlineAggregator(
+            ["timestamp", "symbol_id", "qty"], "1h", ["symbol_id"], {"qty": [Sum, Last, Count, Abs_Sum]}
+        )
+        timestamp = pd.Timestamp("2022-01-01 10:15", tz="UTC")
+        aggregator.extend({"timestamp": [timestamp] * 3, "symbol_id": "btc", "qty": [-2.0, 3.0, None]}, 3)
+        aggregator.update((timestamp, None, 1.0))
+        assert len(aggregator) == 4
+        df = aggregator.to_frame()
+        assert df.index.tolist() == [("btc", pd.Timestamp("2022-01-01 10:00", tz="UTC"))]
+        assert df.iloc[0].tolist() == [1.0, 3.0, 2, 5.0]
+
+    def test_missing_event_features(self):
+        with pytest.raises(KeyError):
+            OnlineAggregator(["timestamp", "price"], "1h", ["symbol"], {"price": [Last]})
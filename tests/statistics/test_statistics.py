@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backtesting.event import Event
+from backtesting.statistics.statistics import Stats
+
+
+@pytest.fixture
+def stats():
+    rng = np.random.default_rng(3)
+    n = 500
+    timestamps = pd.date_range("2022-01-01", periods=n, freq="17min", tz="UTC")
+    stats = Stats(None)
+    stats.events.extend({
+        "execution_id": 0,
+        "timestamp": timestamps,
+        "trading_session": [str(d) for d in timestamps.date],
+        "symbol_id": rng.choice(["btc", "eth", None], n).tolist(),
+        "price": rng.random(n),
+        "realised_pnl_cum": np.where(rng.random(n) < 0.1, np.nan, rng.normal(size=n).cumsum()),
+        "unrealised_pnl_cum": rng.normal(size=n),
+    }, n)
+    return stats
+
+
+class TestStats:
+
+    def test_pnl_deltas(self, stats):
+        event_features = ["symbol_id", "trading_session"]
+        df = stats.events_to_df(event_features)
+
+        for (new_col, old_col) in [("realised_pnl", "realised_pnl_cum"), ("unrealised_pnl", "unrealised_pnl_cum")]:
+            expected = df.groupby(event_features)[old_col].transform(lambda x: x - x.shift(1).fillna(0))
+            pd.testing.assert_series_equal(df[new_col], expected, check_names=False)
+        assert df.loc[df["symbol_id"].isna(), "realised_pnl"].isna().all()
+
+    def test_aggregate_partial(self, stats):
+        event_features = ["symbol_id"]
+        df = stats.aggregate_partial("1h", event_features)
+        events = stats.events_to_df(event_features).reset_index()
+        expected = events.groupby(event_features + [pd.Grouper(key="timestamp", freq="1h")]).agg(
+            realised_pnl=("realised_pnl", "sum"),
+            realised_pnl_cum=("realised_pnl_cum", "last"),
+            equity_max=("equity", "max"),
+            last_timestamp=("timestamp", "max"),
+        )
+        expected = expected[events.groupby(event_features + [pd.Grouper(key="timestamp", freq="1h")]).size() > 0]
+
+        pd.testing.assert_frame_equal(
+            df.set_index(["symbol_id", "timestamp"])[expected.columns], expected, check_index_type=False
+        )
+
+    def test_add_bounding_rows(self):
+        df = pd.DataFrame({
+            "timestamp": pd.to_datetime(["2022-01-03 10:15", "2022-01-03 11:30"], utc=True),
+            "symbol_id": ["btc", "eth"],
+            "net_qty": [1.0, -2.0],
+            "trade_qty": [1.0, -2.0],
+        }).set_index("timestamp")
+        df = Stats.add_bounding_rows(df, pd.Grouper(key="timestamp", freq="1h"), ["symbol_id"])
+
+        # the start and end of both hours for both symbols
+        assert df.shape[0] == 10
+        assert df.index.is_monotonic_increasing
+        btc = df[df["symbol_id"] == "btc"]
+        assert btc.index.tolist()[-3:] == pd.to_datetime(
+            ["2022-01-03 10:59:59.999999", "2022-01-03 11:00:00.000000", "2022-01-03 11:59:59.999999"], utc=True
+        ).tolist()
+        assert btc["net_qty"].tolist() == [0.0] + [1.0] * 4
+
+    def test_compute_net_weighted_pos(self):
+        df = pd.DataFrame({
+            "timestamp": pd.to_datetime(["2022-01-03 10:15", "2022-01-03 10:30", "2022-01-03 11:30"], utc=True),
+            "symbol_id": ["btc", "btc", "eth"],
+            "net_qty": [2.0, -1.0, -2.0],
+            "trade_qty": [2.0, -3.0, -2.0],
+        }).set_index("timestamp")
+        event_features = ["symbol_id", pd.Grouper(key="timestamp", freq="1h")]
+        wnq = Stats(None).compute_net_weighted_pos(df, event_features)
+
+        hour = pd.Timedelta(hours=1).total_seconds() - 1e-6
+        # flat until 10:15, long 2 until 10:30, short 1 for the rest of the hour, then short 1 for 11:00
+        assert wnq.loc[("btc", pd.Timestamp("2022-01-03 10:00", tz="UTC"))] == pytest.approx(
+            (2 * 900 - (hour - 1800)) / hour
+        )
+        assert wnq.loc[("btc", pd.Timestamp("2022-01-03 11:00", tz="UTC"))] == pytest.approx(-1)
+        assert wnq.loc[("eth", pd.Timestamp("2022-01-03 10:00", tz="UTC"))] == pytest.approx(0)
+        assert wnq.loc[("eth", pd.Timestamp("2022-01-03 11:00", tz="UTC"))] == pytest.approx(-1)
+
+    def test_compute_drawdown_metrics(self):
+        rng = np.random.default_rng(5)
+        n = 300
+        df = pd.DataFrame({
+            "timestamp": pd.date_range("2022-01-03", periods=n, freq="3min", tz="UTC"),
+            "symbol_id": rng.choice(["btc", "eth", "sol"], n),
+            "rpnl_cum": rng.normal(size=n).round(1).cumsum(),
+        }).set_index("timestamp")
+
+        expected = df.reset_index().groupby(["symbol_id"]).apply(
+            lambda x: Stats.create_drawdown(x, col="rpnl_cum", feature="absolute")
+        ).infer_objects()
+        drawdowns = Stats.compute_drawdown_metrics(df, ["symbol_id"])
+        pd.testing.assert_frame_equal(drawdowns, expected, check_dtype=False)
+
+    def test_compute_trade_action_metrics(self):
+        df = pd.DataFrame({
+            "timestamp": pd.date_range("2022-01-03", periods=5, freq="1min", tz="UTC"),
+            "symbol_id": ["btc", "btc", "btc", "btc", "eth"],
+            "action": ["buy", "sell", "buy", None, "sell"],
+            "type": ["passive", "passive", "aggressive", "stop", "passive"],
+            "rpnl": [1.0, 2.0, 3.0, 4.0, 5.0],
+            "notional_traded": [10.0, 20.0, 10.0, 60.0, 5.0],
+        }).set_index("timestamp")
+        metrics = Stats.compute_trade_action_metrics(df, ["symbol_id"])
+
+        assert metrics.loc["btc", ["rpnl_count_buy", "rpnl_sum_buy", "rpnl_count_sell"]].tolist() == [2, 4.0, 1]
+        assert metrics.loc["btc", "notional_traded_sum_stop"] == 60.0
+        assert metrics.loc["btc", ["notional_aggressive_ratio", "notional_passive_ratio", "notional_stop_ratio"]].tolist() == [
+            0.1, 0.3, 0.6
+        ]
+        assert metrics.loc["btc", "count_passive_ratio"] == 0.5
+        assert metrics.loc["eth", ["count_passive_ratio", "count_stop_ratio"]].tolist() == [1.0, 0.0]
+
+    def test_snapshot_extractors_are_cached(self, monkeypatch):
+        stats = Stats(None)
+        resolved = []
+        resolve = Stats._resolve_extractor
+
+        def counting_resolve(keys, event, event2):
+            resolved.append(type(event))
+            return resolve(keys, event, event2)
+
+        monkeypatch.setattr(stats, "_resolve_extractor", counting_resolve)
+        timestamp = pd.Timestamp("2022-01-03", tz="UTC")
+        fixed_point = Event(
+            timestamp=timestamp, timestamp_millis=0, event_type="market_data", source="coin_gecko",
+            symbol_id="btc", price=10050, price_scale=100,
+        )
+        floats = Event(
+            timestamp=timestamp, timestamp_millis=0, event_type="market_data", source="coin_gecko",
+            symbol_id="eth", price=100.5,
+        )
+        floats.trading_session = fixed_point.trading_session = timestamp.date()
+
+        # events of one type but two shapes, alternating
+        snapshots = [stats._snapshot("event_snapshot_keys", event) for event in [fixed_point, floats] * 3]
+
+        assert resolved == [Event, Event]
+        assert snapshots[0][-2:] == (10050, 100) and snapshots[1][-2:] == (100.5, None)
+        assert snapshots[4] == snapshots[0] and snapshots[5] == snapshots[1]
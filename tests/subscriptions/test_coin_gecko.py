@@ -0,0 +1,178 @@
+import json
+import pickle
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+import requests
+from backtesting.subscriptions.market_data.coin_gecko.coin_gecko import CACHE_DIR_ENV, CoinGeckoMarketData
+
+
+class StubCoinGecko(ThreadingHTTPServer):
+    """
+    Serves /coins/{id} and /coins/{id}/market_chart/range, a price a day over the requested range. The first
+    `failures` requests are answered with `failure_status`.
+    """
+    daemon_threads = True
+
+    def __init__(self, delay=0.0, failures=0, failure_status=429):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.delay = delay
+        self.failures = failures
+        self.failure_status = failure_status
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        with server.lock:
+            server.requests.append((time.monotonic(), url.path))
+            failing = server.failures > 0
+            server.failures -= 1 if failing else 0
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.delay)
+            if failing:
+                return self._send(server.failure_status, {"error": "stub failure"})
+
+            parts = url.path.strip("/").split("/")
+            if parts[-2:] == ["market_chart", "range"]:
+                query = parse_qs(url.query)
+                start, end = int(query["from"][0]), int(query["to"][0])
+                prices = [[t * 1000, 100.25] for t in range(start, end, 24 * 60 * 60)]
+                return self._send(200, {"prices": prices})
+            return self._send(200, {"id": parts[1], "symbol": parts[1][:3]})
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+
+@pytest.fixture
+def stub(request):
+    server = StubCoinGecko(**getattr(request, "param", {}))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def market_data(stub, tmp_path, **kwargs):
+    return CoinGeckoMarketData(
+        base_url=stub.url,
+        metadata_dir=str(tmp_path),
+        requests_per_minute=kwargs.pop("requests_per_minute", None),
+        retry_backoff=0.01,
+        **kwargs,
+    )
+
+
+class TestCoinGeckoMarketData:
+
+    @pytest.mark.parametrize("stub", [{"delay": 0.1}], indirect=True)
+    def test_fetches_concurrently(self, stub, tmp_path):
+        coin_gecko = market_data(stub, tmp_path, max_workers=4)
+        df = coin_gecko._get("2022-01-01", "2022-01-10", ["bitcoin", "ethereum", "solana", "cardano"], "1d")
+
+        assert stub.max_in_flight > 1
+        assert sorted(df["symbol"].unique()) == ["bitcoin", "cardano", "ethereum", "solana"]
+        assert (df.groupby("symbol", observed=True).size() == 10).all()
+
+    def test_rate_limit(self, stub, tmp_path):
+        coin_gecko = market_data(stub, tmp_path, max_workers=4, requests_per_minute=600)
+        coin_gecko._get("2022-01-01", "2022-01-02", ["bitcoin", "ethereum"], "1d")
+
+        # 2 metadata and 2 price requests, 0.1s apart
+        times = sorted(t for (t, _) in stub.requests)
+        assert len(times) == 4
+        assert times[-1] - times[0] >= 0.25
+
+    @pytest.mark.parametrize("stub", [{"failures": 2, "failure_status": 429}], indirect=True)
+    def test_retries(self, stub, tmp_path):
+        coin_gecko = market_data(stub, tmp_path, max_workers=1)
+        df = coin_gecko._get("2022-01-01", "2022-01-02", ["bitcoin"], "1d")
+
+        assert len(stub.requests) == 4
+        assert df.shape[0] == 2
+
+    @pytest.mark.parametrize("stub", [{"failures": 10, "failure_status": 500}], indirect=True)
+    def test_raises_after_retries(self, stub, tmp_path):
+        coin_gecko = market_data(stub, tmp_path, max_workers=1, max_retries=2)
+        with pytest.raises(requests.HTTPError):
+            coin_gecko.get_coin_metadata("bitcoin")
+        assert len(stub.requests) == 3
+
+    @pytest.mark.parametrize("stub", [{"failures": 10, "failure_status": 404}], indirect=True)
+    def test_client_errors_are_not_retried(self, stub, tmp_path):
+        coin_gecko = market_data(stub, tmp_path)
+        with pytest.raises(requests.HTTPError):
+            coin_gecko.get_coin_metadata("bitcoin")
+        assert len(stub.requests) == 1
+
+    def test_metadata_is_memoised(self, stub, tmp_path):
+        coin_gecko = market_data(stub, tmp_path)
+        assert coin_gecko.get_coin_metadata("bitcoin") == {"id": "bitcoin", "symbol": "bit"}
+        coin_gecko.get_coin_metadata("bitcoin")
+        assert len(stub.requests) == 1
+
+        # and kept on disk for other processes
+        assert market_data(stub, tmp_path).get_coin_metadata("bitcoin") == {"id": "bitcoin", "symbol": "bit"}
+        assert len(stub.requests) == 1
+
+    def test_split_windows(self, tmp_path):
+        coin_gecko = CoinGeckoMarketData(metadata_dir=str(tmp_path))
+        day = 24 * 60 * 60
+
+        assert coin_gecko.split_windows(0, 50 * day) == [(0, 50 * day)]
+        windows = coin_gecko.split_windows(0, 800 * day)
+        assert len(windows) == 3
+        assert windows[0][0] == 0 and windows[-1][1] == 800 * day
+        assert all(a[1] == b[0] for (a, b) in zip(windows, windows[1:]))
+        # evenly sized, every window above the 90 days below which prices are hourly
+        assert all(end - start > 90 * day for (start, end) in windows)
+
+    def test_pickles_without_session(self, stub, tmp_path):
+        coin_gecko = market_data(stub, tmp_path, max_workers=2)
+        coin_gecko.get_coin_metadata("bitcoin")
+        assert coin_gecko._session is not None
+
+        restored = pickle.loads(pickle.dumps(coin_gecko))
+        assert restored._session is None
+        assert (restored.base_url, restored.max_workers, restored.metadata_dir) == (stub.url, 2, tmp_path)
+        assert restored.get_coin_metadata("bitcoin") == {"id": "bitcoin", "symbol": "bit"}
+        assert restored.get_coin_metadata("ethereum") == {"id": "ethereum", "symbol": "eth"}
+        assert restored._session is not None
+
+    def test_create_passes_parameters(self, tmp_path):
+        coin_gecko = CoinGeckoMarketData.create(
+            metadata_dir=str(tmp_path), max_workers=2, fixed_point=True, unknown="ignored"
+        )
+        assert (coin_gecko.metadata_dir, coin_gecko.max_workers, coin_gecko.fixed_point) == (tmp_path, 2, True)
+
+    def test_metadata_dir_defaults_to_cache_dir(self, tmp_path, monkeypatch):
+        monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path))
+        assert CoinGeckoMarketData().metadata_dir == tmp_path / "coin_gecko"
@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas import CategoricalDtype
+from backtesting.subscriptions.market_data.market_data import (
+    MAX_PRICE_DECIMALS,
+    MarketData,
+    infer_price_increment,
+    schema,
+)
+
+
+class StubMarketData(MarketData):
+    """
+    Serves the frame it was given.
+    """
+
+    def __init__(self, df, **kwargs):
+        self.df = df
+        super().__init__(**kwargs)
+
+    def subscribe(self, api_key=None):
+        pass
+
+    def _get(self, start_date, end_date, instruments, interval):
+        return self.df.copy()
+
+
+def ticks(prices):
+    """
+    Market data as a subscription's _get returns it, every column object or float, for {symbol_id: [price, ...]}.
+    """
+    frames = []
+    for (symbol_id, _prices) in prices.items():
+        timestamps = pd.date_range("2022-01-03", periods=len(_prices), freq="1min", tz="UTC")
+        frames.append(pd.DataFrame({
+            "timestamp_millis": timestamps.asi8 // 10 ** 6,
+            "symbol": symbol_id,
+            "symbol_id": f"coin_gecko_{symbol_id}",
+            "price": _prices,
+            "price_increment": 2.0,
+            "currency": "USD",
+            "contract_size": 1.0,
+            "rate_to_usd": 1.0,
+            "source": "coin_gecko",
+            "contract_unit_of_measure": symbol_id.upper(),
+            "event_type": "market_data",
+        }, index=pd.Index(timestamps, name="timestamp")))
+    return pd.concat(frames).astype({"symbol": object, "symbol_id": object})
+
+
+@pytest.fixture
+def market_data():
+    rng = np.random.default_rng(0)
+    return ticks({
+        "btc": np.round(40000 + rng.normal(size=5000).cumsum(), 2),
+        "eth": np.round(3000 + rng.normal(size=5000).cumsum(), 2),
+    })
+
+
+class TestMarketData:
+
+    def test_schema(self, market_data):
+        df = StubMarketData(market_data).get("2022-01-03", "2022-01-03", ["btc", "eth"], "1d")
+
+        for (col, dtype) in schema.items():
+            if col in df.columns and dtype == "category":
+                assert isinstance(df[col].dtype, CategoricalDtype), col
+        assert sorted(df["event_type"].cat.categories) == ["closing_price", "market_data"]
+        assert df["symbol_id"].tolist()[-2:] == ["coin_gecko_btc", "coin_gecko_eth"]
+
+    def test_categoricals_reduce_memory(self, market_data):
+        df = StubMarketData(market_data).get("2022-01-03", "2022-01-03", ["btc", "eth"], "1d")
+        objects = df.astype({col: object for col in df.columns if isinstance(df[col].dtype, CategoricalDtype)})
+
+        size = df.memory_usage(deep=True).sum()
+        assert size < objects.memory_usage(deep=True).sum() / 3
+
+        float32 = StubMarketData(market_data, float32_quantities=True).get("2022-01-03", "2022-01-03", ["btc"], "1d")
+        assert float32["contract_size"].dtype == "float32"
+        assert float32.memory_usage(deep=True).sum() < size
+
+    @pytest.mark.parametrize("prices", [
+        {"btc": [100.0, 101.5, 99.25], "eth": [10.0, 11.0]},
+        # a session with a single row for a symbol
+        {"btc": [100.0, 101.5, 99.25], "eth": [10.0]},
+        {"btc": [100.0]},
+    ])
+    def test_closing_prices_match_groupby_last(self, prices):
+        df = StubMarketData(ticks(prices)).get("2022-01-03", "2022-01-03", list(prices), "1d")
+        closing = df[df["event_type"] == "closing_price"]
+        market_data = df[df["event_type"] == "market_data"]
+
+        # how the closing prices were built before, the last row of each symbol_id
+        expected = market_data.reset_index().groupby("symbol_id", observed=True).last().reset_index()
+        expected = expected.set_index("timestamp")[closing.columns]
+        expected["event_type"] = "closing_price"
+        expected["apply_sampling"] = False
+
+        assert len(closing) == len(prices)
+        pd.testing.assert_frame_equal(
+            closing.astype(object), expected.astype(object), check_index_type=False, check_column_type=False
+        )
+
+
+class TestInferPriceIncrement:
+
+    def test_whole_numbers(self):
+        assert infer_price_increment([100.0, 101.0, 250.0]) == 0
+
+    def test_decimals(self):
+        assert infer_price_increment([100.5, 101.25, 99.125]) == 3
+
+    def test_float_noise(self):
+        # 0.1 + 0.2 is 0.30000000000000004, the increment is still 2 decimal places, not 17
+        assert infer_price_increment([0.1 + 0.2, 1.15, 2.01 * 3]) == 2
+
+    def test_capped(self):
+        assert infer_price_increment([1e-20]) == MAX_PRICE_DECIMALS
+        assert infer_price_increment([1 / 3]) == 16
+
+    def test_empty(self):
+        assert infer_price_increment([]) == 0
+        assert infer_price_increment([float("nan")]) == 0
+
+    def test_sampled(self):
+        # only an evenly spaced sample of distinct prices is inspected
+        prices = np.arange(1, 10001) / 100
+        assert infer_price_increment(prices, sample_size=100) == 2
+        assert infer_price_increment(np.append(prices, 0.001), sample_size=100) == 3
@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+from pandas import CategoricalDtype
+from backtesting.subscriptions.subscription import concat_frames, fillna_frame, set_dtypes
+
+
+def frame(symbols, dtype="category"):
+    return pd.DataFrame({"symbol_id": pd.Series(symbols, dtype=dtype), "price": range(len(symbols))})
+
+
+class TestConcatFrames:
+
+    def test_keeps_categoricals_with_different_categories(self):
+        df = concat_frames([frame(["btc", "btc"]), frame(["eth"]), None])
+
+        assert isinstance(df["symbol_id"].dtype, CategoricalDtype)
+        assert list(df["symbol_id"].dtype.categories) == ["btc", "eth"]
+        assert df["symbol_id"].tolist() == ["btc", "btc", "eth"]
+
+    def test_categorical_and_object(self):
+        df = concat_frames([frame(["btc"]), frame(["eth", None], dtype=object)])
+
+        assert isinstance(df["symbol_id"].dtype, CategoricalDtype)
+        assert df["symbol_id"].tolist()[:2] == ["btc", "eth"]
+        assert df["symbol_id"].isna().tolist() == [False, False, True]
+
+    def test_missing_columns(self):
+        df = concat_frames([frame(["btc"]), pd.DataFrame({"price": [1]})])
+
+        assert isinstance(df["symbol_id"].dtype, CategoricalDtype)
+        assert df["symbol_id"].isna().tolist() == [False, True]
+
+    def test_empty(self):
+        assert concat_frames([None]).empty
+
+
+class TestFillnaFrame:
+
+    def test_fills_categorical_gaps(self):
+        df = concat_frames([frame(["btc"]), pd.DataFrame({"price": [1]})])
+        df = fillna_frame(df, 0)
+
+        assert isinstance(df["symbol_id"].dtype, CategoricalDtype)
+        assert df["symbol_id"].tolist() == ["btc", 0]
+
+    def test_categories_without_gaps_are_unchanged(self):
+        df = fillna_frame(frame(["btc", "eth"]), 0)
+        assert list(df["symbol_id"].dtype.categories) == ["btc", "eth"]
+
+
+class TestSetDtypes:
+
+    @pytest.mark.parametrize("dtype", ["category", object])
+    def test_casts_to_schema(self, dtype):
+        df = set_dtypes(frame(["btc", "eth"], dtype=dtype), {"symbol_id": "category", "price": "float", "other": "int"})
+
+        assert isinstance(df["symbol_id"].dtype, CategoricalDtype)
+        assert df["price"].dtype == "float64"
@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+from pandas import CategoricalDtype
+from backtesting.subscriptions.market_data.market_data import schema
+from backtesting.subscriptions.subscription import set_dtypes
+from backtesting.subscriptions_cache import create_subscriptions_cache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return create_subscriptions_cache("CsvCache", {"entry_point": str(tmp_path)}, mode="r", enable_cache=True)
+
+
+@pytest.fixture
+def market_data():
+    timestamps = pd.date_range("2022-01-03", periods=4, freq="12h", tz="UTC")
+    return set_dtypes(pd.DataFrame({
+        "timestamp_millis": timestamps.asi8 // 10 ** 6,
+        "symbol": ["btc", "eth", "btc", "eth"],
+        "symbol_id": ["coin_gecko_btc", "coin_gecko_eth", "coin_gecko_btc", "coin_gecko_eth"],
+        "price": [100.5, 10.25, 101.5, 11.25],
+        "source": "coin_gecko",
+        "event_type": "market_data",
+    }, index=pd.Index(timestamps, name="timestamp")), schema)
+
+
+class TestCsvCache:
+
+    def test_round_trip(self, cache, tmp_path, market_data):
+        cache.save("CoinGecko", market_data, "1d")
+
+        # one file a day and symbol, no empty groups for unobserved categories
+        files = sorted(str(p.relative_to(tmp_path)) for p in tmp_path.rglob("*.csv"))
+        assert files == [
+            f"CoinGecko/1d/2022-01-0{day}/{symbol}.csv" for day in (3, 4) for symbol in ("btc", "eth")
+        ]
+
+        df, missing_dates = cache.get("CoinGecko", "2022-01-03", "2022-01-05", ["btc", "eth"], "1d")
+        assert missing_dates == [pd.Timestamp("2022-01-05")]
+
+        df = set_dtypes(df, schema).sort_index(kind="stable")
+        assert isinstance(df["symbol_id"].dtype, CategoricalDtype)
+        pd.testing.assert_frame_equal(df, market_data, check_categorical=False, check_freq=False)
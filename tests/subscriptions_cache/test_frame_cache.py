@@ -0,0 +1,84 @@
+import pandas as pd
+import pytest
+from backtesting.subscriptions_cache import frame_cache
+from backtesting.subscriptions_cache.frame_cache import SubscriptionFrameCache, get_frame_cache
+
+
+def frame(rows):
+    return pd.DataFrame({"price": [float(i) for i in range(rows)]})
+
+
+@pytest.fixture
+def size():
+    return SubscriptionFrameCache.frame_size(frame(10))
+
+
+class TestSubscriptionFrameCache:
+
+    def test_hits_and_misses(self):
+        cache = SubscriptionFrameCache()
+        key = cache.build_key("CoinGecko", ["btc"], "2022-01-01", "2022-01-31", "1d")
+
+        assert cache.get(key) is None
+        cache.put(key, frame(10))
+        pd.testing.assert_frame_equal(cache.get(key), frame(10))
+        assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    def test_evicts_least_recently_used(self, size):
+        cache = SubscriptionFrameCache(max_bytes=2 * size)
+        cache.put("a", frame(10))
+        cache.put("b", frame(10))
+        cache.get("a")
+        cache.put("c", frame(10))
+
+        assert "b" not in cache
+        assert "a" in cache and "c" in cache
+        assert cache.current_bytes == 2 * size
+        assert cache.evictions == 1
+
+    def test_byte_accounting(self, size):
+        cache = SubscriptionFrameCache(max_bytes=10 * size)
+        cache.put("a", frame(10))
+        cache.put("a", frame(20))
+        assert cache.current_bytes == SubscriptionFrameCache.frame_size(frame(20))
+
+        # a frame over the whole budget is not cached
+        cache.put("b", frame(1000))
+        assert "b" not in cache
+
+        cache.resize(size)
+        assert len(cache) == 0 and cache.current_bytes == 0
+
+    def test_frames_are_copied(self):
+        cache = SubscriptionFrameCache()
+        df = frame(10)
+        cache.put("a", df)
+        df.loc[0, "price"] = -1.0
+
+        loaded = cache.get("a")
+        loaded.loc[1, "price"] = -1.0
+        loaded["volume"] = 0
+
+        pd.testing.assert_frame_equal(cache.get("a"), frame(10))
+
+    def test_subscription_parameters(self):
+        class Slotted:
+            __slots__ = ("directory", "_session")
+
+            def __init__(self, directory):
+                self.directory = directory
+                self._session = object()
+
+        assert SubscriptionFrameCache.subscription_parameters(None) == ()
+        assert SubscriptionFrameCache.subscription_parameters(Slotted("a")) == (("directory", "'a'"),)
+        assert (
+            SubscriptionFrameCache.subscription_parameters(Slotted("a"))
+            != SubscriptionFrameCache.subscription_parameters(Slotted("b"))
+        )
+
+    def test_get_frame_cache(self, monkeypatch):
+        monkeypatch.setattr(frame_cache, "_frame_cache", None)
+        cache = get_frame_cache(1024)
+
+        assert get_frame_cache() is cache
+        assert get_frame_cache(2048) is cache and cache.max_bytes == 2048
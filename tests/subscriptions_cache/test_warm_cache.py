@@ -0,0 +1,107 @@
+import datetime as dt
+import threading
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from backtesting.datastore.csv_datastore import CsvDataStore
+from backtesting.main import build_parser
+from backtesting.subscriptions_cache import CsvCache
+
+from backtesting.warm_cache import build_coverage, build_tasks, warm_cache
+
+
+class StubSubscription:
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def get(self, start_date, end_date, instruments, interval):
+        with self.lock:
+            self.requests.append((start_date, end_date, tuple(instruments)))
+        if set(instruments) & self.fail:
+            raise ConnectionError(f"stub failure {instruments}")
+        timestamps = pd.date_range(start_date, end_date, name="timestamp")
+        return pd.DataFrame(
+            {"symbol": [instruments[0]] * len(timestamps), "price": 100.0}, index=timestamps
+        )
+
+
+def simulation(start_date, end_date, instruments):
+    return SimpleNamespace(
+        start_date=start_date, end_date=end_date, subscriptions=["Stub"], instruments=instruments
+    )
+
+
+@pytest.fixture
+def config():
+    return SimpleNamespace(simulation_configs={
+        "a": simulation(dt.date(2022, 1, 3), dt.date(2022, 1, 5), ["btc"]),
+        "b": simulation(dt.date(2022, 1, 5), dt.date(2022, 1, 7), ["btc", "eth"]),
+    })
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CsvCache(datastore=CsvDataStore(tmp_path), enable_cache=True, mode="rw")
+
+
+def days(start, end):
+    return {d.date() for d in pd.date_range(start, end)}
+
+
+class TestWarmCache:
+
+    def test_build_coverage(self, config):
+        assert build_coverage(config) == {
+            ("Stub", "btc"): days("2022-01-03", "2022-01-07"),
+            ("Stub", "eth"): days("2022-01-05", "2022-01-07"),
+        }
+
+    def test_build_tasks_skips_cached_dates(self, config, cache):
+        cache.save("Stub", StubSubscription().get("2022-01-04", "2022-01-05", ["btc"], "1d"), "1d")
+
+        tasks = sorted(build_tasks(build_coverage(config), cache), key=str)
+        assert [(t.instrument, t.start_date, t.end_date) for t in tasks] == [
+            ("btc", dt.date(2022, 1, 3), dt.date(2022, 1, 3)),
+            ("btc", dt.date(2022, 1, 6), dt.date(2022, 1, 7)),
+            ("eth", dt.date(2022, 1, 5), dt.date(2022, 1, 7)),
+        ]
+
+    def test_warm_cache(self, config, cache):
+        subscription = StubSubscription()
+        coverage = build_coverage(config)
+        tasks = build_tasks(coverage, cache)
+
+        assert warm_cache(tasks, {"Stub": subscription}, cache, workers=2) == []
+        assert len(subscription.requests) == len(tasks)
+        assert build_tasks(coverage, cache) == []
+
+        df, missing = cache.get("Stub", "2022-01-05", "2022-01-07", ["eth"], "1d")
+        assert missing == [] and df.shape[0] == 3
+
+    def test_failures_are_returned(self, config, cache):
+        coverage = build_coverage(config)
+        errors = warm_cache(build_tasks(coverage, cache), {"Stub": StubSubscription(fail=["eth"])}, cache, workers=2)
+
+        assert [task.instrument for (task, _) in errors] == ["eth"]
+        assert isinstance(errors[0][1], ConnectionError)
+        # the rest of the cache is still warmed
+        assert [task.instrument for task in build_tasks(coverage, cache)] == ["eth"]
+
+
+class TestBuildParser:
+
+    def test_legacy_option_spellings(self):
+        args = build_parser().parse_args(
+            ["-o--scenario", "dca", "-z--datastore", "csv", "-y--datastore_parameters", "{}", "-a--scenario_path", "s"]
+        )
+        assert (args.scenario, args.datastore, args.datastore_parameters, args.scenario_path) == ("dca", "csv", "{}", "s")
+
+    def test_options(self):
+        args = build_parser().parse_args(["--scenario", "dca", "-o", "output.yaml", "-z", "csv", "-a", "s"])
+        assert (args.scenario, args.output_config_path, args.datastore, args.scenario_path) == (
+            "dca", "output.yaml", "csv", "s"
+        )
@@ -0,0 +1,86 @@
+import threading
+
+import pandas as pd
+import pytest
+from backtesting.writers import BackgroundWriter, Writer, create_writer
+
+
+class RecordingWriter(Writer):
+
+    def __init__(self, fail_on=None):
+        super().__init__("RecordingWriter")
+        self.files = []
+        self.flushed = 0
+        self.fail_on = fail_on
+        self.release = threading.Event()
+        self.release.set()
+
+    def write_results(self, results, mode, store_index, file=None, date=None, uid=None, version=None):
+        self.release.wait()
+        if file == self.fail_on:
+            raise OSError(f"failed to write {file}")
+        self.files.append(file)
+
+    def flush(self):
+        self.flushed += 1
+
+
+@pytest.fixture
+def results():
+    return pd.DataFrame({
+        "trading_session": pd.to_datetime(["2022-01-03", "2022-01-04"]),
+        "realised_pnl": [1.0, 2.0],
+    })
+
+
+class TestBackgroundWriter:
+
+    def test_writes_in_order(self, results):
+        writer = BackgroundWriter(RecordingWriter(), queue_size=2)
+        for i in range(10):
+            writer.write_results(results, mode="a", store_index=False, file=f"{i}.csv")
+        writer.flush()
+
+        assert writer.writer.files == [f"{i}.csv" for i in range(10)]
+        assert writer.writer.flushed == 1
+        assert writer.thread is None
+
+    def test_blocks_when_full(self, results):
+        writer = BackgroundWriter(RecordingWriter(), queue_size=1)
+        writer.writer.release.clear()
+        # the first write is taken by the thread, the second fills the queue
+        writer.write_results(results, mode="a", store_index=False, file="0.csv")
+        writer.write_results(results, mode="a", store_index=False, file="1.csv")
+
+        blocked = threading.Thread(
+            target=writer.write_results, args=(results, "a", False), kwargs={"file": "2.csv"}
+        )
+        blocked.start()
+        blocked.join(timeout=0.2)
+        assert blocked.is_alive()
+
+        writer.writer.release.set()
+        blocked.join(timeout=5)
+        writer.flush()
+        assert writer.writer.files == ["0.csv", "1.csv", "2.csv"]
+
+    def test_raises_failed_write(self, results):
+        writer = BackgroundWriter(RecordingWriter(fail_on="1.csv"))
+        for i in range(3):
+            writer.write_results(results, mode="a", store_index=False, file=f"{i}.csv")
+
+        with pytest.raises(OSError):
+            writer.flush()
+        assert writer.writer.files == ["0.csv"]
+        with pytest.raises(OSError):
+            writer.write_results(results, mode="a", store_index=False, file="3.csv")
+
+    def test_csv_writer(self, tmp_path, results):
+        writer = create_writer("CsvWriter", {"entry_point": str(tmp_path)}, write_queue_size=4)
+        writer.write_results(results.copy(), mode="w", store_index=False, file="out/results.csv")
+        writer.flush()
+
+        assert pd.read_csv(tmp_path / "out" / "results.csv")["trading_session"].tolist() == [
+            "2022-01-03", "2022-01-04"
+        ]
+        assert writer.writer.written == []
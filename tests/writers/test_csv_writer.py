@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+from backtesting.writers import create_writer
+
+
+@pytest.fixture
+def writer(tmp_path):
+    return create_writer("CsvWriter", {"entry_point": str(tmp_path)})
+
+
+def results(pnl):
+    return pd.DataFrame({
+        "trading_session": pd.to_datetime(["2022-01-03"] * len(pnl)),
+        "realised_pnl": pnl,
+    })
+
+
+class TestCsvWriter:
+
+    def test_write_replaces(self, writer, tmp_path):
+        writer.write_results(results([1.0, 2.0]), mode="w", store_index=False, file="out.csv")
+        writer.write_results(results([3.0]), mode="w", store_index=False, file="out.csv")
+
+        assert pd.read_csv(tmp_path / "out.csv")["realised_pnl"].tolist() == [3.0]
+
+    def test_append(self, writer, tmp_path):
+        writer.write_results(results([1.0, 2.0]), mode="a", store_index=False, file="out.csv")
+        writer.write_results(results([3.0]), mode="a", store_index=False, file="out.csv")
+
+        df = pd.read_csv(tmp_path / "out.csv")
+        assert df["realised_pnl"].tolist() == [1.0, 2.0, 3.0]
+        assert df["trading_session"].tolist() == ["2022-01-03"] * 3
@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+from backtesting.writers import create_writer, parquet_writer
+
+# installed with the test extra, pip install backtesting[test]
+requires_pyarrow = pytest.mark.skipif(parquet_writer.pyarrow is None, reason="pyarrow is not installed")
+
+
+@pytest.fixture
+def writer(tmp_path):
+    return create_writer("ParquetWriter", {"entry_point": str(tmp_path)})
+
+
+@pytest.fixture
+def results():
+    return pd.DataFrame({
+        "trading_session": pd.to_datetime(["2022-01-03", "2022-01-03", "2022-01-04"]),
+        "symbol_id": ["btc", "eth", "btc"],
+        "strategy_name": ["dca", "dca", "dca"],
+        "realised_pnl": [1.0, 2.0, 3.0],
+    })
+
+
+class TestParquetWriter:
+
+    def test_requires_pyarrow(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(parquet_writer, "pyarrow", None)
+        with pytest.raises(ImportError, match="backtesting\\[parquet\\]"):
+            create_writer("ParquetWriter", {"entry_point": str(tmp_path)})
+
+    @requires_pyarrow
+    def test_partitions(self, writer, results):
+        writer.write_results(results.copy(), mode="w", store_index=False, file="out.csv", uid="abc", version=1)
+        base = writer.dataset_path("abc", 1)
+
+        assert sorted(p.name for p in base.iterdir()) == [
+            "trading_session=2022-01-03", "trading_session=2022-01-04"
+        ]
+        df = pd.read_parquet(next((base / "trading_session=2022-01-03").iterdir()))
+        assert df["realised_pnl"].tolist() == [1.0, 2.0]
+        assert isinstance(df["strategy_name"].dtype, pd.CategoricalDtype)
+
+    @requires_pyarrow
+    def test_append_and_compact(self, writer, results):
+        writer.write_results(results.copy(), mode="w", store_index=False, file="out.csv", uid="abc", version=1)
+        writer.write_results(results.copy(), mode="a", store_index=False, file="out.csv", uid="abc", version=1)
+        partition = writer.dataset_path("abc", 1) / "trading_session=2022-01-03"
+        assert len(list(partition.iterdir())) == 2
+
+        writer.compact("abc", 1)
+        parts = list(partition.iterdir())
+        assert len(parts) == 1
+        assert pd.read_parquet(parts[0])["realised_pnl"].tolist() == [1.0, 2.0, 1.0, 2.0]
+
+        writer.write_results(results.copy(), mode="w", store_index=False, file="other.csv", uid="abc", version=1)
+        writer.write_results(results.copy(), mode="w", store_index=False, file="other.csv", uid="abc", version=1)
+        assert len(list(partition.iterdir())) == 2
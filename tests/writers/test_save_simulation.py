@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+from backtesting.save_simulations import save_simulation
+from backtesting.writers import create_writer
+
+
+@pytest.fixture
+def results():
+    timestamps = pd.date_range("2022-01-03", periods=6, freq="12h", tz="UTC")
+    return pd.DataFrame({
+        "timestamp": timestamps,
+        "trading_session": timestamps.normalize().tz_localize(None),
+        "symbol_id": ["btc", "eth"] * 3,
+        "realised_pnl": range(6),
+    }).set_index("timestamp")
+
+
+class TestSaveSimulation:
+
+    @pytest.mark.parametrize("write_workers", [1, 4])
+    def test_split_results(self, tmp_path, results, write_workers):
+        writer = create_writer("CsvWriter", {"entry_point": str(tmp_path)})
+        save_simulation(
+            writer=writer,
+            df=results,
+            uid="abc",
+            version=1,
+            mode="w",
+            store_index=False,
+            split_results_by=["trading_session", "symbol_id"],
+            split_results_freq="1D",
+            write_workers=write_workers,
+        )
+
+        files = sorted(p.name for p in tmp_path.iterdir())
+        assert files == [
+            f"2022-01-0{day}-simulation-output-abc-1-{symbol}.csv" for day in (3, 4, 5) for symbol in ("btc", "eth")
+        ]
+        df = pd.read_csv(tmp_path / "2022-01-04-simulation-output-abc-1-eth.csv")
+        assert df["trading_session"].tolist() == ["2022-01-04"]
+        assert df["realised_pnl"].tolist() == [3]